@@ -1,11 +1,31 @@
 from bs4 import BeautifulSoup
-import requests
-import time
-import pandas as pd
-from urllib.parse import urljoin, quote
+import os
+import argparse
+from urllib.parse import urljoin, quote, urlsplit, parse_qs
+import queue
+import threading
+from fetch_engine import FetchEngine
+from http_cache import make_session
+from rate_limit import HostRateLimiter
+from parse_pool import ParsePool
+from senado_parse import parse_profile, safe_get_text
+from checkpoint import CheckpointJournal, read_journal, index_journal, read_entry
+from dataset_output import DatasetWriter
 
 ###CHANGE THIS PATH BEFORE RUNNING THE CODE###
 output_path = r'C:\Users\HONOR\Desktop\RA\Brazil\data\br_senate.csv'
+#finished listing pages and profiles are journaled here, run with --resume to continue an interrupted scrape
+#the journal of the last run is also the state used by --incremental
+checkpoint_path = os.path.splitext(output_path)[0] + '_checkpoint.jsonl'
+#output format: 'csv', or 'parquet' / 'feather' for a typed dataset folder partitioned by country and chamber (needs pyarrow, see dataset_output.py)
+output_format = 'csv'
+column_types = {
+    "Date of Birth": "date", "Sex": "category", "Status": "category",
+    "Party Abbreviation": "category", "Party Full Name": "category", "Position in party": "category",
+    "Education level": "category", "Number of terms in Senate": "int",
+    "Mandate number": "int", "Mandate - Position": "category"
+}
+#the mandate start / end dates are kept as text, the Senado pages do not give them in one date format
 
 #setting up the code: url's and headers
 main_url = 'https://www6g.senado.leg.br/busca/?colecao=Senadores'
@@ -17,9 +37,23 @@ headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
 
 legislatures_main = [51, 52, 53, 54, 55, 56, 57, 58]
 legislatures_alt = [51, 52, 53, 54, 55, 56]
+#pages queued when the number of result pages can't be read from the first page (later pages are still tried)
+max_pages = 16
+
+#listing pages and profiles are fetched in parallel: number of worker threads and max simultaneous requests to one host
+listing_workers = 4
+profile_workers = 8
+per_host_limit = 4
+#polite request budget per host, shared by all workers (replaces the sleeps between requests)
+requests_per_second = 10
+#profile pages are parsed in separate processes: number of parse processes and max pages waiting for them
+parse_workers = os.cpu_count()
+max_pending_parses = 32
+#rows held in memory before they are appended to the output file
+output_buffer_rows = 1000
 
 #storage variables
-senators_data = []
+#the parsed records are not kept in memory, they go to the checkpoint journal and are streamed from it to the CSV
 seen_urls = {}
 short_name_party_map = {}
 party_fullname_map = {}
@@ -28,325 +62,355 @@ party_fullname_map = {}
 #to ensure that each party name and abbreviation is collected only once create seen_parties
 #to map short name of senator from the main_url with his/her short name from the alt_url create short_name_party_map
 
-def safe_get_text(tags, index):
-    try:
-        return tags[index].get_text(strip=True)
-    except IndexError:
-        return "N/A"
-
-session = requests.Session()
-session.headers.update(headers)
-
 ###1. SCRAPPING ALL BASIC INFO ABOUT SENATORS FROM THE MAIN_URL
+#listing pages of all legislatures are fetched concurrently and feed the new profile links into profile_queue,
+#which the profile workers drain at the same time, so there are no idle gaps between pages and legislatures
+
+def read_page_count(soup):
+    #the highest p= found in the pagination links of a result page
+    pages = []
+    for a in soup.find_all('a', href=True):
+        p_values = parse_qs(urlsplit(urljoin(main_url, a['href'])).query).get('p')
+        if p_values and p_values[0].isdigit():
+            pages.append(int(p_values[0]))
+    return max(pages) if pages else None
+
+def read_sex(result):
+    #looking through the text on each senator's block identifying the sex
+    main_block = result.get_text(separator=' ', strip=True).lower()
+    if 'senadora' in main_block:
+        return "Female"
+    elif 'senador' in main_block:
+        return "Male"
+    return "N/A"
+
+profile_queue = queue.Queue()
+state_lock = threading.Lock()
+first_seen = {}   #profile url -> (position of its first appearance, sex read there)
+done_profiles = set()
+page_counts = {}   #legislature -> highest result page queued so far
+listing_futures = []
+
+def register_sighting(profile_url, leg, order, sex):
+    #returns True the first time a profile url is seen
+    with state_lock:
+        if profile_url in seen_urls:
+            seen_urls[profile_url].add(leg)
+            if order < first_seen[profile_url][0]:
+                first_seen[profile_url] = (order, sex)
+            return False
+        seen_urls[profile_url] = {leg}
+        first_seen[profile_url] = (order, sex)
+        return True
+
+def process_listing(leg_idx, leg, p):
+    #fetches one result page, queues the profiles not seen before and the result pages it shows that are not queued yet
+    print(f"Processing page {p} of legislature {leg}...")
+    page_url = f"{main_url}&legislatura={quote(f'{leg}ª Legislatura')}&p={p}"
+    response = engine.fetch(page_url)
+    if response.status_code != 200:
+        print(f'Request failed at page {p} (legislature {leg}) with status code {response.status_code}')
+        return
+
+    soup = BeautifulSoup(response.text, 'lxml')
+    results = soup.find_all('div', class_='sf-busca-resultados-item')
+    valid_results = [r for r in results if r.find('h3') and r.find('a', href=True)]
+    if not valid_results:
+        print(f"No more senators found (page {p} of legislature {leg})")
+
+#on the webpage find all the links to senators personal profiles, keeping track of them
+#the position (legislature, page, result) keeps the output in the same order as a page by page scrape
+
+    sightings = []
+    new_profiles = []
+    for pos, result in enumerate(valid_results):
+        try:
+            link_tag = result.find('h3').find('a', href=True)
+            profile_url = urljoin(main_url, link_tag["href"])
+            sex = read_sex(result)
+            sightings.append([profile_url, pos, sex])
+            if register_sighting(profile_url, leg, (leg_idx, p, pos), sex) and profile_url not in done_profiles:
+                new_profiles.append((profile_url, sex))
+
+        except Exception as e:
+            print(f"Error processing a senator: {e}")
+            continue
 
-for leg in legislatures_main:
-    print(f"Processing legislature {leg}ª...")
-    encoded_leg = quote(f"{leg}ª Legislatura")
-
-#going through all legislatures and all pages
-
-    for p in range(1,17):
-        print(f"Processing page {p} of legislature {leg}...")
-        page_url = f"{main_url}&legislatura={encoded_leg}&p={p}"
-        response = session.get(page_url)
-        if response.status_code != 200:
-            print(f'Request failed at page {p} (legislature {leg}) with status code {response.status_code}')
-            break
-
-        soup = BeautifulSoup(response.text, 'lxml')
-        results = soup.find_all('div', class_='sf-busca-resultados-item')
-        valid_results = [r for r in results if r.find('h3') and r.find('a', href=True)]
-        if not valid_results:
-            print("No more senators found")
+    #the pagination may only show a window of pages around the current one: the pages up to its highest link are
+    #queued, and while the last queued page still has results the next one is tried, until a page comes back empty
+    page_count = None
+    if valid_results:
+        page_count = read_page_count(soup) or (max_pages if p == 1 else p)
+        if p >= page_counts.get(leg, 1):
+            page_count = max(page_count, p + 1)
+    journal.record({'type': 'page', 'leg': leg, 'page': p, 'page_count': page_count, 'profiles': sightings})
+    for profile in new_profiles:
+        profile_queue.put(profile)
+    if page_count is not None:
+        queue_pages(leg_idx, leg, page_count)
+
+def queue_pages(leg_idx, leg, page_count):
+    #queues the result pages of the legislature up to page_count that were not queued before
+    with state_lock:
+        first = page_counts.get(leg, 1) + 1
+        if page_count < first:
+            return
+        page_counts[leg] = page_count
+    print(f"Processing legislature {leg}ª: pages {first} to {page_count}")
+    for p in range(first, page_count + 1):
+        if (leg, p) not in done_pages:
+            listing_futures.append(engine.submit(process_listing, leg_idx, leg, p))
+
+def profile_worker():
+    while True:
+        item = profile_queue.get()
+        if item is None:
             break
-
-#on the initial webpage find all the links to senators personal profiles and follow these links by turn, keeping track of them
-
-        for result in valid_results:
-            try:
-                link_tag = result.find('h3').find('a', href=True)
-                profile_url = urljoin(main_url, link_tag["href"])
-                if profile_url in seen_urls:
-                    seen_urls[profile_url].add(leg)
-                    continue
-                seen_urls[profile_url] = {leg}
-
-#looking through the text on each senator's block identifying the sex
-
-                main_block = result.get_text(separator=' ', strip=True).lower()
-                if 'senadora' in main_block:
-                    sex = "Female"
-                elif 'senador' in main_block:
-                    sex = "Male"
-                else:
-                    sex = "N/A"
-
-                profile_response = session.get(profile_url)
-                profile_soup = BeautifulSoup(profile_response.text, "lxml")
-
-                personal_info = profile_soup.find('dl', class_='dl-horizontal')
-                info_tags = personal_info.find_all('dd') if personal_info else []
-
-#finding the block with personal info and extracting from it full name, date of birth and place of birth
-
-                f_name = safe_get_text(info_tags, 0)
-                dob = safe_get_text(info_tags, 1)
-                pob = safe_get_text(info_tags, 2)
-                #office = safe_get_text(info_tags, 3)
-                #phone = safe_get_text(info_tags, 4)
-                #mail = safe_get_text(info_tags, 5)
-
-#from the head block collecting short name of senator
-
-                head_div = profile_soup.find('div', class_='head')
-                name = head_div.find('h1').get_text(strip=True).split(" -")[0] if head_div else "N/A"
-
-#collecting information about parties (were available), otherwise put "N/A"
-#information about political party is available only for sitting senators, we'll fix this later using alt_url
-
-                party_tag = profile_soup.find('small').get_text(strip=True) if profile_soup.find('small') else ''
-                parts = [p.strip() for p in party_tag.split(' - ')]
-                party = parts[1].split('(')[0].strip() if len(parts) > 1 else "N/A"
-
-#identifying position in party (were available), otherwise put "N/A"
-
-                if ' (Fora de Exercício) ' in profile_soup.text:
-                    position = "N/A"
-                elif 'Líder' in party_tag:
-                    position = "Leader"
-                elif '1° Vice-líder' in party_tag:
-                    position = "1st Vice-leader"
-                elif '2° Vice-líder' in party_tag:
-                    position = "2nd Vice-leader"
-                else:
-                    position = "Member"
-
-#identifying whether senator is sitting now or out of service
-
-                status = "Out of Service" if ' (Fora de Exercício) ' in profile_soup.text else "Sitting"
-
-                bio_block = profile_soup.find('div', id='accordion-biografia')
-
-#in biograohy block find the commision's section and collect information about commisions senator is participating
-
-                comm_block = profile_soup.find('div', id='comissoes')
-                commissions = []
-                if comm_block:
-                    tbody = comm_block.find('tbody')
-                    if tbody:
-                        commissions = [
-                            comm.find_all('td')[0].get_text(strip=True)
-                            for comm in tbody.find_all('tr')
-                            if comm.find_all('td')
-                        ]
-
-#in biograohy block find the commision's section and collect information about mandates
-#MANDATES HERE ARE ALL TERMS IN GOVERNMENT AUTHORITIES (Deputado, Prefeito, Vice-governador, Governador and Senador)
-
-                mandates_terms = bio_block.find('table', class_='table table-striped', title='Mandatos do(a) senador(a)') if bio_block else None
-                mandates = []
-                if mandates_terms:
-                    rows = mandates_terms.find('tbody').find_all('tr')
-                    for row in rows:
-                        cols = row.find_all('td')
-                        if len(cols) >= 3:
-                            mandate = {
-                                'Position': cols[0].get_text(strip=True),
-                                'Start date': cols[1].get_text(strip=True),
-                                'End date': cols[2].get_text(strip=True)
-                            }
-                            mandates.append(mandate)
-
-#IN TERMS_COUNT PUT THE NUMBER OF TERMS SERVED IN SENATE (= terms served as senador in Federal Senate)
-
-                prof_info = profile_soup.find('div', id='accordion-mandatos-exercicios')
-                terms_count = prof_info.get_text(strip=True).lower().count('legislaturas') if prof_info else 0
-
-#in biography block find the education part and looking for the degree information
-
-                degree = "N/A"
-                educ_table = bio_block.find('table', class_='table table-striped', title='Histórico acadêmico do(a) senador(a)') if bio_block else None
-                if educ_table:
-                    levels = educ_table.find('tbody').find_all('tr')
-                    if levels:
-                        h_level = levels[-1].find_all('td')
-                        if len(h_level) >= 2:
-                            degree = h_level[1].get_text(strip=True)
-
-#as politicians being voted as a part of chapa (group with main candidate, 1st alternate and 2nd alternate) we identify the positio in chapa (=ticket) for every senator
-
-                ticket = "N/A"
-                chapa_table = profile_soup.find('table', class_='table table-striped', title='Chapa eleitoral do Senador')
-                if chapa_table:
-                    tickets = chapa_table.find('tbody').find_all('tr')
-                    for idx, ticket_row in enumerate(tickets):
-                        ticket_text = ticket_row.get_text(strip=True)
-                        if name in ticket_text:
-                            if idx == 0:
-                                ticket = "Holder"
-                            elif idx == 1:
-                                ticket = "1st alternate"
-                            elif idx == 2:
-                                ticket = "2nd alternate"
-                            break
-
-#in biography block find the tags for professions
-
-                professions = []
-                if bio_block:
-                    h3_tags = bio_block.find_all('h3')
-                    for h3 in h3_tags:
-                        if 'profissões' in h3.get_text(strip=True).lower():
-                            ul_tag = h3.find_next_sibling('ul')
-                            if ul_tag:
-                                li_tags = ul_tag.find_all('li')
-                                professions = [li.get_text(strip=True) for li in li_tags]
-                            break
-
-#adding all data together
-
-                senators_data.append({
-                    "Full Name": f_name,
-                    "Short Name": name,
-                    "Date of Birth": dob,
-                    "Place of Birth": pob,
-                    "Sex": sex,
-                    "Status": status,
-                    #"Office": office,
-                    #"Phone": phone,
-                    #"E-mail": mail,
-                    #"Supoffice": supoffice,
-                    "Party": party,
-                    "Position in party": position,
-                    "Education level": degree,
-                    "Professions": professions,
-                    "Number of terms in Senate": terms_count,
-                    "Position in the last ticket": ticket,
-                    "Mandates": mandates,
-                    "Commissions": commissions
-                })
-
-                print(f" → Processed: {name}")
-                time.sleep(0.1)
-
-            except Exception as e:
-                print(f"Error processing a senator: {e}")
+        profile_url, sex = item
+        try:
+            profile_response = engine.fetch(profile_url)
+            #an error page is not parsed into an empty record, the profile stays unfinished (see --resume / --incremental)
+            profile_response.raise_for_status()
+            future = parse_pool.submit(parse_profile, profile_response.content, sex, profile_response.encoding)
+            future.add_done_callback(lambda f, url=profile_url: report_parsed(url, f))
+
+        except Exception as e:
+            print(f"Error processing a senator: {e}")
+
+def report_parsed(profile_url, future):
+    if future.exception() is not None:
+        print(f"Error processing a senator: {future.exception()}")
+        return
+    senator = future.result()
+    with state_lock:
+        legislatures = sorted(seen_urls[profile_url])
+        done_profiles.add(profile_url)
+    journal.record({'type': 'profile', 'url': profile_url, 'legislatures': legislatures, 'record': senator})
+    print(f" → Processed: {senator['Short Name']}")
+
+#the scraping runs only when the script is executed, the parse processes import this file without running it
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scrape current and former Brazilian senators")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--resume', action='store_true', help="continue an interrupted run from its checkpoint journal")
+    mode.add_argument('--incremental', action='store_true',
+                      help="refetch only senators sitting at the last run and new profiles, reuse the other records")
+    args = parser.parse_args()
+
+    #responses are kept in the on-disk cache, unchanged pages are only revalidated on the next run
+    limiter = HostRateLimiter(requests_per_second, burst=per_host_limit)
+    session = make_session(headers, limiter=limiter, pool_maxsize=listing_workers + profile_workers)
+    parse_pool = ParsePool(parse_workers, max_pending_parses)
+    engine = FetchEngine(session, max_workers=listing_workers, per_host_limit=per_host_limit)
+    workers = [threading.Thread(target=profile_worker, daemon=True) for _ in range(profile_workers)]
+
+    #with --resume the journal is replayed once: finished pages rebuild seen_urls, finished profiles their records
+    #the last run's journal is kept as .previous until this run is complete; if an earlier incremental run did not
+    #finish, its .previous (the last complete run) is kept and the unfinished journal is started again
+    previous_path = checkpoint_path + '.previous'
+    if args.incremental and os.path.exists(checkpoint_path) and not os.path.exists(previous_path):
+        os.replace(checkpoint_path, previous_path)
+    journal = CheckpointJournal(checkpoint_path, resume=args.resume)
+    done_pages = {}
+    if args.resume:
+        for entry in journal.replay():
+            if entry['type'] == 'page' and entry['leg'] in legislatures_main:
+                done_pages[(entry['leg'], entry['page'])] = entry
+                leg_idx = legislatures_main.index(entry['leg'])
+                for profile_url, pos, sex in entry['profiles']:
+                    register_sighting(profile_url, entry['leg'], (leg_idx, entry['page'], pos), sex)
+            elif entry['type'] == 'profile':
+                done_profiles.add(entry['url'])
+        print(f"Resuming: {len(done_pages)} result pages and {len(done_profiles)} profiles restored from the checkpoint")
+        for profile_url, (order, sex) in first_seen.items():
+            if profile_url not in done_profiles:
+                profile_queue.put((profile_url, sex))
+
+    #with --incremental the pages of former senators (out of service) are not fetched again, their last record is reused
+    #all listing pages are still read so that new profiles are found, sitting senators are always refetched
+    #(their last record is kept too, and used when the refetch fails)
+    previous_sitting = {}
+    if args.incremental and os.path.exists(previous_path):
+        for entry in read_journal(previous_path):
+            if entry['type'] != 'profile':
                 continue
-
-print(f"Main scrape complete. Senators processed: {len(senators_data)}")
-
-###2. SCRAPPING INFO ABOUT SENATORS - PARTY and PART - ABBREVIATION FROM THE ALT_URL
-
-for leg in legislatures_alt:
-    print(f"Updating party data from legislature {leg}ª...")
-    leg_url = f"{alt_url}/{leg}"
-    try:
-        response_alt = session.get(leg_url)
-        if response_alt.status_code != 200:
-            print(f"Failed to fetch page for legislatura {leg} (status {response.status_code})")
-            continue
-        soup_alt = BeautifulSoup(response_alt.text, 'lxml')
-
-#going through all legislatures collect the senator name (short name) and party (abbreviation) he/she is member of
-
-        result = soup_alt.find('table', class_='table', id = 'senadoreslegislaturasanteriores-tabela-senadores')
-        if result:
-            rows = [
-                row for row in result.find('tbody').find_all('tr')
-                if row.get('data-suplente') in {'0','1'}
-            ]
-            for row in rows:
-                columns = row.find_all('td')
-                name_tag = columns[0].find('a')
-                s_name = name_tag.get_text(strip=True) if name_tag else safe_get_text(columns, 0)
-                party = safe_get_text(columns, 1)
-                if s_name:
-                    short_name_party_map[s_name] = party
+            if entry['record']['Status'] == "Sitting":
+                previous_sitting[entry['url']] = entry
+            else:
+                done_profiles.add(entry['url'])
+                journal.record(entry)
+        print(f"Incremental run: {len(done_profiles)} senators out of service reused from the last run")
+
+    for w in workers:
+        w.start()
+
+    #the first page of every legislature queues the pages its pagination shows, each page then queues the ones after it
+    #on resume the pages queued by the finished pages are queued again, minus the finished ones
+
+    for leg_idx, leg in enumerate(legislatures_main):
+        if (leg, 1) in done_pages:
+            queue_pages(leg_idx, leg, max(entry['page_count'] or 1 for (l, _), entry in done_pages.items() if l == leg))
+        else:
+            listing_futures.append(engine.submit(process_listing, leg_idx, leg, 1))
+
+    #a page is queued only by a page that is still running, so the list is empty once every page is done
+    while listing_futures:
+        future = listing_futures.pop(0)
+        try:
+            future.result()
+        except Exception as e:
+            print(f"Error processing a result page: {e}")
+
+    for _ in workers:
+        profile_queue.put(None)
+    for w in workers:
+        w.join()
+    engine.close()
+    parse_pool.close()
+    not_refetched = [entry for url, entry in previous_sitting.items() if url not in done_profiles]
+    for entry in not_refetched:
+        done_profiles.add(entry['url'])
+        journal.record(entry)
+    if not_refetched:
+        print(f"{len(not_refetched)} sitting senators could not be refetched, their record of the last run is kept")
+    journal.close()
+    print(f"Main scrape complete. Senators processed: {len(done_profiles & first_seen.keys())}")
+
+    ###2. SCRAPPING INFO ABOUT SENATORS - PARTY and PART - ABBREVIATION FROM THE ALT_URL
+
+    for leg in legislatures_alt:
+        print(f"Updating party data from legislature {leg}ª...")
+        leg_url = f"{alt_url}/{leg}"
+        try:
+            response_alt = session.get(leg_url)
+            if response_alt.status_code != 200:
+                print(f"Failed to fetch page for legislatura {leg} (status {response_alt.status_code})")
+                continue
+            soup_alt = BeautifulSoup(response_alt.text, 'lxml')
+
+    #going through all legislatures collect the senator name (short name) and party (abbreviation) he/she is member of
+
+            result = soup_alt.find('table', class_='table', id = 'senadoreslegislaturasanteriores-tabela-senadores')
+            if result:
+                rows = [
+                    row for row in result.find('tbody').find_all('tr')
+                    if row.get('data-suplente') in {'0','1'}
+                ]
+                for row in rows:
+                    columns = row.find_all('td')
+                    name_tag = columns[0].find('a')
+                    s_name = name_tag.get_text(strip=True) if name_tag else safe_get_text(columns, 0)
+                    party = safe_get_text(columns, 1)
+                    if s_name:
+                        short_name_party_map[s_name] = party
+            else:
+                print(f"No senators rable found for legislatura {leg}. Page structure may have changed.")
+        except Exception as e:
+            print(f"Error processing legislature {leg}: {e}")
+
+    #updating information on party affiliation for those senators we found on alternative website
+    #(applied to every record in step 4, when it is read back from the journal)
+
+    def update_party(senator):
+        if senator["Party"] == "N/A":
+            alt_party = short_name_party_map.get(senator["Short Name"])
+            if alt_party:
+                if alt_party == "-":
+                    alt_party = "S/Partido"
+                senator["Party"] = alt_party
+        return senator
+
+    ###3. GETTING THE FULL NAME OF THE PARTY AND ABBREVIATION FROM THE ALT URL
+
+    for leg in legislatures_alt:
+        print(f"Scraping party abbreviation-name pairs for legislature {leg}ª...")
+        party_url = f"{alt_url}/{leg}/por-partido"
+        try:
+            response_p = session.get(party_url)
+            soup_p = BeautifulSoup(response_p.text, 'lxml')
+            result_p = soup_p.find('table', class_='table', id = 'senadoreslegislaturasanteriores-tabela-senadores')
+            if result_p:
+                for party in result_p.find('tbody').find_all('tr', class_='search-group-row'):
+                    split_parts = party.get_text(strip=True).split(' - ', 1)
+
+                    if len(split_parts) != 2:
+                        continue
+                    party_abb = split_parts[0].strip()
+                    party_name = split_parts[1].strip()
+
+                    if party_abb not in party_fullname_map:
+                        party_fullname_map[party_abb] = party_name
+
+        except Exception as e:
+            print(f"Error scrapping party full names: {e}")
+
+    ###4. MERGE ALL TOGETHER AND EXPORT
+    #records are read back from the journal one at a time, in the order of their first appearance
+    #and with the sex read from that listing, and their rows go to the output through a buffered writer
+
+    offsets = index_journal(checkpoint_path, 'profile', 'url')
+
+    def senators():
+        with open(checkpoint_path, 'rb') as journal_file:
+            for url in sorted((url for url in offsets if url in first_seen), key=first_seen.get):
+                senator = read_entry(journal_file, offsets[url])['record']
+                senator["Sex"] = first_seen[url][1]
+                yield update_party(senator)
+
+    def senator_rows(sen):
+        base_info = {
+            "Full Name": sen["Full Name"],
+            "Short Name": sen["Short Name"],
+            "Date of Birth": sen["Date of Birth"],
+            "Place of Birth": sen["Place of Birth"],
+            "Sex": sen["Sex"],
+            "Status": sen["Status"],
+            #"Office": sen["Office"],
+            #"Phone": sen["Phone"],
+            #"E-mail": sen["E-mail"],
+            #"Supoffice": sen["Supoffice"],
+            "Party Abbreviation": sen["Party"],
+            "Party Full Name": party_fullname_map.get(sen["Party"], "N/A"),
+            "Position in party": sen["Position in party"],
+            "Education level": sen["Education level"],
+            "Number of terms in Senate": sen["Number of terms in Senate"],
+            "Position in the last ticket": sen["Position in the last ticket"],
+            "Commissions": ", ".join(sen.get("Commissions", [])) if sen.get("Commissions") else "N/A"
+        }
+
+        for i, prof in enumerate(sen.get("Professions", []), 1):
+            key = "Profession" if i == 1 else f"Profession_{i}"
+            base_info[key] = prof
+
+        if sen["Mandates"]:
+            for i, mandate in enumerate(sen["Mandates"], 1):
+                mandate_row = base_info.copy()
+                mandate_row["Mandate number"] = i
+                mandate_row["Mandate - Position"] = mandate["Position"]
+                mandate_row["Mandate - Start date"] = mandate["Start date"]
+                mandate_row["Mandate - End date"] = mandate["End date"]
+                yield mandate_row
         else:
-            print(f"No senators rable found for legislatura {leg}. Page structure may have changed.")
-    except Exception as e:
-        print(f"Error processing legislature {leg}: {e}")
-
-#updating information on party affiliation for those senators we found on alternative website
-
-for senator in senators_data:
-    if senator["Party"] == "N/A":
-        alt_party = short_name_party_map.get(senator["Short Name"])
-        if alt_party:
-            if alt_party == "-":
-                alt_party = "S/Partido"
-            senator["Party"] = alt_party
-
-###3. GETTING THE FULL NAME OF THE PARTY AND ABBREVIATION FROM THE ALT URL
-
-for leg in legislatures_alt:
-    print(f"Scraping party abbreviation-name pairs for legislature {leg}ª...")
-    party_url = f"{alt_url}/{leg}/por-partido"
-    try:
-        response_p = session.get(party_url)
-        soup_p = BeautifulSoup(response_p.text, 'lxml')
-        result_p = soup_p.find('table', class_='table', id = 'senadoreslegislaturasanteriores-tabela-senadores')
-        if result_p:
-            for party in result_p.find('tbody').find_all('tr', class_='search-group-row'):
-                split_parts = party.get_text(strip=True).split(' - ', 1)
-
-                if len(split_parts) != 2:
-                    continue
-                party_abb = split_parts[0].strip()
-                party_name = split_parts[1].strip()
-
-                if party_abb not in party_fullname_map:
-                    party_fullname_map[party_abb] = party_name
-
-    except Exception as e:
-        print(f"Error scrapping party full names: {e}")
-    time.sleep(0.1)
-
-###4. MERGE ALL TOGETHER AND EXPORT
-
-long_data = []
-for sen in senators_data:
-    base_info = {
-        "Full Name": sen["Full Name"],
-        "Short Name": sen["Short Name"],
-        "Date of Birth": sen["Date of Birth"],
-        "Place of Birth": sen["Place of Birth"],
-        "Sex": sen["Sex"],
-        "Status": sen["Status"],
-        #"Office": sen["Office"],
-        #"Phone": sen["Phone"],
-        #"E-mail": sen["E-mail"],
-        #"Supoffice": sen["Supoffice"],
-        "Party Abbreviation": sen["Party"],
-        "Party Full Name": party_fullname_map.get(sen["Party"], "N/A"),
-        "Position in party": sen["Position in party"],
-        "Education level": sen["Education level"],
-        "Number of terms in Senate": sen["Number of terms in Senate"],
-        "Position in the last ticket": sen["Position in the last ticket"],
-        "Commissions": ", ".join(sen.get("Commissions", [])) if sen.get("Commissions") else "N/A"
-    }
-
-
-    for i, prof in enumerate(sen.get("Professions", []), 1):
-        key = "Profession" if i == 1 else f"Profession_{i}"
-        base_info[key] = prof
-
-    if sen["Mandates"]:
-        for i, mandate in enumerate(sen["Mandates"], 1):
-            mandate_row = base_info.copy()
-            mandate_row["Mandate number"] = i
-            mandate_row["Mandate - Position"] = mandate["Position"]
-            mandate_row["Mandate - Start date"] = mandate["Start date"]
-            mandate_row["Mandate - End date"] = mandate["End date"]
-            long_data.append(mandate_row)
-    else:
-        no_mandate_row = base_info.copy()
-        no_mandate_row["Mandate number"] = "N/A"
-        no_mandate_row["Mandate - Position"] = "N/A"
-        no_mandate_row["Mandate - Start date"] = "N/A"
-        no_mandate_row["Mandate - End date"] = "N/A"
-        long_data.append(no_mandate_row)
-
-df = pd.DataFrame(long_data)
-df.to_csv(output_path, index=False, encoding='utf-8-sig')
-print(f"Data saved to CSV. Total rows: {len(df)}")
+            no_mandate_row = base_info.copy()
+            no_mandate_row["Mandate number"] = "N/A"
+            no_mandate_row["Mandate - Position"] = "N/A"
+            no_mandate_row["Mandate - Start date"] = "N/A"
+            no_mandate_row["Mandate - End date"] = "N/A"
+            yield no_mandate_row
+
+    #the header is known only after all rows (the number of Profession columns varies), a first pass collects it
+    columns = {}
+    for sen in senators():
+        for row in senator_rows(sen):
+            columns.update(dict.fromkeys(row))
+
+    with DatasetWriter(output_path, columns, output_format, column_types,
+                       partition_by=["Country", "Chamber"], partitions={"Country": "BR", "Chamber": "Senado"},
+                       buffer_rows=output_buffer_rows) as writer:
+        for sen in senators():
+            for row in senator_rows(sen):
+                writer.write(row)
+    print(f"Data saved to {writer.path}. Total rows: {writer.rows_written}")
+    if os.path.exists(previous_path):
+        os.remove(previous_path)
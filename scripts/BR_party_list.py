@@ -1,12 +1,15 @@
 from bs4 import BeautifulSoup
-import requests
-import time
 import pandas as pd
 from urllib.parse import urljoin, quote
+from http_cache import make_session
+from rate_limit import HostRateLimiter
+from dataset_output import write_dataset
 
 
 #before running change the path for saving the results (line 251)
 output_path = r'C:\Users\HONOR\Desktop\RA\Brazil\data\br_parties_data.csv'
+#output format: 'csv', or 'parquet' / 'feather' for a typed dataset folder partitioned by country and chamber (needs pyarrow, see dataset_output.py)
+output_format = 'csv'
 start_url = 'https://www25.senado.leg.br/web/senadores/legislaturas-anteriores/-/a'
 headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
 legislatures = [51, 52, 53, 54, 55, 56]
@@ -20,8 +23,9 @@ def safe_get_text(tags, index):
     except IndexError:
         return "N/A"
 
-session = requests.Session()
-session.headers.update(headers)
+#at most one request per second to the Senado website
+limiter = HostRateLimiter(requests_per_second=1)
+session = make_session(headers, limiter=limiter)
 
 for leg in legislatures:
     print(f"Processing legislature {leg}ª...")
@@ -57,8 +61,8 @@ for leg in legislatures:
 
     else:
         print(f"Table not found for legislature {leg}. Page structure may have changed.")
-    time.sleep(1)
 
 df = pd.DataFrame(parties_data)
-df.to_csv(output_path, index=False, encoding='utf-8-sig')
-print(f"Data saved to CSV. Total rows: {len(df)}")
+saved_path = write_dataset(df, output_path, output_format,
+                           partition_by=["Country", "Chamber"], partitions={"Country": "BR", "Chamber": "Senado"})
+print(f"Data saved to {saved_path}. Total rows: {len(df)}")
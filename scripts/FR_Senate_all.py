@@ -1,16 +1,32 @@
-import requests
+import os
 import pandas as pd
-from io import BytesIO
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 import re
 import time
+from http_cache import make_session
+from download_manager import DownloadManager
+from dataset_output import write_dataset
+from date_normalize import normalize_dates
 
 ###INSTALL xlrd BEFORE RUNNING IF NOT ALREADY INSTALLED
 ###CHANGE THESE PATHS BEFORE RUNNING THE CODE###
 
 output_path = r'C:\Users\HONOR\Desktop\RA\France\data\FR_senators_all_1999_2024.csv'
 filter_csv_path = r'C:\Users\HONOR\Desktop\RA\France\data\senmat.csv'
+#the .xls is downloaded to this folder, and only downloaded again when it changed on the server
+download_dir = os.path.dirname(output_path)
+#output format: 'csv', or 'parquet' / 'feather' for a typed dataset folder partitioned by country and chamber (needs pyarrow, see dataset_output.py)
+output_format = 'csv'
+#True keeps the date columns as real dates (written as yyyy-mm-dd in a CSV) instead of dd/mm/yyyy strings
+keep_datetimes = False
+column_types = {
+    "Civil Status": "category", "Sex": "category", "Status": "category", "Date of Birth": "date", "Date of Death": "date",
+    "Political Group": "category", "Type of membership in the political group": "category", "Committee": "category",
+    "Constituency": "category", "Position in the Senate Office": "category", "Socio-Professional Category": "category",
+    "Professional category": "category", "Mandate Start Date": "date", "Election Date": "date", "Mandate End Date": "date",
+    "Code Starting the Mandate": "category", "Code Ending the Mandate": "category"
+}
 
 ###Download the .xls file with the main information about former nad current senators
 
@@ -18,7 +34,8 @@ base_url = "https://data.senat.fr/les-senateurs/"
 
 try:
     print("Downloading the senators .xls dataset...")
-    response = requests.get(base_url, timeout=15)
+    session = make_session()
+    response = session.get(base_url, timeout=15)
     response.raise_for_status()
     soup = BeautifulSoup(response.text, 'lxml')
     data_tag = soup.find('a', title ='Informations générales sur les sénateurs - Format .xls')
@@ -28,10 +45,10 @@ try:
 
     else:
         data_url = urljoin(base_url, data_tag['href'])
-        resp = requests.get(data_url, timeout=15)
-        resp.raise_for_status()
+        xls_path = os.path.join(download_dir, os.path.basename(urlsplit(data_url).path) or 'senateurs.xls')
+        DownloadManager().download(data_url, xls_path)
 
-        df = pd.read_excel(BytesIO(resp.content), sheet_name=0)
+        df = pd.read_excel(xls_path, sheet_name=0)
         print("Data successfully loaded into DataFrame.")
 
 #clean and rename the dataframe
@@ -55,8 +72,8 @@ try:
             'Description de la profession': 'Profession Description'
         })
 
-        df['Date of Birth'] = pd.to_datetime(df['Date of Birth'], errors='coerce').dt.strftime('%d/%m/%Y')
-        df['Date of Death'] = pd.to_datetime(df['Date of Death'], errors='coerce').dt.strftime('%d/%m/%Y')
+        df['Date of Birth'] = normalize_dates(df['Date of Birth'], as_datetime=keep_datetimes)
+        df['Date of Death'] = normalize_dates(df['Date of Death'], as_datetime=keep_datetimes)
 
 
 #based on Civil Status define Sex and add Sex column
@@ -73,7 +90,7 @@ try:
 
         for col in ['eludatdeb', 'eludatelu', 'eludatfin']:
             if col in df2.columns:
-                df2[col] = pd.to_datetime(df2[col], errors='coerce').dt.strftime('%d/%m/%Y')
+                df2[col] = normalize_dates(df2[col], as_datetime=keep_datetimes)
 
         df2 = df2.fillna('N/A')
         df2 = df2.rename(columns={'senmat' : 'Matriculation'})
@@ -108,9 +125,10 @@ try:
 
         print(f"Merged data frame contains {len(merged_df)} rows.")
 
-# Save to CSV
-        merged_df.to_csv(output_path, index=False, encoding='utf-8-sig')
-        print("Merged data saved to FR_senators_all_1999_2024.csv")
+# Save (CSV by default)
+        saved_path = write_dataset(merged_df, output_path, output_format, column_types,
+                                   partition_by=["Country", "Chamber"], partitions={"Country": "FR", "Chamber": "Senat"})
+        print(f"Merged data saved to {saved_path}")
 
 except Exception as e:
     print(f"An error occurred: {e}")
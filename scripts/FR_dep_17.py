@@ -1,20 +1,47 @@
-import requests
+import os
 import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from io import StringIO
+from download_manager import DownloadManager
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from http_cache import make_session
+from browser_pool import BrowserPool, table_frame
+from dataset_output import write_dataset
+from date_normalize import normalize_dates
+from name_match import merge_on_names
 
 
 output_path = r"C:\Users\HONOR\Desktop\RA\France\data\FR_dep17_full.csv"
+#the data.gouv CSV is downloaded here, and only downloaded again when it changed on the server
+gouv_csv_path = os.path.join(os.path.dirname(output_path), "deputes-actifs.csv")
+#deputies whose name could not be matched between the two sources (or matched several) are listed here
+name_report_path = os.path.splitext(output_path)[0] + "_unmatched_names.csv"
+#output format: 'csv', or 'parquet' / 'feather' for a typed dataset folder partitioned by country, chamber and legislature (needs pyarrow, see dataset_output.py)
+output_format = 'csv'
+#True keeps the date columns as real dates (written as yyyy-mm-dd in a CSV) instead of dd/mm/yyyy strings
+keep_datetimes = False
+column_types = {
+    "Civil Status": "category", "Sex": "category", "Date of Birth": "date", "Age": "int",
+    "Group": "category", "Group Abbreviation": "category", "Department": "category", "Constituency": "int",
+    "Start Date of Current Mandate": "date", "Number of Parliamentary Terms": "int",
+    "Participation Score": "float", "Speciality Participation Score": "float", "Loyalty Score": "float",
+    "Proximity to Majority": "float", "Last Update": "date", "Region": "category",
+    "Socio-Professional category": "category", "Socio-Professional family": "category"
+}
+#the multicriteria search runs in a headless Chrome of browser_pool.py; False shows the browser window
+headless = True
+#True reads the results table inside the browser (one execute_script returning its text, see browser_pool.py),
+#False transfers its outerHTML and parses it with pd.read_html
+extract_in_browser = True
 
 #1. DOWNLOAD the CSV with current deputies data from data.gouv.fr
 url = 'https://www.data.gouv.fr/datasets/deputes-actifs-de-lassemblee-nationale-informations-et-statistiques/'
 print("Fetching the webpage...")
-response = requests.get(url, timeout=30)
+session = make_session()
+response = session.get(url, timeout=30)
 response.raise_for_status()
 soup = BeautifulSoup(response.text, 'lxml')
 
@@ -25,10 +52,9 @@ if not csv_tag:
 csv_url = urljoin(url, csv_tag['href'])
 print(f"Found CSV URL: {csv_url}")
 
-resp_csv = requests.get(csv_url, timeout=30)
-response.raise_for_status()
+DownloadManager().download(csv_url, gouv_csv_path)
 
-df_gouv = pd.read_csv(StringIO(resp_csv.content.decode('utf-8')), sep=",", encoding='utf-8')
+df_gouv = pd.read_csv(gouv_csv_path, sep=",", encoding='utf-8')
 #renaming and reordering columns
 gouv_renames = {
     "id": "Deputy ID", "legislature": "Legislature",
@@ -54,39 +80,38 @@ df_gouv = df_gouv[ordered + [c for c in df_gouv.columns if c not in ordered]]
 
 #2. SCRAPING ADDITIONAL INFORMATION ABOUT CURRENT DEPUTIES
 
-driver = webdriver.Chrome()
-driver.get("https://www2.assemblee-nationale.fr/deputes/recherche-multicritere")
-WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "infosGenFiche")))
 checkbox_names = [
     "infosGenNom", "infosGenPrenom", "infosGenCiv", "infosGenGroupe",
     "infosGenDept", "infosGenRegion", "infosGenCirc", "infosGenComper",
     "infosGenCatSocio", "infosGenFamSocio", "infosGenDateNaiss"
 ]
 
-for name in checkbox_names:
-    try:
-        cb = driver.find_element(By.NAME, name)
-        if not cb.is_selected():
-            cb.click()
-    except:
-        pass
-WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.XPATH, "//button[@type='submit']")))
-driver.find_element(By.XPATH, "//button[@type='submit']").click()
-WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, "//table")))
-tbl_html = driver.find_element(By.XPATH, "//table").get_attribute('outerHTML')
-driver.quit()
-
-df_web = pd.read_html(StringIO(tbl_html))[0]
+with BrowserPool(1, headless=headless) as pool, pool.driver() as driver:
+    driver.get("https://www2.assemblee-nationale.fr/deputes/recherche-multicritere")
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "infosGenFiche")))
+
+    for name in checkbox_names:
+        try:
+            cb = driver.find_element(By.NAME, name)
+            if not cb.is_selected():
+                cb.click()
+        except:
+            pass
+    WebDriverWait(driver, 10).until(EC.presence_of_all_elements_located((By.XPATH, "//button[@type='submit']")))
+    driver.find_element(By.XPATH, "//button[@type='submit']").click()
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, "//table")))
+    if extract_in_browser:
+        df_web = table_frame(driver, "table")
+    else:
+        tbl_html = driver.find_element(By.XPATH, "//table").get_attribute('outerHTML')
+        df_web = pd.read_html(StringIO(tbl_html))[0]
 
 # Optionally rename columns to match
 df_web.rename(columns={"Prénom" : "First Name", "Nom" :"Last Name", "Civilite" : "Civil Status"}, inplace=True)
 
 #3. MERGING BOTH DATA FRAMES ON COLUMNS NAME
-df_web["__merge_key"] = df_web["Last Name"].str.strip() + " " + df_web["First Name"].str.strip()
-df_gouv["__merge_key"] = df_gouv["Last Name"].str.strip() + " " + df_gouv["First Name"].str.strip()
-
+#names are compared without accents, hyphens, particles and titles (see name_match.py)
 columns_to_add = [
-    "__merge_key",
     "Région",
     "Commission",
     "Cat. socioprof.",
@@ -94,14 +119,16 @@ columns_to_add = [
 ]
 df_web_subset = df_web[columns_to_add]
 
-df_merged = pd.merge(
+df_merged = merge_on_names(
     df_gouv,
     df_web_subset,
+    df_gouv["Last Name"] + " " + df_gouv["First Name"],
+    df_web["Last Name"] + " " + df_web["First Name"],
     how="left",
-    on="__merge_key"
+    report_path=name_report_path
 )
 
-df_merged = df_merged.drop(columns=[col for col in ["__merge_key", "mail", "twitter", "facebook", "website"] if col in df_merged.columns])
+df_merged = df_merged.drop(columns=[col for col in ["mail", "twitter", "facebook", "website"] if col in df_merged.columns])
 
 #also dropping columns with links to socials
 
@@ -120,9 +147,10 @@ date_columns = [
 
 for col in date_columns:
     if col in df_merged.columns:
-        df_merged[col] = pd.to_datetime(df_merged[col], errors='coerce').dt.strftime('%d/%m/%Y')
+        df_merged[col] = normalize_dates(df_merged[col], as_datetime=keep_datetimes)
 
 # Final tweaks and save
 print(df_merged.head())
-df_merged.to_csv(output_path, index=False, encoding='utf-8-sig')
-print("Merged dataset saved as 'FR_dep17_full.csv'")
+saved_path = write_dataset(df_merged, output_path, output_format, column_types,
+                           partition_by=["Country", "Chamber", "Legislature"], partitions={"Country": "FR", "Chamber": "Assemblee"})
+print(f"Merged dataset saved as '{os.path.basename(saved_path)}'")
@@ -0,0 +1,139 @@
+from requests.packages.urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from http_cache import make_session
+from rate_limit import HostRateLimiter
+from parse_pool import ParsePool
+from assemblee_legislature import LegislatureScraper, deputy_id
+import os
+import argparse
+from checkpoint import CheckpointJournal
+from dataset_output import write_dataset
+
+
+#FR_dep_11.py for every legislature of the old assemblee-nationale.fr pages at once
+#the legislatures are scraped concurrently but share one session (connection pool and cache), one rate limit for
+#the website, one pool of profile download threads and one pool of parse processes, so running them together costs
+#the website no more than one scraper running flat out
+#every legislature is isolated: its own checkpoint journal, name report and finished table in work_dir; a failed
+#legislature does not stop the others and --resume only scrapes what is not finished yet
+#the output is one table keyed by deputy (the id of their fiche) and legislature
+
+#CHANGE THIS PATH BEFORE RUNNING THE CODE
+#install the libraries if not installed
+#pip install beautifulsoup4 pandas requests lxml (and selenium for the browser fallback)
+
+output_path = r"C:\Users\HONOR\Desktop\RA\France\data\FR_dep_all_legislatures.csv"
+work_dir = os.path.splitext(output_path)[0] + '_work'
+legislatures = list(range(1, 12))
+#output format: 'csv', or 'parquet' / 'feather' for a typed dataset folder partitioned by country, chamber and legislature (needs pyarrow, see dataset_output.py)
+output_format = 'csv'
+column_types = {
+    "Legislature": "int", "Civil Status": "category", "Sex": "category", "Date of Birth": "date",
+    "Political Group": "category", "Mandate Start Date": "date", "Mandate End Date": "date", "Electoral Region": "category",
+    "Electoral Department": "category", "Standing Committee": "category",
+    "Socio-Professional category": "category", "Socio-Professional family": "category"
+}
+
+#legislatures scraped at the same time (each holds its search table and profiles in memory)
+legislature_workers = 4
+#the budget shared by all the legislatures: profile download threads and requests per second to the website
+profile_workers = 10
+requests_per_second = 5
+#profile pages are parsed in separate processes: number of parse processes and max pages waiting for them
+parse_workers = os.cpu_count()
+max_pending_parses = 32
+#'http' replays the search form (Selenium as fallback, see assemblee_search.py), 'selenium' always uses the browser
+table_backend = 'http'
+
+
+def legislature_path(legislature, suffix):
+    return os.path.join(work_dir, f"legislature_{legislature}{suffix}")
+
+def scrape_legislature(legislature):
+    #the finished table of one legislature, from work_dir when a previous run finished it
+    table_path = legislature_path(legislature, '.csv')
+    if args.resume and os.path.exists(table_path):
+        print(f"[{legislature}] Already scraped, taken from {table_path}")
+        return pd.read_csv(table_path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+
+    journal = CheckpointJournal(legislature_path(legislature, '_checkpoint.jsonl'), resume=args.resume)
+    journals.append(journal)
+    done = [(entry['url'], entry['record']) for entry in journal.replay()] if args.resume else []
+    if done:
+        print(f"[{legislature}] Resuming: {len(done)} profiles restored from the checkpoint")
+
+    df = scraper.scrape(legislature, journal, done, legislature_path(legislature, '_unmatched_names.csv'))
+    df.insert(0, 'Legislature', legislature)
+    df.insert(0, 'Deputy ID', df['Profile URL'].map(deputy_id, na_action='ignore'))
+    df = df.drop(columns=['Profile URL'])
+    df.to_csv(table_path, index=False, encoding='utf-8-sig')
+    print(f"[{legislature}] {len(df)} deputies")
+    return df
+
+def scrape_safe(legislature):
+    try:
+        return legislature, scrape_legislature(legislature), None
+    except Exception as e:
+        return legislature, None, e
+
+#the scraping runs only when the script is executed, the parse processes import this file without running it
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scrape the deputies of every legislature of the old Assemblee pages")
+    parser.add_argument('--resume', action='store_true', help="keep the legislatures and profiles finished by a previous run")
+    parser.add_argument('--legislatures', type=int, nargs='+', default=legislatures, help="legislatures to scrape")
+    args = parser.parse_args()
+    os.makedirs(work_dir, exist_ok=True)
+
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+    limiter = HostRateLimiter(requests_per_second, burst=profile_workers)
+    session = make_session(headers, limiter=limiter, max_retries=retry_strategy,
+                           pool_maxsize=profile_workers + legislature_workers)
+
+    journals = []
+    tables = {}
+    failed = {}
+    try:
+        with ThreadPoolExecutor(max_workers=profile_workers) as executor, ParsePool(parse_workers, max_pending_parses) as parse_pool:
+            scraper = LegislatureScraper(session, executor, parse_pool, table_backend, browser_pool_size=legislature_workers)
+            try:
+                with ThreadPoolExecutor(max_workers=legislature_workers) as legislature_executor:
+                    for legislature, df, error in legislature_executor.map(scrape_safe, args.legislatures):
+                        if error is None:
+                            tables[legislature] = df
+                        else:
+                            failed[legislature] = error
+                            print(f"[{legislature}] Failed: {error}")
+            finally:
+                scraper.close()
+    finally:
+        #closed after the parse pool, whose last results are journaled from its own thread
+        for journal in journals:
+            journal.close()
+
+    if not tables:
+        raise SystemExit("No legislature could be scraped")
+
+    #one row per deputy and legislature (rows whose profile was not found have no id and are all kept)
+    df_all = pd.concat([tables[legislature] for legislature in sorted(tables)], ignore_index=True)
+    df_all['Legislature'] = df_all['Legislature'].astype(int)
+    keyed = df_all['Deputy ID'].notna() & (df_all['Deputy ID'] != '')
+    duplicated = keyed & df_all.duplicated(subset=['Deputy ID', 'Legislature'])
+    if duplicated.any():
+        print(f"Dropping {duplicated.sum()} rows repeating a deputy of the same legislature")
+        df_all = df_all[~duplicated]
+    df_all = df_all.sort_values(['Legislature', 'Last Name', 'First Name'], kind='stable').reset_index(drop=True)
+
+    saved_path = write_dataset(df_all, output_path, output_format, column_types,
+                               partition_by=["Country", "Chamber", "Legislature"],
+                               partitions={"Country": "FR", "Chamber": "Assemblee"})
+    print(f"Final dataset saved: {saved_path} ({len(df_all)} rows, legislatures {sorted(tables)})")
+    if failed:
+        print(f"Legislatures that failed: {sorted(failed)}, run again with --resume to scrape only them")
@@ -1,12 +1,16 @@
 import os
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import zipfile
 import glob
-import json
-import csv
-import pandas as pd
+from http_cache import make_session
+from download_manager import DownloadManager
+from collections import deque
+from row_writer import StreamingJSONArrayWriter, StreamingNDJSONWriter
+from dataset_output import DatasetWriter
+from date_normalize import normalize_dates
+from parse_pool import ParsePool
+from acteur_parse import parse_acteur_batch
 
 # === CONFIGURATION ===
 base_url = 'https://data.assemblee-nationale.fr'
@@ -15,128 +19,95 @@ zip_download_dir = r"D:\Downloads"
 zip_extract_dir = r"C:\Users\HONOR\Desktop\RA\France\data"
 output_csv = os.path.join(zip_extract_dir, "FR_dep_combined.csv")
 combined_json_path = os.path.join(zip_extract_dir, "combined_filtered.json")
+#'json': combined_filtered.json as one indented JSON array, as before
+#'ndjson': combined_filtered.ndjson, one row per line, compressed with combined_json_compression = 'gzip' or 'zstd'
+#(.ndjson.gz / .ndjson.zst, zstd needs the zstandard package); read it back row by row with row_writer.read_ndjson,
+#e.g. read_ndjson(path, legislature=17, typeOrgane="ASSEMBLEE")
+combined_json_format = 'json'
+combined_json_compression = None
+#output format: 'csv', or 'parquet' / 'feather' for a typed dataset folder partitioned by country, chamber and legislature (needs pyarrow, see dataset_output.py)
+output_format = 'csv'
+#True keeps the date columns as real dates (written as yyyy-mm-dd in a CSV) instead of dd/mm/yyyy strings
+keep_datetimes = False
+column_types = {
+    "Civil Status": "category", "Sex": "category", "Date of Birth": "date", "Birth Department": "category",
+    "Socio-Professional category": "category", "Socio-Professional family": "category",
+    "Mandate Start Date": "date", "Mandate End Date": "date", "Type of Organe": "category", "Position": "category"
+}
+
+#False: the acteur files are read straight out of the downloaded zip (ZipFile.open), nothing is written to zip_extract_dir
+#True: the archive is extracted to zip_extract_dir first and the files are read from there, as before
+extract_zip = False
+
+#the acteur files are decoded and flattened into mandate rows by a pool of processes, in batches of files
+#with parse_workers 0 or 1 (e.g. on a single core machine) they are parsed one batch after the other in this process
+#the rows are written in file order whatever the number of processes, so the output is the same
+parse_workers = os.cpu_count()
+files_per_batch = 200
+max_pending_batches = 16
 
 # === ORGANE TYPES TO KEEP ===
 valid_type_organe = {"BUREAU", "ASSEMBLEE"}
 # e.g. Add "COMPER", "GP", "ORGEXTPARL" to get more mandate types
 
-# === STEP 1: FETCH ZIP LINK FROM WEBPAGE ===
-print("Fetching the webpage...")
-
-response = requests.get(page_url, timeout=30)
-response.raise_for_status()
-soup = BeautifulSoup(response.text, 'lxml')
-
-zip_link_tag = soup.find('a', href=lambda x: x and x.endswith('.json.zip'))
-if not zip_link_tag:
-    raise Exception("No .json.zip link found on the page.")
-
-zip_url = urljoin(base_url, zip_link_tag['href'])
-zip_filename = os.path.basename(zip_url)
-zip_path = os.path.join(zip_download_dir, zip_filename)
-
-print(f"Found ZIP URL: {zip_url}")
-print(f"Downloading to: {zip_path}")
-
-# === STEP 2: DOWNLOAD ZIP ===
-with requests.get(zip_url, stream=True) as r:
-    r.raise_for_status()
-    with open(zip_path, 'wb') as f:
-        for chunk in r.iter_content(chunk_size=8192):
-            f.write(chunk)
-
-print("Download completed.")
-
-# === STEP 3: UNZIP CONTENTS ===
-print(f"Extracting to: {zip_extract_dir}")
-os.makedirs(zip_extract_dir, exist_ok=True)
-
-with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-    zip_ref.extractall(zip_extract_dir)
-
-print("Extraction completed.")
-
 # === STEP 4: READ JSON FILES AND CREATE UNIFIED JSON LIST ===
-def safe_get_string(value):
-    #Return a cleaned string or None if the value is not a string
-    return value.strip() if isinstance(value, str) else None
-
-acteur_dir = os.path.join(zip_extract_dir, "json", "acteur")
-if not os.path.isdir(acteur_dir):
-    raise FileNotFoundError(f"Folder not found: {acteur_dir}")
-
-json_files = glob.glob(os.path.join(acteur_dir, "*.json"))
-print(f"Found {len(json_files)} JSON files to process...")
-
-combined_data = []
-
-for file_path in json_files:
-    try:
-        with open(file_path, 'r', encoding='utf-8-sig') as file:
-            data = json.load(file)
-    except Exception as e:
-        print(f"Skipping {file_path} due to error: {e}")
-        continue
-
-    acteur = data.get("acteur", {})
-    etat_civil = acteur.get("etatCivil", {})
-    ident = etat_civil.get("ident", {})
-    info_naissance = etat_civil.get("infoNaissance", {})
-    profession = acteur.get("profession", {})
-    soc_proc = profession.get("socProcINSEE", {})
-
-    nom = safe_get_string(ident.get("nom", ""))
-    prenom = safe_get_string(ident.get("prenom", ""))
-    civ = safe_get_string(ident.get("civ", ""))
-    date_naissance = safe_get_string(info_naissance.get("dateNais", ""))
-    lieu_naissance = safe_get_string(info_naissance.get("villeNais", ""))
-    dep_naissance = safe_get_string(info_naissance.get("depNais", ""))
-    profession_libelle = safe_get_string(profession.get("libelleCourant", ""))
-    cat_soc_pro = safe_get_string(soc_proc.get("catSocPro", ""))
-    fam_soc_pro = safe_get_string(soc_proc.get("famSocPro", ""))
-
-    mandats = acteur.get("mandats", {}).get("mandat", [])
-
-    for mandat in mandats:
-        if not isinstance(mandat, dict):
-            continue
-
-        type_organe = safe_get_string(mandat.get("typeOrgane", "")).upper() if mandat.get("typeOrgane") else ""
-        if type_organe not in valid_type_organe:
-            continue
-
-        entry = {
-            "nom": nom,
-            "prenom": prenom,
-            "civ": civ,
-            "dateNaissance": date_naissance,
-            "lieuNaissance": lieu_naissance,
-            "depNais": dep_naissance,
-            "profession": profession_libelle,
-            "catSocPro": cat_soc_pro,
-            "famSocPro": fam_soc_pro,
-            "uid": safe_get_string(mandat.get("uid")),
-            "acteurRef": safe_get_string(mandat.get("acteurRef")),
-            "legislature": safe_get_string(mandat.get("legislature")),
-            "typeOrgane": type_organe,
-            "dateDebut": safe_get_string(mandat.get("dateDebut")),
-            "dateFin": safe_get_string(mandat.get("dateFin")),
-            "libQualite": safe_get_string(mandat.get("infosQualite", {}).get("libQualite")),
-            "organeRef": safe_get_string(mandat.get("organes", {}).get("organeRef"))
-        }
-        combined_data.append(entry)
-
-# === STEP 5: SAVE COMBINED JSON (OPTIONAL) ===
-with open(combined_json_path, 'w', encoding='utf-8-sig') as f_json:
-    json.dump(combined_data, f_json, ensure_ascii=False, indent=2)
-
-print(f"Combined JSON saved to: {combined_json_path}")
+def is_acteur_member(name):
+    #same files as glob("json/acteur/*.json") on the extracted folder
+    folder, _, filename = name.rpartition('/')
+    return folder == "json/acteur" and filename.endswith(".json")
+
+def acteur_batches(zip_path, acteur_dir):
+    #yields lists of (file name, raw bytes) read from the extracted folder or directly from the zip members
+    #only the reading is done here, decoding and flattening are left to parse_acteur_batch
+    if extract_zip:
+        json_files = glob.glob(os.path.join(acteur_dir, "*.json"))
+        print(f"Found {len(json_files)} JSON files to process...")
+        batch = []
+        for file_path in json_files:
+            with open(file_path, 'rb') as file:
+                batch.append((file_path, file.read()))
+            if len(batch) >= files_per_batch:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        members = [member for member in zip_ref.infolist() if is_acteur_member(member.filename)]
+        if not members:
+            raise FileNotFoundError(f"No json/acteur/*.json files in {zip_path}")
+        print(f"Found {len(members)} JSON files to process...")
+        for start in range(0, len(members), files_per_batch):
+            yield [(member.filename, zip_ref.read(member)) for member in members[start:start + files_per_batch]]
+
+def parsed_batches(zip_path, acteur_dir):
+    #yields the results of parse_acteur_batch in the order of the files
+    if (parse_workers or 0) <= 1:
+        for batch in acteur_batches(zip_path, acteur_dir):
+            yield parse_acteur_batch(batch, valid_type_organe)
+        return
+
+    with ParsePool(parse_workers, max_pending_batches) as pool:
+        pending = deque()
+        for batch in acteur_batches(zip_path, acteur_dir):
+            pending.append(pool.submit(parse_acteur_batch, batch, valid_type_organe))
+            #finished batches at the head of the queue are written while the next ones are read
+            while pending and (pending[0].done() or len(pending) >= max_pending_batches):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+#the keys of every combined entry, in order
+combined_columns = [
+    "nom", "prenom", "civ", "dateNaissance", "lieuNaissance", "depNais", "profession", "catSocPro", "famSocPro",
+    "uid", "acteurRef", "legislature", "typeOrgane", "dateDebut", "dateFin", "libQualite", "organeRef"
+]
+rows_buffer = 5000
 
 # === STEP 6: WRITE TO CSV ===
-# Convert combined_data (list of dicts) to a pandas DataFrame
-df = pd.DataFrame(combined_data)
-
-# === RENAME COLUMNS ===
+#rows are written while the acteur files are read, a chunk of rows at a time (see row_writer.py)
+#each chunk gets the renaming, Sex column, date formatting and column order of the final CSV
 
 column_renames = {
     "nom": "Last Name",
@@ -156,25 +127,13 @@ column_renames = {
     "libQualite": "Position"
 }
 
-df.rename(columns=column_renames, inplace=True)
-
-df['Sex'] = df['Civil Status'].str.lower().map({
-    'mme': 'Female', 'm.': 'Male'
-}).fillna('N/A')
-
 #drop unwanted columns
 columns_to_drop = ["uid", "organeRef"]
-df.drop(columns=[col for col in columns_to_drop if col in df.columns], inplace=True)
 
 date_columns = [
     "Date of Birth", "Mandate Start Date", "Mandate End Date"
 ]
 
-for col in date_columns:
-    if col in df.columns:
-        df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%d/%m/%Y')
-
-
 desired_order = [
     "Last Name", "First Name", "Deputy ID", "Civil Status", "Sex",
     "Date of Birth", "Place of Birth", "Birth Department",
@@ -182,9 +141,86 @@ desired_order = [
     "Legislature", "Mandate Start Date", "Mandate End Date", "Type of Organe", "Position"
 ]
 
-ordered_cols = [col for col in desired_order if col in df.columns]
-df = df[ordered_cols + [col for col in df.columns if col not in ordered_cols]]
-
-# === SAVE FINAL CSV ===
-df.to_csv(output_csv, index=False, encoding="utf-8-sig")
-print(f"Cleaned and renamed CSV saved at:\n{output_csv}")
+def finish_chunk(df):
+    # === RENAME COLUMNS ===
+    df = df.rename(columns=column_renames)
+
+    df['Sex'] = df['Civil Status'].str.lower().map({
+        'mme': 'Female', 'm.': 'Male'
+    }).fillna('N/A')
+
+    df = df.drop(columns=[col for col in columns_to_drop if col in df.columns])
+
+    for col in date_columns:
+        if col in df.columns:
+            df[col] = normalize_dates(df[col], as_datetime=keep_datetimes)
+
+    ordered_cols = [col for col in desired_order if col in df.columns]
+    return df[ordered_cols + [col for col in df.columns if col not in ordered_cols]]
+
+#the parse processes import this script on Windows, the scraping itself only runs when it is executed
+if __name__ == '__main__':
+    # === STEP 1: FETCH ZIP LINK FROM WEBPAGE ===
+    print("Fetching the webpage...")
+
+    #the page goes through the on-disk cache, the zip through the download manager
+    session = make_session()
+    response = session.get(page_url, timeout=30)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, 'lxml')
+
+    zip_link_tag = soup.find('a', href=lambda x: x and x.endswith('.json.zip'))
+    if not zip_link_tag:
+        raise Exception("No .json.zip link found on the page.")
+
+    zip_url = urljoin(base_url, zip_link_tag['href'])
+    zip_filename = os.path.basename(zip_url)
+    zip_path = os.path.join(zip_download_dir, zip_filename)
+
+    print(f"Found ZIP URL: {zip_url}")
+    print(f"Downloading to: {zip_path}")
+
+    # === STEP 2: DOWNLOAD ZIP ===
+    #skipped when the archive did not change since the last run, resumed if interrupted, CRC-checked before use
+    DownloadManager().download(zip_url, zip_path)
+
+    print("Download completed.")
+
+    # === STEP 3: UNZIP CONTENTS (ONLY WITH extract_zip) ===
+    os.makedirs(zip_extract_dir, exist_ok=True)
+    acteur_dir = os.path.join(zip_extract_dir, "json", "acteur")
+
+    if extract_zip:
+        print(f"Extracting to: {zip_extract_dir}")
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            zip_ref.extractall(zip_extract_dir)
+        print("Extraction completed.")
+
+        if not os.path.isdir(acteur_dir):
+            raise FileNotFoundError(f"Folder not found: {acteur_dir}")
+
+    # === STEP 4 (continued) + STEP 5: READ THE FILES, STREAMING THE ROWS TO THE COMBINED JSON AND THE CSV ===
+    if combined_json_format == 'ndjson':
+        combined_json_path = os.path.splitext(combined_json_path)[0] + '.ndjson' + {None: '', 'gzip': '.gz', 'zstd': '.zst'}[combined_json_compression]
+        json_writer = StreamingNDJSONWriter(combined_json_path, buffer_rows=rows_buffer)
+    else:
+        json_writer = StreamingJSONArrayWriter(combined_json_path, buffer_rows=rows_buffer)
+    csv_writer = DatasetWriter(output_csv, combined_columns, output_format, column_types,
+                               partition_by=["Country", "Chamber", "Legislature"], partitions={"Country": "FR", "Chamber": "Assemblee"},
+                               buffer_rows=rows_buffer, transform=finish_chunk)
+
+    for results in parsed_batches(zip_path, acteur_dir):
+        for file_path, entries, error in results:
+            if error is not None:
+                print(f"Skipping {file_path} due to error: {error}")
+                continue
+            for entry in entries:
+                json_writer.write(entry)
+                csv_writer.write(entry)
+
+    json_writer.close()
+    print(f"Combined JSON saved to: {combined_json_path}")
+
+    # === SAVE FINAL CSV ===
+    csv_writer.close()
+    print(f"Cleaned and renamed data saved at:\n{csv_writer.path}")
@@ -0,0 +1,93 @@
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+#decoding and flattening of the acteur files of the assemblee open data (json/acteur/*.json), kept apart from
+#FR_dep_main.py so that it can run in the processes of parse_pool.ParsePool
+#the work is sent in batches of files: one task per file would cost more in inter-process traffic than the parsing
+#orjson is used when installed (pip install orjson), it decodes the files several times faster than json
+
+default_decoder = 'orjson' if orjson is not None else 'json'
+
+
+def safe_get_string(value):
+    #Return a cleaned string or None if the value is not a string
+    return value.strip() if isinstance(value, str) else None
+
+def decode_json(raw, decoder=default_decoder):
+    #raw: the bytes of one file, with or without a utf-8 BOM
+    if decoder == 'orjson':
+        try:
+            return orjson.loads(raw[3:] if raw.startswith(codecs.BOM_UTF8) else raw)
+        except orjson.JSONDecodeError:
+            #not utf-8 or not strict JSON: json gives the same result / error message as the serial path
+            pass
+    #json.loads detects the encoding of the bytes and drops a utf-8 BOM
+    return json.loads(raw)
+
+
+def acteur_entries(data, valid_type_organe):
+    #one entry per mandate of a kept organe type, with the civil status of the acteur
+    acteur = data.get("acteur", {})
+    etat_civil = acteur.get("etatCivil", {})
+    ident = etat_civil.get("ident", {})
+    info_naissance = etat_civil.get("infoNaissance", {})
+    profession = acteur.get("profession", {})
+    soc_proc = profession.get("socProcINSEE", {})
+
+    nom = safe_get_string(ident.get("nom", ""))
+    prenom = safe_get_string(ident.get("prenom", ""))
+    civ = safe_get_string(ident.get("civ", ""))
+    date_naissance = safe_get_string(info_naissance.get("dateNais", ""))
+    lieu_naissance = safe_get_string(info_naissance.get("villeNais", ""))
+    dep_naissance = safe_get_string(info_naissance.get("depNais", ""))
+    profession_libelle = safe_get_string(profession.get("libelleCourant", ""))
+    cat_soc_pro = safe_get_string(soc_proc.get("catSocPro", ""))
+    fam_soc_pro = safe_get_string(soc_proc.get("famSocPro", ""))
+
+    mandats = acteur.get("mandats", {}).get("mandat", [])
+
+    entries = []
+    for mandat in mandats:
+        if not isinstance(mandat, dict):
+            continue
+
+        type_organe = safe_get_string(mandat.get("typeOrgane", "")).upper() if mandat.get("typeOrgane") else ""
+        if type_organe not in valid_type_organe:
+            continue
+
+        entries.append({
+            "nom": nom,
+            "prenom": prenom,
+            "civ": civ,
+            "dateNaissance": date_naissance,
+            "lieuNaissance": lieu_naissance,
+            "depNais": dep_naissance,
+            "profession": profession_libelle,
+            "catSocPro": cat_soc_pro,
+            "famSocPro": fam_soc_pro,
+            "uid": safe_get_string(mandat.get("uid")),
+            "acteurRef": safe_get_string(mandat.get("acteurRef")),
+            "legislature": safe_get_string(mandat.get("legislature")),
+            "typeOrgane": type_organe,
+            "dateDebut": safe_get_string(mandat.get("dateDebut")),
+            "dateFin": safe_get_string(mandat.get("dateFin")),
+            "libQualite": safe_get_string(mandat.get("infosQualite", {}).get("libQualite")),
+            "organeRef": safe_get_string(mandat.get("organes", {}).get("organeRef"))
+        })
+    return entries
+
+def parse_acteur_batch(batch, valid_type_organe, decoder=default_decoder):
+    #batch: list of (file name, raw bytes); returns, in the same order, (file name, entries, error message or None)
+    results = []
+    for name, raw in batch:
+        try:
+            results.append((name, acteur_entries(decode_json(raw, decoder), valid_type_organe), None))
+        except Exception as e:
+            results.append((name, [], str(e)))
+    return results
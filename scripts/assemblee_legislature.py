@@ -0,0 +1,230 @@
+import os
+import re
+import threading
+from concurrent.futures import as_completed
+from urllib.parse import urljoin, urlsplit
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from assemblee_parse import parse_deputy_profile
+from assemblee_search import search_all_columns, search_url
+from name_match import merge_on_names
+
+
+#scraping of the deputies of one legislature from the old assemblee-nationale.fr pages (qui/...), shared by
+#FR_dep_11.py (one legislature) and FR_dep_all.py (every legislature at once):
+#   1. the multicriteria search with every column (assemblee_search.py, Selenium as fallback)
+#   2. the profile (fiche) of every deputy of liste_alpha.asp, for the place of birth and the mandate dates
+#   3. the two matched on the deputy names (name_match.py)
+#the connections, the rate limit, the profile download threads and the parse processes belong to the caller,
+#so several legislatures scraped together share one budget instead of multiplying it
+
+list_url = "https://www.assemblee-nationale.fr/qui/xml/liste_alpha.asp?legislature={legislature}"
+title_pattern = re.compile(r"^(M(?:me)?\.?|MM\.?|AM)\s+")
+
+column_renames = {
+    "Prénom": "First Name",
+    "Nom": "Last Name",
+    "Civilite": "Civil Status",
+    "Groupe": "Political Group",
+    "Région d'élection": "Electoral Region",
+    "N° circ.": "Constituency Number",
+    "Commission permanente": "Standing Committee",
+    "Profession": "Profession",
+    "Catégorie socioprofessionnelle": "Socio-Professional category",
+    "Famille socioprofessionnelle": "Socio-Professional family",
+    "Date de naissance": "Date of Birth",
+    "Conseil municipal": "Municipal Council",
+    "Conseil régional": "Regional Council",
+    "Autre mandat local": "Other Local Mandate",
+    "Département d'élection": "Electoral Department",
+    "Mandat communal": "Municipal Mandate",
+    "Conseil départemental": "Departmental Council",
+    "Mandat départemental": "Departmental Mandate",
+    "Mandat régional": "Regional Mandate"
+}
+
+desired_order = [
+    "Last Name", "First Name", "Civil Status", "Sex", "Date of Birth", "Place of Birth",
+    "Political Group", "Mandate Start Date", "Mandate End Date", "Electoral Region", "Constituency Number", "Electoral Department",
+    "Standing Committee", "Profession", "Socio-Professional category", "Socio-Professional family",
+    "Departmental Council", "Regional Council", "Municipal Council", "Departmental Mandate", "Regional Mandate", "Municipal Mandate", "Other Local Mandate"
+]
+
+
+def deputy_id(profile_url):
+    #identifier of the deputy in the url of the fiche (.../fiches_id/1234.asp -> 1234), the same in every legislature
+    path = urlsplit(profile_url).path
+    return os.path.splitext(path.rstrip('/').rsplit('/', 1)[-1])[0] or profile_url
+
+
+#the search with a headless browser: submit document.Lien5, tick every checkbox, show the results
+#pool: a browser_pool.BrowserPool shared with other jobs, by default a one-driver pool is started for the search
+def table_with_selenium(legislature, pool=None):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from browser_pool import BrowserPool, table_frame
+
+    own_pool = pool is None
+    if own_pool:
+        pool = BrowserPool(1)
+    try:
+        with pool.driver() as driver:
+            try:
+                driver.get(search_url.format(legislature=legislature))
+
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, "//a[contains(text(),'Recherche multicritère')]"))
+                )
+                driver.execute_script("document.Lien5.submit()")
+
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.NAME, "id_acteur"))
+                )
+
+                #selecting all checkboxes
+                driver.execute_script("""
+                    var checkboxes = document.querySelectorAll("input[type='checkbox']");
+                    checkboxes.forEach(cb => cb.checked = true);
+                """)
+
+                #clicking search to obtain the results
+                driver.find_element(By.XPATH, "//input[@type='submit' and @value='Afficher les résultats']").click()
+
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.ID, "tablesorter0"))
+                )
+
+                #the table is read in the browser instead of sending the whole page_source back
+                return table_frame(driver, "table#tablesorter0")
+
+            except Exception as e:
+                print(f"Selenium error: {e}")
+                driver.save_screenshot(f"errore_screenshot_{legislature}.png")
+                raise
+    finally:
+        if own_pool:
+            pool.close()
+
+
+class LegislatureScraper:
+    #session: requests session with the rate limiter of the whole run; profile_executor: ThreadPoolExecutor of the
+    #profile downloads; parse_pool: parse_pool.ParsePool; table_backend: 'http' (Selenium as fallback) or 'selenium'
+    #browser_pool_size: most drivers of the browser pool, created when a legislature first needs the Selenium path;
+    #each driver is only started when a legislature needs one and the others are busy
+
+    def __init__(self, session, profile_executor, parse_pool, table_backend='http', browser_pool_size=1):
+        self.session = session
+        self.profile_executor = profile_executor
+        self.parse_pool = parse_pool
+        self.table_backend = table_backend
+        self.browser_pool_size = browser_pool_size
+        self._browsers = None
+        self._browsers_lock = threading.Lock()
+
+    def browsers(self):
+        with self._browsers_lock:
+            if self._browsers is None:
+                from browser_pool import BrowserPool
+                self._browsers = BrowserPool(self.browser_pool_size)
+            return self._browsers
+
+    def close(self):
+        if self._browsers is not None:
+            self._browsers.close()
+
+    def search_table(self, legislature):
+        #the results table of the multicriteria search, cleaned
+        df_table = None
+        if self.table_backend == 'http':
+            try:
+                df_table = search_all_columns(self.session, legislature)
+            except Exception as e:
+                print(f"[{legislature}] Search form replay failed ({e}), falling back to Selenium")
+        if df_table is None:
+            df_table = table_with_selenium(legislature, self.browsers())
+
+        #cleanning from the unnecessary columns (such as Link to personal webpage, Age category and Age as it's not updated)
+        #add the Sex column mapping the Civil Status
+        df_table = df_table.drop(columns=["Lien fiche", "Catégorie d'âge", "Age"], errors="ignore")
+        df_table['Sex'] = df_table['Civilite'].str.lower().map({'mme': 'Female', 'm.': 'Male'}).fillna('N/A')
+
+        #creating Full Name column to join on
+        df_table['FullName'] = (df_table['Prénom'].str.strip() + ' ' + df_table['Nom'].str.strip()).str.strip()
+        return df_table
+
+    def profile_links(self, legislature):
+        #(name, profile_url) of every deputy of the legislature
+        url = list_url.format(legislature=legislature)
+        resp = self.session.get(url, timeout=20)
+        resp.raise_for_status()
+        soup = BeautifulSoup(resp.text, 'lxml')
+
+        profiles = []
+        for tag in soup.find_all('a', href=True):
+            if "fiches_id" in tag['href']:
+                for span in tag.find_all('span'):
+                    span.extract()
+                raw_name = tag.get_text(strip=True)
+                #using regular exression to find the simular lines
+                name = title_pattern.sub("", raw_name)  # remove title
+                profiles.append((name, urljoin(url, tag['href'])))
+        return profiles
+
+    def _fetch_profile(self, legislature, name, url, journal):
+        #downloads one profile and hands the raw page to the parse processes
+        resp = self.session.get(url, headers={"Referer": list_url.format(legislature=legislature)}, timeout=20)
+        resp.raise_for_status()
+        future = self.parse_pool.submit(parse_deputy_profile, name, resp.content, resp.encoding)
+        if journal is not None:
+            future.add_done_callback(lambda f: self._journal_profile(journal, url, f))
+        return future
+
+    def _journal_profile(self, journal, url, future):
+        if future.exception() is None:
+            journal.record({'url': url, 'record': future.result()})
+
+    def scrape_profiles(self, legislature, profiles, journal=None, done=()):
+        #parsed profiles, each with its 'Profile URL'
+        #done: (url, record) pairs restored from the journal of an interrupted run, not fetched again
+        deputies_data = [dict(record, **{'Profile URL': url}) for url, record in done]
+        done_urls = {url for url, _ in done}
+        downloads = {self.profile_executor.submit(self._fetch_profile, legislature, name, url, journal): url
+                     for name, url in profiles if url not in done_urls}
+        parsing = {}
+        for future in as_completed(downloads):
+            try:
+                parsing[future.result()] = downloads[future]
+            except Exception as e:
+                print(f"[{legislature}] Error with {downloads[future]}: {e}")
+        for parse_future in as_completed(parsing):
+            try:
+                deputies_data.append(dict(parse_future.result(), **{'Profile URL': parsing[parse_future]}))
+            except Exception as e:
+                print(f"[{legislature}] Error with {parsing[parse_future]}: {e}")
+        return deputies_data
+
+    def scrape(self, legislature, journal=None, done=(), name_report_path=None):
+        #the deputies of the legislature: the search table matched with their profiles, columns renamed and ordered
+        print(f"[{legislature}] Scraping table data...")
+        df_table = self.search_table(legislature)
+
+        #as in the scrapped table there's no start date and end date for mandate look for this on personal profiles
+        profiles = self.profile_links(legislature)
+        print(f"[{legislature}] Scraping {len(profiles)} individual profiles...")
+        df_profiles = pd.DataFrame(self.scrape_profiles(legislature, profiles, journal, done))
+
+        #match the "Surname" and "Name" columns of the table with "Name" of the profiles, ignoring accents,
+        #hyphens, particles and word order (see name_match.py)
+        profile_names = df_profiles['Name'] if 'Name' in df_profiles.columns else pd.Series([], dtype=object)
+        df_merged = merge_on_names(df_table, df_profiles, df_table['Prénom'] + ' ' + df_table['Nom'], profile_names,
+                                   report_path=name_report_path)
+
+        #drop all helper columns related to the merge to avoid redundant information in data set
+        df_merged = df_merged.drop(columns=[col for col in ['Name', 'FullName'] if col in df_merged.columns])
+        df_merged.rename(columns=column_renames, inplace=True)
+
+        existing_columns = [col for col in desired_order if col in df_merged.columns]
+        return df_merged[existing_columns + [col for col in df_merged.columns if col not in existing_columns]]
@@ -0,0 +1,50 @@
+import re
+
+from bs4 import BeautifulSoup
+
+
+#parsing of the deputy profile pages (fiches) of assemblee-nationale.fr, kept apart from FR_dep_11.py
+#so that it can run in the parse processes of parse_pool.ParsePool
+
+def parse_deputy_profile(name, profile_html, encoding=None):
+    #profile_html is the raw page (bytes) handed over by the fetch stage, encoding the one declared by the server
+    soup_profile = BeautifulSoup(profile_html, 'lxml', from_encoding=encoding)
+
+    #looking for "born" and extracting the place of birth
+    pob = "N/A"
+    for p in soup_profile.find_all('p'):
+        if 'Né' in p.text or 'Née' in p.text:
+            try:
+                pob = p.get_text(strip=True).split(' à ', 1)[1].strip()
+            except IndexError:
+                pass
+            break
+
+    #looking for the section "Mandates in National Assembly" and for its parent tag
+    start_date = end_date = ""
+    mandat_header = soup_profile.find('b', string=re.compile(r"MANDAT À L'ASSEMBLÉE NATIONALE", re.I))
+    if mandat_header:
+        ancestor = mandat_header
+        for _ in range(4):
+            ancestor = ancestor.find_parent()
+            if not ancestor:
+                break
+        #after finding the parent tag look for the ul tag and find inside the p tags
+        #if find look for the line of certain pattern using regular expression and extracting the dates of mandate in 11th leguslature
+        next_ul = ancestor.find_next_sibling('ul') if ancestor else None
+        if next_ul:
+            full_text = "\n".join(p.get_text(strip=True) for p in next_ul.find_all('p'))
+            start_match = re.search(r"date de début de mandat\s*:\s*(\d{2}/\d{2}/\d{4})", full_text, re.I)
+            end_match = re.search(r"fin du mandat au\s*:\s*(\d{2}/\d{2}/\d{4})", full_text, re.I)
+            if start_match:
+                start_date = start_match.group(1)
+            if end_match:
+                end_date = end_match.group(1)
+
+    #returning the extracting data
+    return {
+        'Name': name,
+        'Place of Birth': pob,
+        'Mandate Start Date': start_date,
+        'Mandate End Date': end_date
+    }
@@ -0,0 +1,106 @@
+from urllib.parse import urljoin
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+
+#multicriteria search of the deputies of a legislature on the old assemblee-nationale.fr pages (qui/index.asp),
+#replayed over plain HTTP instead of driving a browser:
+#   1. the legislature page holds the hidden form "Lien5" (the link "Recherche multicritère" submits it)
+#   2. its answer is the multicriteria form (with the id_acteur field), sent back with every checkbox ticked
+#      and the "Afficher les résultats" button as the clicked one
+#   3. the answer holds the results table tablesorter0
+#the fields are read from the pages themselves, so a changed form still gets all its current checkboxes
+#SearchFormError is raised when a page does not look as expected, FR_dep_11.py then falls back to Selenium
+
+search_url = "https://www.assemblee-nationale.fr/qui/index.asp?legislature={legislature}"
+results_button = "Afficher les résultats"
+
+
+class SearchFormError(Exception):
+    pass
+
+
+def form_fields(form, check_all=False, button=None):
+    #(name, value) pairs a browser would send for the form
+    #check_all ticks every checkbox; button: value of the submit button that is clicked (others are not sent)
+    fields = []
+    for tag in form.find_all(['input', 'select', 'textarea']):
+        name = tag.get('name')
+        if not name or tag.has_attr('disabled'):
+            continue
+        if tag.name == 'select':
+            options = tag.find_all('option')
+            selected = [o for o in options if o.has_attr('selected')] or options[:1]
+            fields.extend((name, o.get('value', o.get_text(strip=True))) for o in selected)
+            continue
+        if tag.name == 'textarea':
+            fields.append((name, tag.get_text()))
+            continue
+        kind = tag.get('type', 'text').lower()
+        if kind == 'checkbox':
+            if check_all or tag.has_attr('checked'):
+                fields.append((name, tag.get('value', 'on')))
+        elif kind == 'radio':
+            if tag.has_attr('checked'):
+                fields.append((name, tag.get('value', 'on')))
+        elif kind in ('submit', 'image', 'button', 'reset'):
+            if kind == 'submit' and button is not None and tag.get('value') == button:
+                fields.append((name, tag.get('value')))
+        elif kind != 'file':
+            fields.append((name, tag.get('value', '')))
+    return fields
+
+def submit_form(session, response, form, fields, timeout):
+    #sends the form like the browser: to its action (relative to the page), with its method
+    action = urljoin(response.url, form.get('action') or response.url)
+    headers = {"Referer": response.url}
+    if form.get('method', 'get').lower() == 'post':
+        result = session.post(action, data=fields, headers=headers, timeout=timeout)
+    else:
+        result = session.get(action, params=fields, headers=headers, timeout=timeout)
+    result.raise_for_status()
+    return result
+
+def page_soup(response):
+    #the old pages are served in latin-1, the encoding declared by the server is used for the raw bytes
+    return BeautifulSoup(response.content, 'lxml', from_encoding=response.encoding)
+
+
+def cell_text(cell):
+    #text pieces joined by one space, whitespace runs (nbsp included) collapsed, as browser_pool.table_script does
+    return " ".join(cell.get_text(" ", strip=True).split())
+
+
+def parse_results_table(soup):
+    #the results table tablesorter0 as a DataFrame of strings, headers as shown on the page
+    table = soup.find("table", {"id": "tablesorter0"})
+    if table is None or table.find("tbody") is None:
+        raise SearchFormError("results table tablesorter0 not found")
+    headers = [cell_text(th) for th in table.find_all("th")]
+    rows = []
+    for tr in table.find("tbody").find_all("tr"):
+        cells = [cell_text(td) for td in tr.find_all("td")]
+        if cells:
+            rows.append(cells)
+    return pd.DataFrame(rows, columns=headers)
+
+
+def search_all_columns(session, legislature, timeout=30):
+    #the results table of the multicriteria search with every column, for one legislature
+    index = session.get(search_url.format(legislature=legislature), timeout=timeout)
+    index.raise_for_status()
+    link_form = page_soup(index).find('form', attrs={'name': 'Lien5'})
+    if link_form is None:
+        raise SearchFormError(f"form Lien5 not found on {index.url}")
+    search = submit_form(session, index, link_form, form_fields(link_form), timeout)
+
+    search_form = None
+    for form in page_soup(search).find_all('form'):
+        if form.find(attrs={'name': 'id_acteur'}) is not None:
+            search_form = form
+            break
+    if search_form is None:
+        raise SearchFormError(f"multicriteria form not found on {search.url}")
+    results = submit_form(session, search, search_form, form_fields(search_form, check_all=True, button=results_button), timeout)
+    return parse_results_table(page_soup(results))
@@ -0,0 +1,87 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from collections import deque
+
+from acteur_parse import parse_acteur_batch, orjson
+from parse_pool import ParsePool
+
+
+#benchmark of the acteur ingestion of FR_dep_main.py: serial vs process pool, json vs orjson
+#usage: python bench_acteur_ingest.py [number of synthetic acteur files]
+#the files are read from a zip like in FR_dep_main.py, the time covers reading, decoding and flattening
+
+files_per_batch = 200
+max_pending_batches = 16
+valid_type_organe = {"BUREAU", "ASSEMBLEE"}
+organe_types = ["ASSEMBLEE", "BUREAU", "GP", "COMPER", "ORGEXTPARL", "CMP", "GE", "PARPOL"]
+
+def synthetic_acteur(i, rng):
+    #shaped like the files of the open data archive: civil status, profession and a list of mandates
+    mandates = ",".join(
+        f'''{{"@xsi:type": "MandatSimple_Type", "uid": "PM{i}{k}", "acteurRef": "PA{i}", "legislature": "{rng.randint(10, 17)}",
+        "typeOrgane": "{rng.choice(organe_types)}", "dateDebut": "20{k % 25:02d}-06-19", "datePublication": null,
+        "dateFin": "20{k % 25 + 5:02d}-06-19", "preseance": "{k}", "nominPrincipale": "1",
+        "infosQualite": {{"codeQualite": "Membre", "libQualite": "Membre", "libQualiteSex": "Membre"}},
+        "organes": {{"organeRef": "PO{rng.randint(1000, 9999)}"}}}}'''
+        for k in range(rng.randint(5, 60))
+    )
+    #the files of the archive start with a utf-8 BOM
+    return ('\ufeff' + f'''{{"acteur": {{"@xmlns": "http://schemas.assemblee-nationale.fr/referentiel", "uid": {{"#text": "PA{i}"}},
+    "etatCivil": {{"ident": {{"civ": "{rng.choice(['M.', 'Mme'])}", "prenom": "Prénom{i}", "nom": "Nom{i}", "alpha": "Nom{i}"}},
+    "infoNaissance": {{"dateNais": "19{rng.randint(30, 99)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}", "villeNais": "Saint-Étienne",
+    "depNais": "Loire", "paysNais": "France"}}, "dateDeces": null}},
+    "profession": {{"libelleCourant": "Professeur agrégé", "socProcINSEE": {{"catSocPro": "Professeurs", "famSocPro": "Cadres"}}}},
+    "uri_hatvp": null, "mandats": {{"mandat": [{mandates}]}}}}}}''').encode('utf-8')
+
+def zip_batches(zip_path):
+    with zipfile.ZipFile(zip_path) as zip_ref:
+        members = zip_ref.infolist()
+        for start in range(0, len(members), files_per_batch):
+            yield [(member.filename, zip_ref.read(member)) for member in members[start:start + files_per_batch]]
+
+def run(zip_path, workers, decoder):
+    results = []
+    if not workers:
+        for batch in zip_batches(zip_path):
+            results.extend(parse_acteur_batch(batch, valid_type_organe, decoder))
+        return results
+    with ParsePool(workers, max_pending_batches) as pool:
+        pending = deque()
+        for batch in zip_batches(zip_path):
+            pending.append(pool.submit(parse_acteur_batch, batch, valid_type_organe, decoder))
+            while pending and (pending[0].done() or len(pending) >= max_pending_batches):
+                results.extend(pending.popleft().result())
+        while pending:
+            results.extend(pending.popleft().result())
+    return results
+
+if __name__ == '__main__':
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "acteurs.json.zip")
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+            for i in range(n_files):
+                zip_ref.writestr(f"json/acteur/PA{i}.json", synthetic_acteur(i, rng))
+        print(f"{n_files} synthetic acteur files, zip of {os.path.getsize(zip_path) / 1024 / 1024:.1f} MB")
+
+        decoders = ['json'] + (['orjson'] if orjson is not None else [])
+        cpus = os.cpu_count() or 1
+        worker_counts = [0] + sorted({2, 4, cpus} - {0, 1})
+        reference = None
+        for decoder in decoders:
+            for workers in worker_counts:
+                start = time.perf_counter()
+                results = run(zip_path, workers, decoder)
+                elapsed = time.perf_counter() - start
+                if reference is None:
+                    reference = results
+                label = f"{decoder}, {'serial' if not workers else f'{workers} processes'}"
+                print(f"{label:>22}: {n_files / elapsed:8.0f} files/sec, {sum(len(r[1]) for r in results)} rows, "
+                      f"same rows as serial json: {results == reference}")
+        if orjson is None:
+            print("orjson is not installed, only the json decoder was measured (pip install orjson)")
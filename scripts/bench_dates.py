@@ -0,0 +1,61 @@
+import random
+import sys
+import time
+
+import pandas as pd
+
+from date_normalize import DateNormalizer
+
+
+#benchmark of the date normalization on the mandate table of FR_dep_main.py
+#usage: python bench_dates.py [mandate table CSV with raw dates, e.g. a flattened combined_filtered.json]
+#without a file a synthetic table is used: 300000 mandates, dates drawn from a few thousand distinct days
+#compares pd.to_datetime(errors='coerce').dt.strftime per column with date_normalize (strings and datetime64)
+
+date_columns = ["dateNaissance", "dateDebut", "dateFin"]
+repeats = 3
+
+def synthetic_table(rows=300000, seed=0):
+    rng = random.Random(seed)
+    births = [f"19{rng.randint(20, 99)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" for _ in range(3000)]
+    starts = [f"{rng.randint(1958, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" for _ in range(1500)]
+    return pd.DataFrame({
+        "dateNaissance": [rng.choice(births) for _ in range(rows)],
+        "dateDebut": [rng.choice(starts) for _ in range(rows)],
+        "dateFin": [rng.choice(starts) if rng.random() < 0.9 else None for _ in range(rows)],
+    })
+
+def best_time(fn):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+if len(sys.argv) > 1:
+    df = pd.read_csv(sys.argv[1], dtype=str)
+    date_columns = [col for col in df.columns if col in date_columns or 'date' in col.lower()]
+else:
+    df = synthetic_table()
+print(f"{len(df)} rows, columns {date_columns}, "
+      f"{sum(df[col].nunique() for col in date_columns)} distinct dates, best of {repeats}")
+
+def per_column_inference():
+    return {col: pd.to_datetime(df[col], errors='coerce').dt.strftime('%d/%m/%Y') for col in date_columns}
+
+def normalized_strings():
+    normalizer = DateNormalizer()
+    return {col: normalizer.format(df[col]) for col in date_columns}
+
+def normalized_datetimes():
+    normalizer = DateNormalizer()
+    return {col: normalizer.to_datetime(df[col]) for col in date_columns}
+
+baseline_time, baseline = best_time(per_column_inference)
+strings_time, strings = best_time(normalized_strings)
+datetimes_time, _ = best_time(normalized_datetimes)
+print(f"   to_datetime + strftime: {baseline_time * 1000:8.1f} ms")
+print(f"date_normalize (strings): {strings_time * 1000:8.1f} ms  x{baseline_time / strings_time:.1f}, "
+      f"same strings: {all(baseline[col].equals(strings[col]) for col in date_columns)}")
+print(f"date_normalize (dates):   {datetimes_time * 1000:8.1f} ms  x{baseline_time / datetimes_time:.1f}")
@@ -0,0 +1,65 @@
+import random
+import sys
+import time
+
+import pandas as pd
+
+from name_match import NameMatcher, name_tokens, score
+
+
+#benchmark of the name matching of name_match.py against scoring every pair of names
+#usage: python bench_name_match.py [number of deputies, default 15000 (about every deputy since 1958)]
+#the queries are the same names written differently: accents dropped, hyphens, word order, title, a typo
+
+deputies = int(sys.argv[1]) if len(sys.argv) > 1 else 15000
+#the quadratic baseline is timed on a sample of the queries and extrapolated
+baseline_sample = 50
+
+first_names = ["Jean", "Marie", "Pierre", "Anne", "Jean-Pierre", "Hélène", "François", "Cécile", "Michel", "Élise",
+               "Jacques", "Françoise", "Philippe", "Sylvie", "Marc-Antoine", "Noël", "Gaëlle", "Loïc", "Chloé", "Benoît"]
+
+def synthetic_names(count, seed=0):
+    rng = random.Random(seed)
+    syllables = ["du", "mar", "ber", "lan", "ché", "vil", "ton", "ré", "gon", "pel", "lier", "quet", "mon", "sau", "fè"]
+    names = set()
+    while len(names) < count:
+        last = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).capitalize()
+        if rng.random() < 0.1:
+            last = "de " + last
+        names.add(f"{rng.choice(first_names)} {last}")
+    return sorted(names)
+
+def variant(name, rng):
+    first, last = name.split(' ', 1)
+    changes = rng.choice(['accents', 'hyphen', 'order', 'title', 'typo'])
+    if changes == 'accents':
+        return name.replace('é', 'e').replace('è', 'e').replace('ë', 'e').replace('ç', 'c')
+    if changes == 'hyphen':
+        return name.replace('-', ' ') if '-' in name else name.replace('de ', '')
+    if changes == 'order':
+        return f"{last.upper()} {first}"
+    if changes == 'title':
+        return f"M. {name}"
+    i = rng.randrange(len(last))
+    return f"{first} {last[:i]}{rng.choice('aeiou')}{last[i + 1:]}"
+
+rng = random.Random(1)
+names = synthetic_names(deputies)
+queries = [variant(name, rng) for name in names]
+print(f"{deputies} deputies, {len(queries)} queries")
+
+start = time.perf_counter()
+matcher = NameMatcher(names)
+matches = matcher.match_all(pd.Series(queries))
+indexed_time = time.perf_counter() - start
+right = sum(row == i for i, row in enumerate(matches['row']))
+
+start = time.perf_counter()
+for query in queries[:baseline_sample]:
+    tokens = name_tokens(query)
+    max(range(len(names)), key=lambda row: score(tokens, matcher.tokens[row]))
+pairwise_time = (time.perf_counter() - start) * len(queries) / baseline_sample
+
+print(f"  all pairs (estimated): {pairwise_time:8.1f} s")
+print(f"  blocking index:        {indexed_time:8.1f} s  x{pairwise_time / indexed_time:.0f}")
+print(f"  {matches['status'].value_counts().to_dict()}, {right} matched to the right name")
@@ -0,0 +1,257 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from urllib.parse import urlsplit
+
+from standin_server import StandinServer
+
+
+#offline benchmark of the scrapers against standin_server.py instead of the live Senado, Assemblee and CHES websites
+#usage: python bench_scrapers.py [scraper ...] [--latency 0.05] [--jitter 0.02] [--error-rate 0.01] [--scale 1]
+#                                [--fixtures DIR] [--polite] [--save results.json] [--compare results.json]
+#every scraper runs unchanged in its own process with:
+#   - its connections sent to the stand-in server (the urls, cache keys and rate limit buckets stay the real ones)
+#   - its C:\... / D:\... paths moved to a temporary folder, and an empty on-disk cache (SCRAPER_CACHE_DIR)
+#   - no rate limit, unless --polite (the polite limit would be all the benchmark measures)
+#reported per scraper: pages/sec (answered requests over the wall time), p50 / p99 latency (until the response
+#headers, as seen by the scraper), CPU time (the scraper process and its parse processes) and peak RSS (the largest
+#of these processes; on Windows the scraper process alone, and only with psutil installed)
+#--save writes the results, --compare flags a result worse than the saved one by more than --tolerance
+#FR_dep_17.py (Selenium) and FR_Senate_all.py (the .xls needs xlrd and a recorded copy) are not part of it
+
+scrapers = {
+    'br_senate': 'BR_Senate_all.py',
+    'br_parties': 'BR_party_list.py',
+    'fr_dep_11': 'FR_dep_11.py',
+    'fr_dep_all': 'FR_dep_all.py',
+    'fr_dep_main': 'FR_dep_main.py',
+    'ches': 'pol_leaning_UK_FR.py',
+}
+script_dir = os.path.dirname(os.path.abspath(__file__))
+#Windows paths in the scripts, as raw string literals: r"C:\Users\..."
+windows_path_pattern = re.compile(r'''r(["'])([A-Za-z]):\\([^"']*)\1''')
+#result -> True when a higher value is worse
+compared_metrics = {'pages_per_sec': False, 'p50_ms': True, 'p99_ms': True, 'cpu_s': True, 'peak_rss_mb': True}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def resource_usage():
+    #(CPU seconds of this process and of its finished children, peak RSS in bytes or None)
+    try:
+        import resource
+    except ImportError:
+        times = os.times()
+        try:
+            import psutil
+            peak = psutil.Process().memory_info().peak_wset
+        except (ImportError, AttributeError):
+            peak = None
+        return times.user + times.system, peak
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return (own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+            max(own.ru_maxrss, children.ru_maxrss) * unit)
+
+
+#the scraper process
+
+def install_standin(standin_url, latencies, statuses):
+    #every request leaving an adapter goes to the stand-in server, the response keeps the real url
+    from requests.adapters import HTTPAdapter
+
+    network_send = HTTPAdapter.send
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        routed = request.copy()
+        routed.url = f"{standin_url}/{parts.scheme}/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else '')
+        start = time.perf_counter()
+        response = network_send(self, routed, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status_code)
+        response.url = request.url
+        response.request = request
+        return response
+
+    HTTPAdapter.send = send
+
+def lift_rate_limits():
+    import rate_limit
+
+    async def acquire_async(self, url):
+        pass
+    rate_limit.HostRateLimiter.acquire = lambda self, url: None
+    rate_limit.HostRateLimiter.acquire_async = acquire_async
+
+def local_paths(source, work_dir):
+    #r"C:\Users\HONOR\Desktop\RA\France\data" -> '<work_dir>/C/Users/HONOR/Desktop/RA/France/data', folders created
+    def replace(match):
+        path = os.path.join(work_dir, match.group(2).upper(), *match.group(3).split('\\'))
+        os.makedirs(os.path.dirname(path) if os.path.splitext(path)[1] else path, exist_ok=True)
+        return repr(path)
+    return windows_path_pattern.sub(replace, source)
+
+def run_scraper(script, standin_url, work_dir, stats_path, polite):
+    os.environ['SCRAPER_CACHE_DIR'] = os.path.join(work_dir, 'http_cache')
+    latencies = []
+    statuses = []
+    install_standin(standin_url, latencies, statuses)
+    if not polite:
+        lift_rate_limits()
+
+    script_path = os.path.join(script_dir, script)
+    with open(script_path, encoding='utf-8') as f:
+        source = local_paths(f.read(), work_dir)
+    sys.argv = [script_path]
+    error = None
+    cpu_before, _ = resource_usage()
+    start = time.perf_counter()
+    try:
+        exec(compile(source, script_path, 'exec'), {'__name__': '__main__', '__file__': script_path})
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            error = f"exit {e.code}"
+    except Exception as e:
+        traceback.print_exc()
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start
+    cpu, peak_rss = resource_usage()
+
+    with open(stats_path, 'w', encoding='utf-8') as f:
+        json.dump({'wall': wall, 'cpu': cpu - cpu_before, 'peak_rss': peak_rss, 'error': error,
+                   'latencies': latencies, 'statuses': statuses}, f)
+
+
+#the benchmark
+
+def benchmark(name, server, args):
+    work_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    stats_path = os.path.join(work_dir, 'stats.json')
+    log_path = os.path.join(work_dir, 'output.log')
+    command = [sys.executable, os.path.abspath(__file__), '--run', scrapers[name], '--standin', server.url,
+               '--work-dir', work_dir, '--stats', stats_path] + (['--polite'] if args.polite else [])
+    server.reset()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        subprocess.run(command, stdout=log, stderr=subprocess.STDOUT, cwd=work_dir)
+    served = server.reset()
+
+    if not os.path.exists(stats_path):
+        return {'scraper': name, 'error': "crashed", 'log': log_path}, work_dir
+    with open(stats_path, encoding='utf-8') as f:
+        stats = json.load(f)
+    answered = sum(1 for status in stats['statuses'] if status < 500)
+    result = {
+        'scraper': name,
+        'requests': len(stats['statuses']),
+        'injected_errors': sum(1 for _, _, status, _, _ in served if status >= 500),
+        'mb_received': sum(size for _, _, _, size, _ in served) / 1024 ** 2,
+        'pages_per_sec': answered / stats['wall'] if stats['wall'] else 0.0,
+        'p50_ms': (percentile(stats['latencies'], 0.5) or 0) * 1000,
+        'p99_ms': (percentile(stats['latencies'], 0.99) or 0) * 1000,
+        'wall_s': stats['wall'],
+        'cpu_s': stats['cpu'],
+        'peak_rss_mb': stats['peak_rss'] / 1024 ** 2 if stats['peak_rss'] else None,
+        'error': stats['error'],
+        'log': log_path,
+    }
+    return result, work_dir
+
+def print_result(result):
+    if 'requests' not in result:
+        print(f"{result['scraper']:<12} {result['error']}, see {result['log']}")
+        return
+    rss = f"{result['peak_rss_mb']:8.0f}" if result['peak_rss_mb'] is not None else f"{'n/a':>8}"
+    print(f"{result['scraper']:<12} {result['requests']:6d} {result['injected_errors']:6d} {result['mb_received']:7.1f} "
+          f"{result['pages_per_sec']:8.1f} {result['p50_ms']:7.1f} {result['p99_ms']:7.1f} {result['wall_s']:7.1f} "
+          f"{result['cpu_s']:7.1f} {rss}" + (f"  failed: {result['error']}, see {result['log']}" if result['error'] else ''))
+
+def compare(results, settings, baseline_path, tolerance):
+    #the metrics that got worse than the saved run by more than tolerance (a fraction)
+    with open(baseline_path, encoding='utf-8') as f:
+        saved = json.load(f)
+    if saved['settings'] != settings:
+        print(f"Note: {baseline_path} was run with other settings {saved['settings']}")
+    baseline = {result['scraper']: result for result in saved['results']}
+    regressions = []
+    for result in results:
+        before = baseline.get(result['scraper'])
+        if before is None or 'requests' not in result or 'requests' not in before:
+            continue
+        for metric, higher_is_worse in compared_metrics.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change if higher_is_worse else -change) > tolerance:
+                regressions.append(f"{result['scraper']}: {metric} {old:.1f} -> {new:.1f} ({change:+.0%})")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local stand-in of the websites")
+    parser.add_argument('scrapers', nargs='*', help=f"scrapers to run ({', '.join(scrapers)}), all of them by default")
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds added by the server to every answer")
+    parser.add_argument('--jitter', type=float, default=0.01, help="the latency varies by up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of GET / HEAD requests answered with a 503")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplies the size of the synthetic websites")
+    parser.add_argument('--fixtures', help="folder of recorded pages served instead of the synthetic ones (see standin_server.py)")
+    parser.add_argument('--polite', action='store_true', help="keep the rate limits of the scrapers")
+    parser.add_argument('--keep', action='store_true', help="keep the output folders of the scrapers")
+    parser.add_argument('--save', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON file of an earlier run (--save), regressions make the exit status 1")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed change before a result counts as a regression")
+    #the scraper process started by the benchmark
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    parser.add_argument('--standin', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--stats', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        sys.path.insert(0, script_dir)
+        run_scraper(args.run, args.standin, args.work_dir, args.stats, args.polite)
+        sys.exit(0)
+
+    unknown = [name for name in args.scrapers if name not in scrapers]
+    if unknown:
+        parser.error(f"unknown scrapers {unknown}, choose from {list(scrapers)}")
+    selected = args.scrapers or list(scrapers)
+    print(f"Stand-in server: latency {args.latency * 1000:.0f} ms +- {args.jitter * 1000:.0f} ms, "
+          f"error rate {args.error_rate:.1%}, scale {args.scale}" + (", rate limits kept" if args.polite else ""))
+    print(f"{'scraper':<12} {'reqs':>6} {'errors':>6} {'MB':>7} {'pages/s':>8} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'wall s':>7} {'cpu s':>7} {'RSS MB':>8}")
+    results = []
+    with StandinServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                       scale=args.scale, fixtures_dir=args.fixtures) as server:
+        for name in selected:
+            result, work_dir = benchmark(name, server, args)
+            print_result(result)
+            results.append(result)
+            if not args.keep and not result.get('error'):
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    settings = {'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+                'scale': args.scale, 'polite': args.polite}
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'results': results}, f, indent=2)
+    failed = [result['scraper'] for result in results if result.get('error')]
+    regressions = compare(results, settings, args.compare, args.tolerance) if args.compare else []
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    if failed or regressions:
+        sys.exit(1)
@@ -0,0 +1,73 @@
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from senado_parse import parse_profile_full, parse_profile_fast
+
+
+#benchmark of the Senado profile parsing: full DOM parse vs partial parse of the used regions
+#usage: python bench_senado_parse.py [folder with saved profile pages (*.html)]
+#without a folder a synthetic page shaped like a real profile (menus, scripts, footer) is used
+
+repeats = 20
+
+def synthetic_profile(i):
+    menu = ''.join(f'<li><a href="/web/menu/{k}">Item de menu {k}</a><ul><li><a href="#">Sub {k}</a></li></ul></li>' for k in range(300))
+    news = ''.join(f'<div class="noticia"><h4>Notícia {k}</h4><p>{"texto da notícia " * 40}</p></div>' for k in range(60))
+    mandates = ''.join(f'<tr><td>Deputado Federal</td><td>01/02/{1980 + k}</td><td>31/01/{1984 + k}</td></tr>' for k in range(6))
+    commissions = ''.join(f'<tr><td>Comissão {k}</td><td>Titular</td></tr>' for k in range(12))
+    return f'''<html><head><title>Senador {i}</title><script>{"var x = 1;" * 500}</script></head><body>
+<nav><ul>{menu}</ul></nav>
+<div class="head"><h1>Senador {i} - PT/PE</h1><small>Senador - PT (Líder)</small></div>
+<dl class="dl-horizontal"><dt>Nome civil</dt><dd>Nome Completo {i}</dd><dt>Nascimento</dt><dd>01/01/1950</dd><dt>Naturalidade</dt><dd>Recife (PE)</dd></dl>
+<div id="comissoes"><table><tbody>{commissions}</tbody></table></div>
+<div id="accordion-mandatos-exercicios">{"<p>Legislaturas 2003-2011</p>" * 3}</div>
+<div id="accordion-biografia">
+<table class="table table-striped" title="Mandatos do(a) senador(a)"><tbody>{mandates}</tbody></table>
+<table class="table table-striped" title="Histórico acadêmico do(a) senador(a)"><tbody><tr><td>1975</td><td>Superior completo</td></tr></tbody></table>
+<h3>Profissões</h3><ul><li>Advogado</li><li>Professor</li></ul></div>
+<table class="table table-striped" title="Chapa eleitoral do Senador"><tbody><tr><td>Senador {i}</td></tr><tr><td>Suplente</td></tr></tbody></table>
+<section>{news}</section><footer>{"<p>rodapé</p>" * 200}</footer></body></html>'''.encode('utf-8')
+
+def measure(parse, pages):
+    times = []
+    peaks = []
+    records = []
+    for page in pages:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            record = parse(page, 'N/A', 'utf-8')
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        parse(page, 'N/A', 'utf-8')
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        records.append(record)
+    return times, peaks, records
+
+if len(sys.argv) > 1:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(sys.argv[1], '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+else:
+    pages = [synthetic_profile(i) for i in range(10)]
+print(f"{len(pages)} pages, average size {sum(map(len, pages)) / len(pages) / 1024:.0f} KB, {repeats} runs each")
+
+results = {}
+for label, parse in (('full parse', parse_profile_full), ('partial parse', parse_profile_fast)):
+    times, peaks, records = measure(parse, pages)
+    results[label] = records
+    print(f"{label:>14}: median {statistics.median(times) * 1000:.2f} ms/page, "
+          f"p90 {sorted(times)[int(len(times) * 0.9)] * 1000:.2f} ms/page, "
+          f"peak memory {statistics.mean(peaks) / 1024:.0f} KB/page")
+
+fallbacks = sum(record is None for record in results['partial parse'])
+mismatches = sum(
+    fast is not None and fast != full
+    for fast, full in zip(results['partial parse'], results['full parse'])
+)
+print(f"pages needing the full-parse fallback: {fallbacks}, records differing from the full parse: {mismatches}")
@@ -0,0 +1,241 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+#pool of warm headless Chrome drivers for the Selenium parts of the scrapers (FR_dep_17.py, the fallback of FR_dep_11.py)
+#a driver is started when a job needs one and none is idle, up to size drivers, and handed out to jobs one at a time:
+#   with BrowserPool(2) as pool:
+#       with pool.driver() as driver:
+#           driver.get(url)
+#pages load with the 'eager' strategy (the DOM is ready, subresources are not waited for) and images, fonts and
+#stylesheets are not downloaded at all; the scrapers only read forms and tables, which do not need them
+#a driver is checked before it is handed out and reset after each job; one that failed, crashed, or served max_uses
+#jobs (a long-lived Chrome keeps growing) is quit, and a new one is started only when a job needs it
+#needs selenium (pip install selenium), imported only when a pool is created
+#table_frame(driver, selector) reads a results table inside the browser, see table_script
+
+pool_size = 2
+max_uses = 50
+page_load_timeout = 60
+#resources dropped by Chrome before they are requested
+blocked_urls = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+]
+blocked_content_settings = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.stylesheets": 2,
+    "profile.managed_default_content_settings.fonts": 2,
+}
+
+
+def chrome_options(headless=True, block_resources=True):
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-first-run")
+    options.page_load_strategy = 'eager'
+    if block_resources:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", blocked_content_settings)
+    return options
+
+#walks the table in the page and returns only its text: {"columns": [...], "rows": [[...], ...]}
+#instead of the outerHTML / page_source of the whole page, which is sent over the WebDriver wire and parsed again
+#in Python; each cell is its text nodes trimmed and joined by one space with whitespace runs collapsed, the same
+#text as assemblee_search.cell_text, so both backends return the same strings
+table_script = """
+var table = document.querySelector(arguments[0]);
+if (!table) { return null; }
+var clean = function (cell) {
+    var walker = document.createTreeWalker(cell, NodeFilter.SHOW_TEXT, null, false);
+    var parts = [];
+    for (var node = walker.nextNode(); node; node = walker.nextNode()) {
+        var text = node.nodeValue.trim();
+        if (text) { parts.push(text); }
+    }
+    return parts.join(' ').replace(/\\s+/g, ' ');
+};
+var headerCells = table.querySelectorAll('thead th');
+if (!headerCells.length && table.rows.length) { headerCells = table.rows[0].querySelectorAll('th'); }
+var columns = Array.prototype.map.call(headerCells, clean);
+var bodies = table.tBodies.length ? table.tBodies : [table];
+var rows = [];
+for (var b = 0; b < bodies.length; b++) {
+    var trs = bodies[b].rows;
+    for (var r = 0; r < trs.length; r++) {
+        var cells = trs[r].querySelectorAll('td');
+        if (cells.length) { rows.push(Array.prototype.map.call(cells, clean)); }
+    }
+}
+return {columns: columns, rows: rows};
+"""
+
+
+def table_frame(driver, selector="table"):
+    #DataFrame of strings of the first table matching the CSS selector, headers as shown on the page
+    table = driver.execute_script(table_script, selector)
+    if table is None:
+        raise ValueError(f"no table matching {selector!r} on {driver.current_url}")
+    columns = table['columns']
+    width = max([len(columns)] + [len(row) for row in table['rows']])
+    if len(columns) != width:
+        columns = columns + [str(i) for i in range(len(columns), width)]
+    return pd.DataFrame([row + [None] * (width - len(row)) for row in table['rows']], columns=columns)
+
+
+class BrowserPool:
+    def __init__(self, size=pool_size, headless=True, block_resources=True, max_uses=max_uses,
+                 page_load_timeout=page_load_timeout):
+        from selenium import webdriver
+        from selenium.common.exceptions import WebDriverException
+
+        self._webdriver = webdriver
+        self._driver_errors = WebDriverException
+        self.size = size
+        self.headless = headless
+        self.block_resources = block_resources
+        self.max_uses = max_uses
+        self.page_load_timeout = page_load_timeout
+        #idle drivers, and the number of slots without a driver (no Chrome is started before a job needs it)
+        self._idle = []
+        self._free = size
+        self._available = threading.Condition()
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start_driver(self):
+        start = time.perf_counter()
+        driver = self._webdriver.Chrome(options=chrome_options(self.headless, self.block_resources))
+        driver.set_page_load_timeout(self.page_load_timeout)
+        if self.block_resources:
+            #fonts and stylesheets have no reliable preference, they are blocked at the network level
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+            except self._driver_errors:
+                pass
+        with self._lock:
+            self._uses[driver] = 0
+            running = len(self._uses)
+        print(f"Browser pool: headless Chrome started in {time.perf_counter() - start:.1f}s ({running} of {self.size})")
+        return driver
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def healthy(self, driver):
+        #the browser answers and its window is still there
+        try:
+            driver.execute_script("return 1")
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        #a job must not see the cookies, pages or extra windows of the previous one
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def _take(self, timeout):
+        #an idle driver if there is one, else None for a free slot; waits while every driver is busy
+        with self._available:
+            if not self._available.wait_for(lambda: self._idle or self._free, timeout):
+                raise queue.Empty
+            if self._idle:
+                return self._idle.pop()
+            self._free -= 1
+            return None
+
+    def _give_back(self, driver):
+        #an idle driver, or None for the slot of a driver that was quit (or could not be started)
+        with self._available:
+            if driver is None:
+                self._free += 1
+            else:
+                self._idle.append(driver)
+            self._available.notify()
+
+    def acquire(self, timeout=None):
+        #an idle, healthy driver; a dead one is replaced by a fresh one, and a free slot gets a new one
+        #raises queue.Empty when no driver is free within timeout
+        if self._closed:
+            raise RuntimeError("browser pool is closed")
+        driver = self._take(timeout)
+        if driver is not None and not self.healthy(driver):
+            print("Browser pool: replacing a driver that stopped responding")
+            self._quit(driver)
+            driver = None
+        if driver is None:
+            try:
+                return self._start_driver()
+            except BaseException:
+                #the slot stays free for the next acquire
+                self._give_back(None)
+                raise
+        return driver
+
+    def release(self, driver, failed=False):
+        #failed: the job raised, the page may be left in any state so the driver is quit
+        #(the next acquire starts a new one, a pool about to be closed does not start Chrome for nothing)
+        with self._lock:
+            self._uses[driver] = self._uses.get(driver, 0) + 1
+            worn_out = self._uses[driver] >= self.max_uses
+        if not failed and not worn_out and not self._closed:
+            try:
+                self._reset(driver)
+                self._give_back(driver)
+                return
+            except Exception:
+                pass
+        self._quit(driver)
+        self._give_back(None)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except BaseException:
+            #the error of the job is the one that propagates, not one of quitting its driver
+            try:
+                self.release(driver, failed=True)
+            except Exception:
+                pass
+            raise
+        self.release(driver)
+
+    def close(self):
+        self._closed = True
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._free += len(idle)
+        for driver in idle:
+            self._quit(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,332 @@
+import argparse
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+#record / replay of every request the scrapers make, for deterministic offline re-runs
+#record: each request and its response (headers and body) are appended to the archive as WARC records
+#replay: the responses are served from the archive, nothing goes to the network (no rate limit, no cache), so a
+#scraper re-run after a parser fix goes through yesterday's crawl at disk / CPU speed with all its workers busy
+#both are switched on for every session of http_cache.make_session by an environment variable:
+#   SCRAPER_RECORD=D:\crawls\2024-06-01 python BR_Senate_all.py
+#   SCRAPER_REPLAY=D:\crawls\2024-06-01 python BR_Senate_all.py
+#the archive is a folder:
+#   capture-<time>-<pid>.warc.zst (or .warc.gz): a request record and a response record per fetch, each one
+#   compressed on its own (WARC per-record compression), so a record is read without the rest of the file;
+#   zstd when zstandard is installed, gzip otherwise (the .warc.gz files can be read by any WARC tool)
+#   index.sqlite: request (method, url, and the form body of a POST) -> segment, offset and length of the response
+#a url fetched again replaces the older one in the index, its records stay in the segment
+#the bodies are stored decoded (Content-Encoding removed), like in http_cache.py
+#python capture_archive.py <archive> lists the records, --export-fixtures writes the pages for standin_server.py
+#(the browser pages of FR_dep_17.py are not requests of a session and are not captured)
+
+default_compression = 'zstd' if zstandard is not None else 'gzip'
+segment_suffixes = {'zstd': '.warc.zst', 'gzip': '.warc.gz'}
+chunk_size = 64 * 1024
+#headers that describe the wire transfer, not the decoded body kept in the archive
+hop_headers = {'content-encoding', 'transfer-encoding', 'connection', 'keep-alive'}
+
+
+class ArchiveMiss(requests.ConnectionError):
+    #raised in replay mode for a request that is not in the archive, handled by the scrapers like a network error
+    pass
+
+
+def request_key(method, url, body=None, byte_range=None):
+    key = f"{method.upper()} {url}"
+    if byte_range:
+        key += f" Range: {byte_range}"
+    if body:
+        key += " " + hashlib.sha256(body if isinstance(body, bytes) else body.encode('utf-8')).hexdigest()
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def warc_header(fields, length):
+    lines = ['WARC/1.1'] + [f"{name}: {value}" for name, value in fields] + [f"Content-Length: {length}"]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8')
+
+def parse_fields(head):
+    #'Name: value' lines of a WARC or HTTP head, the first line (version / status line) is skipped
+    lines = head.decode('latin-1').split('\r\n')[1:]
+    return [line.split(': ', 1) for line in lines if ': ' in line]
+
+def http_head(first_line, headers):
+    return (first_line + '\r\n' + ''.join(f"{name}: {value}\r\n" for name, value in headers.items()) + '\r\n').encode('latin-1', 'replace')
+
+
+class CaptureArchive:
+    #one archive folder; record() and lookup() are thread-safe, several processes may record into the same folder
+    #(each one writes its own segment, the index is shared)
+
+    def __init__(self, path, compression=default_compression):
+        if compression == 'zstd' and zstandard is None:
+            raise ImportError("zstandard is needed for zstd archives (pip install zstandard)")
+        self.path = path
+        self.compression = compression
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segment = None
+        self._segment_name = None
+        self._db = sqlite3.connect(os.path.join(path, 'index.sqlite'), timeout=60, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                key TEXT PRIMARY KEY,
+                method TEXT,
+                url TEXT,
+                status INTEGER,
+                segment TEXT,
+                offset INTEGER,
+                length INTEGER,
+                size INTEGER,
+                captured_at REAL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS records_url ON records (url)")
+        self._db.commit()
+
+    #recording
+
+    def _open_segment(self):
+        if self._segment is None:
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            self._segment_name = f"capture-{stamp}-{os.getpid()}{segment_suffixes[self.compression]}"
+            self._segment = open(os.path.join(self.path, self._segment_name), 'ab')
+        return self._segment
+
+    def _write_member(self, segment, parts):
+        #one independently compressed record made of byte strings and file objects
+        start = segment.tell()
+        if self.compression == 'zstd':
+            writer = zstandard.ZstdCompressor(level=6).stream_writer(segment, closefd=False)
+        else:
+            writer = gzip.GzipFile(fileobj=segment, mode='wb', compresslevel=6)
+        for part in parts:
+            if isinstance(part, bytes):
+                writer.write(part)
+            else:
+                shutil.copyfileobj(part, writer, chunk_size)
+        writer.close()
+        return start, segment.tell() - start
+
+    def record(self, request, response, body, size):
+        #request: the PreparedRequest sent, response: its answer, body: file object of the decoded body (size bytes)
+        date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        request_id = f"<urn:uuid:{uuid.uuid4()}>"
+        parts = urlsplit(request.url)
+        request_headers = CaseInsensitiveDict({'Host': parts.netloc})
+        request_headers.update(request.headers)
+        request_body = request.body.encode('utf-8') if isinstance(request.body, str) else (request.body or b'')
+        request_block = http_head(f"{request.method} {parts.path or '/'}{'?' + parts.query if parts.query else ''} HTTP/1.1",
+                                  request_headers) + request_body
+
+        headers = CaseInsensitiveDict({k: v for k, v in response.headers.items() if k.lower() not in hop_headers})
+        if request.method != 'HEAD':
+            headers['Content-Length'] = str(size)
+        response_head = http_head(f"HTTP/1.1 {response.status_code} {response.reason or ''}".rstrip(), headers)
+
+        with self._lock:
+            segment = self._open_segment()
+            self._write_member(segment, [warc_header([
+                ('WARC-Type', 'request'), ('WARC-Record-ID', request_id), ('WARC-Date', date),
+                ('WARC-Target-URI', request.url), ('Content-Type', 'application/http;msgtype=request'),
+            ], len(request_block)), request_block, b'\r\n\r\n'])
+            offset, length = self._write_member(segment, [warc_header([
+                ('WARC-Type', 'response'), ('WARC-Record-ID', f"<urn:uuid:{uuid.uuid4()}>"), ('WARC-Date', date),
+                ('WARC-Target-URI', request.url), ('WARC-Concurrent-To', request_id),
+                ('Content-Type', 'application/http;msgtype=response'),
+            ], len(response_head) + size), response_head, body, b'\r\n\r\n'])
+            segment.flush()
+            self._db.execute(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (request_key(request.method, request.url, request.body, request.headers.get('Range')),
+                 request.method, request.url, response.status_code, self._segment_name, offset, length, size, time.time())
+            )
+            self._db.commit()
+
+    #replay
+
+    def lookup(self, method, url, body=None, byte_range=None):
+        with self._lock:
+            return self._db.execute(
+                "SELECT segment, offset, length FROM records WHERE key = ?", (request_key(method, url, body, byte_range),)
+            ).fetchone()
+
+    def read_record(self, segment, offset, length):
+        #(status, reason, headers, body) of a response record
+        with open(os.path.join(self.path, segment), 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        if segment.endswith('.zst'):
+            data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        else:
+            data = gzip.decompress(data)
+        warc_head, _, rest = data.partition(b'\r\n\r\n')
+        block_length = int(CaseInsensitiveDict(parse_fields(warc_head))['Content-Length'])
+        head, _, body = rest[:block_length].partition(b'\r\n\r\n')
+        status_line = head.split(b'\r\n', 1)[0].decode('latin-1')
+        _, status, reason = (status_line.split(' ', 2) + [''])[:3]
+        return int(status), reason, CaseInsensitiveDict(parse_fields(head)), body
+
+    def entries(self, url_part=None):
+        #(method, url, status, size, captured_at) of the indexed records, urls containing url_part
+        query = "SELECT method, url, status, size, captured_at FROM records"
+        with self._lock:
+            if url_part:
+                return self._db.execute(query + " WHERE instr(url, ?) > 0 ORDER BY url", (url_part,)).fetchall()
+            return self._db.execute(query + " ORDER BY url").fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            self._db.close()
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+def open_archive(path):
+    #one CaptureArchive per folder and process, shared by all its sessions
+    path = os.path.abspath(path)
+    with _archives_lock:
+        if path not in _archives:
+            _archives[path] = CaptureArchive(path)
+        return _archives[path]
+
+
+class RecordingAdapter(BaseAdapter):
+    #wraps the adapter of a session (cache, rate limit, retries) and archives every answer it gives
+    #the body is read to a temporary file before it is handed back, streamed or not
+
+    def __init__(self, adapter, archive):
+        super().__init__()
+        self.adapter = adapter
+        self.archive = archive
+
+    def send(self, request, stream=False, **kwargs):
+        response = self.adapter.send(request, stream=True, **kwargs)
+        body = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        try:
+            for chunk in response.iter_content(chunk_size):
+                body.write(chunk)
+        finally:
+            response.close()
+        size = body.tell()
+        body.seek(0)
+        self.archive.record(request, response, body, size)
+        body.seek(0)
+
+        response.headers = CaseInsensitiveDict({k: v for k, v in response.headers.items() if k.lower() not in hop_headers})
+        if stream:
+            response.raw = body
+            response._content = False
+            response._content_consumed = False
+        else:
+            response._content = body.read()
+            response._content_consumed = True
+            response.raw = io.BytesIO()
+            body.close()
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    #answers from the archive only; a request that was not recorded raises ArchiveMiss
+
+    def __init__(self, archive):
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request, stream=False, **kwargs):
+        location = self.archive.lookup(request.method, request.url, request.body, request.headers.get('Range'))
+        if location is None:
+            raise ArchiveMiss(f"not in the archive {self.archive.path}: {request.method} {request.url}", request=request)
+        status, reason, headers, body = self.archive.read_record(*location)
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = headers
+        response.encoding = get_encoding_from_headers(headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_archive = True
+        response.raw = io.BytesIO(body)
+        if not stream:
+            response._content = body
+            response._content_consumed = True
+        return response
+
+    def close(self):
+        pass
+
+
+def archive_adapter(adapter, record=None, replay=None):
+    #the adapter a session mounts: replay replaces it, record wraps it, otherwise it is used as is
+    if replay:
+        adapter.close()
+        return ReplayAdapter(open_archive(replay))
+    if record:
+        return RecordingAdapter(adapter, open_archive(record))
+    return adapter
+
+
+def export_fixtures(archive, fixtures_dir, url_part=None):
+    #the recorded GET pages (200) in the layout of standin_server.fixture_path, for bench_scrapers.py --fixtures
+    from standin_server import fixture_path
+
+    count = 0
+    with archive._lock:
+        rows = archive._db.execute(
+            "SELECT url, segment, offset, length FROM records WHERE method = 'GET' AND status = 200 ORDER BY url"
+        ).fetchall()
+    for url, segment, offset, length in rows:
+        if url_part and url_part not in url:
+            continue
+        parts = urlsplit(url)
+        path = fixture_path(fixtures_dir, parts.netloc, parts.path, parts.query)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(archive.read_record(segment, offset, length)[3])
+        count += 1
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List the records of a capture archive")
+    parser.add_argument('archive', help="archive folder (SCRAPER_RECORD of the recorded run)")
+    parser.add_argument('--url', help="only the urls containing this text")
+    parser.add_argument('--export-fixtures', metavar='DIR', help="write the recorded pages for standin_server.py --fixtures")
+    args = parser.parse_args()
+
+    archive = CaptureArchive(args.archive)
+    if args.export_fixtures:
+        print(f"{export_fixtures(archive, args.export_fixtures, args.url)} pages written to {args.export_fixtures}")
+    else:
+        entries = archive.entries(args.url)
+        for method, url, status, size, captured_at in entries:
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(captured_at))} {status} {size:>10} {method:<4} {url}")
+        print(f"{len(entries)} records")
+    archive.close()
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+import time
+
+
+#append-only checkpoint journal for the long scrapes (one JSON object per line)
+#every finished unit of work (a listing page, a parsed profile) is appended as soon as it is done;
+#lines are flushed at once and fsynced in batches, so a crash loses at most the last unsynced batch
+#a --resume run replays the journal in a single pass to rebuild its in-memory state and skips that work
+
+def read_journal(path):
+    #yields the journal entries in the order they were written
+    #a line cut short by a crash can only be the last one (a resumed journal drops it first) and is ignored;
+    #read as bytes, the cut may fall inside a multibyte character
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def drop_partial_line(path):
+    #truncates the file after its last complete line, so new entries do not continue a line cut short by a crash
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            f.seek(max(0, end - 64 * 1024))
+            block = f.read(end - max(0, end - 64 * 1024))
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                end = end - len(block) + newline + 1
+                break
+            end -= len(block)
+        if end != size:
+            f.truncate(end)
+
+
+def index_journal(path, entry_type, key):
+    #maps entry[key] -> byte offset of the last entry of that type, so entries can be read back one by one
+    offsets = {}
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = None
+            if entry is not None and entry.get('type') == entry_type:
+                offsets[entry[key]] = offset
+            offset += len(line)
+    return offsets
+
+def read_entry(journal_file, offset):
+    #journal_file: the journal opened in binary mode
+    journal_file.seek(offset)
+    return json.loads(journal_file.readline())
+
+
+class CheckpointJournal:
+    def __init__(self, path, resume=False, fsync_every=50, fsync_interval=5.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if not resume and os.path.exists(path):
+            os.remove(path)
+        elif resume and os.path.exists(path):
+            drop_partial_line(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def replay(self):
+        return read_journal(self.path)
+
+    def record(self, entry):
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
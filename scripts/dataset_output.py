@@ -0,0 +1,188 @@
+import glob
+import os
+import shutil
+
+import pandas as pd
+
+from row_writer import StreamingCSVWriter
+from date_normalize import normalize_dates
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+except ImportError:
+    pa = None
+
+
+#output layer shared by the scripts
+#'csv' writes the usual single utf-8-sig file; 'parquet' and 'feather' (Arrow IPC) write a dataset folder with
+#the same name (without .csv), partitioned hive style, e.g. FR_dep_combined/Country=FR/Chamber=Assemblee/Legislature=17/
+#the columns are typed (dates as dates, party / group / sex as dictionary columns), so reading one legislature back
+#only opens the files of that partition and needs no type inference:
+#   pd.read_parquet(folder, filters=[('Legislature', '==', 17)])
+#parquet and feather need pyarrow (pip install pyarrow)
+
+output_formats = ('csv', 'parquet', 'feather')
+#threads used by pyarrow to convert and write the files
+writer_threads = os.cpu_count()
+
+if pa is not None:
+    arrow_types = {
+        'string': pa.string(),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'date': pa.date32(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+    }
+
+
+def dataset_path(output_path, output_format):
+    if output_format == 'csv':
+        return output_path
+    return os.path.splitext(output_path)[0]
+
+def check_format(output_format):
+    if output_format not in output_formats:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {output_formats}")
+    if output_format != 'csv' and pa is None:
+        raise ImportError(f"pyarrow is needed for the {output_format} output format (pip install pyarrow)")
+    if pa is not None:
+        pa.set_cpu_count(writer_threads)
+        pa.set_io_thread_count(writer_threads)
+
+
+def typed_column(values, kind):
+    #values: a pandas Series; 'N/A', '' and unparsable values become nulls in typed columns
+    if kind == 'date':
+        #dd/mm/yyyy strings or datetime columns (keep_datetimes), each distinct value parsed once
+        values = normalize_dates(values, as_datetime=True).dt.date
+        return pa.array(values, type=pa.date32(), from_pandas=True)
+    if kind == 'int':
+        return pa.array(pd.to_numeric(values, errors='coerce').astype('Int64'), type=pa.int64(), from_pandas=True)
+    if kind == 'float':
+        return pa.array(pd.to_numeric(values, errors='coerce'), type=pa.float64(), from_pandas=True)
+    values = values.where(values.isna(), values.astype(str))
+    array = pa.array(values, type=pa.string(), from_pandas=True)
+    if kind == 'category':
+        return array.dictionary_encode().cast(arrow_types['category'])
+    return array
+
+def typed_table(df, column_types, partition_by, partitions):
+    #column_types: {column: 'string' | 'category' | 'date' | 'int' | 'float'}, other columns are strings
+    #partitions: {partition column: value} for the constant ones (country, chamber); columns of df can be partitions too
+    #partition columns are kept as strings, they only name the folders
+    df = df.assign(**{key: value for key, value in partitions.items() if key not in df.columns})
+    fields = []
+    arrays = []
+    for col in df.columns:
+        kind = 'string' if col in partition_by else column_types.get(col, 'string')
+        arrays.append(typed_column(df[col], kind))
+        fields.append(pa.field(str(col), arrow_types[kind]))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+class DatasetWriter:
+    #same interface as StreamingCSVWriter (write / flush / close), for any of the output formats
+    #partition_by: the partition columns, in folder order; partitions: values of the constant ones
+    #with csv the partitions are ignored and the file is exactly the one df.to_csv would give
+
+    def __init__(self, output_path, columns, output_format='csv', column_types=None, partition_by=(),
+                 partitions=None, buffer_rows=1000, transform=None):
+        check_format(output_format)
+        self.output_format = output_format
+        self.path = dataset_path(output_path, output_format)
+        self.columns = list(columns)
+        self.column_types = column_types or {}
+        self.partition_by = list(partition_by)
+        self.partitions = partitions or {}
+        self.buffer_rows = buffer_rows
+        self.transform = transform
+        self.rows_written = 0
+        self._chunks = 0
+        self._buffer = []
+        if output_format == 'csv':
+            self._csv = StreamingCSVWriter(self.path, columns, buffer_rows=buffer_rows, transform=transform)
+        else:
+            if os.path.isdir(self.path):
+                shutil.rmtree(self.path)
+            os.makedirs(self.path)
+
+    def write(self, row):
+        if self.output_format == 'csv':
+            self._csv.write(row)
+            self.rows_written = self._csv.rows_written
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def write_frame(self, df):
+        #a whole DataFrame at once (with the columns given to the writer)
+        if self.output_format == 'csv':
+            for row in df.to_dict('records'):
+                self.write(row)
+            return
+        self.flush()
+        self._write_chunk(df)
+
+    def flush(self):
+        if self.output_format == 'csv':
+            self._csv.flush()
+            return
+        if self._buffer:
+            self._write_chunk(pd.DataFrame(self._buffer, columns=self.columns))
+            self._buffer = []
+
+    def _write_chunk(self, df):
+        if self.transform is not None:
+            df = self.transform(df)
+        table = typed_table(df, self.column_types, self.partition_by, self.partitions)
+        pads.write_dataset(
+            table, self.path,
+            format='parquet' if self.output_format == 'parquet' else 'ipc',
+            partitioning=pads.partitioning(table.select(self.partition_by).schema, flavor='hive'),
+            basename_template=f'part-{self._chunks:05d}-{{i}}.{self.output_format}',
+            existing_data_behavior='overwrite_or_ignore',
+            use_threads=True,
+        )
+        self._chunks += 1
+        self.rows_written += len(df)
+
+    def close(self):
+        if self.output_format == 'csv':
+            self._csv.close()
+            self.rows_written = self._csv.rows_written
+        else:
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_dataset(df, output_path, output_format='csv', column_types=None, partition_by=(), partitions=None):
+    #one-shot version for the scripts that build the whole DataFrame anyway
+    if output_format == 'csv':
+        df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        return output_path
+    with DatasetWriter(output_path, df.columns, output_format, column_types, partition_by, partitions) as writer:
+        writer.write_frame(df)
+    return writer.path
+
+
+def read_dataset(output_path, output_format=None):
+    #reads back what write_dataset / DatasetWriter wrote for output_path: the CSV (all columns as text)
+    #or the dataset folder; output_format=None takes whichever exists
+    if output_format in (None, 'csv') and os.path.isfile(output_path):
+        return pd.read_csv(output_path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    folder = dataset_path(output_path, 'parquet')
+    if output_format == 'csv' or not os.path.isdir(folder):
+        raise FileNotFoundError(f"No output found for {output_path}")
+    if pa is None:
+        raise ImportError(f"pyarrow is needed to read {folder} (pip install pyarrow)")
+    if output_format is None:
+        output_format = 'feather' if glob.glob(os.path.join(folder, '**', '*.feather'), recursive=True) else 'parquet'
+    dataset = pads.dataset(folder, format='parquet' if output_format == 'parquet' else 'ipc', partitioning='hive')
+    return dataset.to_table().to_pandas()
@@ -0,0 +1,104 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+#date normalization shared by the French scripts
+#the mandate tables repeat a few thousand distinct dates over hundreds of thousands of rows, so each distinct value
+#is parsed once (with the known source formats, no per-column format inference) and the result is mapped back
+#the conversions are cached, so the chunks of a streamed table and the columns of one table share them
+
+#formats found in the sources: assemblee open data (ISO dates), data.gouv CSV, senat .xls / SQL extract
+known_formats = (
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+)
+output_format = '%d/%m/%Y'
+
+
+def parse_other(value):
+    #values in none of the known formats: left to pandas inference, one value at a time; time zones are dropped
+    try:
+        timestamp = pd.to_datetime(value, errors='coerce')
+    except (ValueError, TypeError, OverflowError):
+        return pd.NaT
+    if timestamp is not pd.NaT and timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_localize(None)
+    return timestamp
+
+
+class DateNormalizer:
+    #infer=False: values in none of the formats become NaT instead of being left to pandas inference
+    def __init__(self, formats=known_formats, infer=True):
+        self.formats = formats
+        self.infer = infer
+        self._timestamps = {}
+        self._strings = {}
+
+    def _parse(self, values):
+        #values: distinct raw values not parsed yet -> {value: Timestamp or NaT}
+        parsed = {}
+        strings = []
+        for value in values:
+            if isinstance(value, str):
+                strings.append(value)
+            elif isinstance(value, (datetime.date, np.datetime64)):
+                parsed[value] = pd.Timestamp(value)
+            else:
+                parsed[value] = parse_other(value) if self.infer else pd.NaT
+        remaining = pd.Series(strings, dtype=object)
+        for date_format in self.formats:
+            if remaining.empty:
+                break
+            converted = pd.to_datetime(remaining, format=date_format, errors='coerce')
+            matched = converted.notna()
+            parsed.update(zip(remaining[matched], converted[matched]))
+            remaining = remaining[~matched]
+        for value in remaining:
+            parsed[value] = parse_other(value) if self.infer else pd.NaT
+        return parsed
+
+    def _codes(self, series):
+        #distinct values of the column, parsing the new ones
+        codes, uniques = pd.factorize(series)
+        new_values = [value for value in uniques if value not in self._timestamps]
+        if new_values:
+            self._timestamps.update(self._parse(new_values))
+        return codes, uniques
+
+    def to_datetime(self, series):
+        #datetime64 Series, NaT for missing or unparsable values
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.dt.tz_localize(None) if getattr(series.dt, 'tz', None) is not None else series
+        codes, uniques = self._codes(series)
+        timestamps = pd.DatetimeIndex([self._timestamps[value] for value in uniques], dtype='datetime64[ns]')
+        return pd.Series(timestamps.take(codes, allow_fill=True, fill_value=pd.NaT), index=series.index, name=series.name)
+
+    def format(self, series, date_format=output_format):
+        #strings in date_format, NaN for missing or unparsable values (like .dt.strftime)
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = self.to_datetime(series)
+        codes, uniques = self._codes(series)
+        strings = self._strings.setdefault(date_format, {})
+        for value in uniques:
+            if value not in strings:
+                timestamp = self._timestamps[value]
+                strings[value] = np.nan if timestamp is pd.NaT else timestamp.strftime(date_format)
+        #code -1 (missing value) picks the NaN added at the end
+        lookup = np.array([strings[value] for value in uniques] + [np.nan], dtype=object)
+        return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+    def normalize(self, series, as_datetime=False, date_format=output_format):
+        return self.to_datetime(series) if as_datetime else self.format(series, date_format)
+
+
+default_normalizer = DateNormalizer()
+
+def normalize_dates(series, as_datetime=False, date_format=output_format):
+    #replaces pd.to_datetime(series, errors='coerce').dt.strftime('%d/%m/%Y')
+    #as_datetime=True keeps a datetime64 column instead of strings
+    return default_normalizer.normalize(series, as_datetime, date_format)
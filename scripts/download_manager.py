@@ -0,0 +1,168 @@
+import json
+import os
+import re
+import zipfile
+
+import requests
+
+from http_cache import make_session
+
+
+#download manager for the bulk files (the assemblee historique zip, the senat .xls, the data.gouv CSV)
+#- the ETag / Last-Modified / Content-Length of the last download are kept next to the file (<file>.meta.json),
+#  an unchanged remote file is not downloaded again
+#- the transfer goes to <file>.part; an interrupted transfer is resumed with an HTTP Range request,
+#  If-Range makes the server send the whole file again if it changed in between
+#- the body is written in large blocks through a big write buffer, and its size (and the CRCs of a zip)
+#  are checked before the file replaces the previous one
+#these files bypass the on-disk page cache of http_cache.py, they would only be stored twice
+
+chunk_size = 1024 * 1024
+buffer_size = 8 * 1024 * 1024
+#(connect, read) timeouts: a stalled transfer fails after the read timeout and is resumed
+timeout = (15, 60)
+#resume attempts after a connection error in the middle of a transfer
+max_resumes = 5
+
+content_range_pattern = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(Exception):
+    pass
+
+
+def read_meta(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_meta(path, meta):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def remote_version(response):
+    #validators of the remote file; size is the size of the whole file, also for a 206 answer
+    size = response.headers.get('Content-Length')
+    if response.status_code == 206:
+        match = content_range_pattern.match(response.headers.get('Content-Range', ''))
+        size = match.group(3) if match and match.group(3) != '*' else None
+    return {
+        'url': response.url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'size': int(size) if size and size.isdigit() else None,
+        'accept_ranges': response.headers.get('Accept-Ranges', '').lower() == 'bytes',
+    }
+
+def same_version(known, remote):
+    #ETag when both have one, otherwise Last-Modified and size, otherwise the size alone
+    if not known or not remote:
+        return False
+    if known.get('etag') and remote.get('etag'):
+        return known['etag'] == remote['etag']
+    if known.get('last_modified') and remote.get('last_modified'):
+        return known['last_modified'] == remote['last_modified'] and known.get('size') == remote.get('size')
+    return known.get('size') is not None and known.get('size') == remote.get('size')
+
+def verify_zip(path):
+    #reads every member and checks its CRC, a truncated or corrupted archive fails here and not during the parsing
+    try:
+        with zipfile.ZipFile(path) as zip_ref:
+            bad_member = zip_ref.testzip()
+    except zipfile.BadZipFile as e:
+        raise DownloadError(f"{path} is not a valid zip file: {e}")
+    if bad_member is not None:
+        raise DownloadError(f"CRC check failed for {bad_member} in {path}")
+
+
+class DownloadManager:
+    def __init__(self, session=None, headers=None, limiter=None):
+        self.session = session or make_session(headers, use_cache=False, limiter=limiter)
+
+    def download(self, url, path, verify=None):
+        #returns path once it holds the current version of url
+        #verify: function called with the downloaded file before it is kept, by default the CRC check of .zip files
+        if verify is None and path.lower().endswith('.zip'):
+            verify = verify_zip
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        for attempt in range(max_resumes + 1):
+            try:
+                return self._download(url, path, verify)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == max_resumes:
+                    raise
+                print(f"Download of {url} interrupted ({e}), resuming...")
+
+    def _download(self, url, path, verify):
+        meta_path = path + '.meta.json'
+        part_path = path + '.part'
+        part_meta_path = part_path + '.json'
+        #identity: Content-Length and the byte ranges must be those of the file itself, not of a compressed body
+        headers = {'Accept-Encoding': 'identity'}
+
+        remote = None
+        head = self.session.head(url, allow_redirects=True, headers=headers, timeout=timeout)
+        if head.ok:
+            remote = remote_version(head)
+            if os.path.exists(path) and same_version(read_meta(meta_path), remote):
+                print(f"{os.path.basename(path)} is unchanged on the server, skipping the download.")
+                return path
+
+        offset = 0
+        if os.path.exists(part_path) and same_version(read_meta(part_meta_path), remote) and remote['accept_ranges']:
+            offset = os.path.getsize(part_path)
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = remote['etag'] or remote['last_modified']
+
+        with self.session.get(url, stream=True, headers=headers, timeout=timeout) as response:
+            if response.status_code == 416:
+                #the part file is already complete (or longer than the remote file): start again from zero
+                remove_file(part_path)
+                raise requests.ConnectionError(f"range not satisfiable for {url}")
+            response.raise_for_status()
+            current = remote_version(response)
+            if remote is None and os.path.exists(path) and same_version(read_meta(meta_path), current):
+                #no HEAD support: the validators of the GET answer are checked before reading its body
+                print(f"{os.path.basename(path)} is unchanged on the server, skipping the download.")
+                return path
+
+            if response.status_code == 206:
+                print(f"Resuming {os.path.basename(path)} at {offset / 1024 / 1024:.1f} MB...")
+                mode = 'ab'
+            else:
+                offset = 0
+                mode = 'wb'
+            write_meta(part_meta_path, current)
+            with open(part_path, mode, buffering=buffer_size) as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+
+        size = os.path.getsize(part_path)
+        if current['size'] is not None and size != current['size']:
+            if size > current['size']:
+                remove_file(part_path)
+            #a short file is kept and resumed by the next attempt
+            raise requests.ConnectionError(f"{url}: got {size} bytes, expected {current['size']}")
+        if verify is not None:
+            try:
+                verify(part_path)
+            except DownloadError:
+                remove_file(part_path)
+                remove_file(part_meta_path)
+                raise
+
+        os.replace(part_path, path)
+        current['size'] = size
+        write_meta(meta_path, current)
+        remove_file(part_meta_path)
+        return path
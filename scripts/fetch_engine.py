@@ -0,0 +1,44 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+#bounded thread-pool fetcher shared by the scrapers
+#the scrapes are limited by network round trips, not CPU, so several requests are kept in flight at once
+#a semaphore per host caps how many of them hit the same website at the same time
+
+class FetchEngine:
+    def __init__(self, session, max_workers=8, per_host_limit=4, timeout=30):
+        self.session = session
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def fetch(self, url, **kwargs):
+        #a single GET, waiting for a free slot on the url's host first
+        kwargs.setdefault('timeout', self.timeout)
+        with self._host_slot(url):
+            return self.session.get(url, **kwargs)
+
+    def submit(self, fn, *args, **kwargs):
+        #runs any fetch-and-process task on the engine's pool
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
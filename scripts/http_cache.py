@@ -0,0 +1,259 @@
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from rate_limit import RateLimitedAdapter
+
+
+#persistent on-disk cache for every GET the scrapers make
+#bodies are stored once per content hash in cache_dir/blobs, an sqlite index maps url -> body + validators
+#a fresh entry (younger than ttl) is served from disk, a stale one is revalidated with
+#If-None-Match / If-Modified-Since so an unchanged source costs a 304 instead of a full download
+#when the blobs grow over max_bytes the least recently used entries are evicted
+
+default_cache_dir = os.environ.get(
+    'SCRAPER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+)
+#record / replay every request in a capture archive (capture_archive.py), for all the scrapers at once
+default_record_dir = os.environ.get('SCRAPER_RECORD')
+default_replay_dir = os.environ.get('SCRAPER_REPLAY')
+default_ttl = 6 * 3600
+default_max_bytes = 2 * 1024 ** 3
+
+#headers that describe the wire transfer, not the (decoded) body we keep on disk
+hop_headers = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'}
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=default_cache_dir, ttl=default_ttl, max_bytes=default_max_bytes):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                blob TEXT,
+                size INTEGER,
+                stored_at REAL,
+                last_access REAL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(method, url):
+        #the prepared url already carries the encoded query parameters
+        return hashlib.sha256(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def lookup(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, status, headers, etag, last_modified, blob, size, stored_at FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(self.blob_path(row[5])):
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return {
+            'url': row[0], 'status': row[1], 'headers': json.loads(row[2]), 'etag': row[3],
+            'last_modified': row[4], 'blob': row[5], 'size': row[6], 'stored_at': row[7]
+        }
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] < self.ttl
+
+    def write_blob(self, chunks):
+        #streams the body to a temporary file while hashing it, then moves it to its content address
+        tmp_path = os.path.join(self.blob_dir, f"tmp-{uuid.uuid4().hex}")
+        digest = hashlib.sha256()
+        size = 0
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                if chunk:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+        digest = digest.hexdigest()
+        path = self.blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        return digest, size
+
+    def store(self, key, url, status, headers, digest, size):
+        headers = CaseInsensitiveDict({k: v for k, v in headers.items() if k.lower() not in hop_headers})
+        headers['Content-Length'] = str(size)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(dict(headers)), headers.get('ETag'),
+                 headers.get('Last-Modified'), digest, size, now, now)
+            )
+            self._db.commit()
+            self._evict(keep=key)
+        return self.lookup(key)
+
+    def touch(self, key, new_headers):
+        #a 304 confirms the stored body, refresh its age and any validators the server resent
+        with self._lock:
+            row = self._db.execute("SELECT headers FROM entries WHERE key = ?", (key,)).fetchone()
+            headers = CaseInsensitiveDict(json.loads(row[0]) if row else {})
+            for name in ('ETag', 'Last-Modified', 'Date', 'Expires', 'Cache-Control'):
+                if name in new_headers:
+                    headers[name] = new_headers[name]
+            self._db.execute(
+                "UPDATE entries SET headers = ?, etag = ?, last_modified = ?, stored_at = ? WHERE key = ?",
+                (json.dumps(dict(headers)), headers.get('ETag'), headers.get('Last-Modified'), time.time(), key)
+            )
+            self._db.commit()
+
+    def _evict(self, keep=None):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, digest, size in self._db.execute(
+            "SELECT key, blob, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            still_used = self._db.execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (digest,)).fetchone()
+            if not still_used:
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+            total -= size
+        self._db.commit()
+
+
+class CachingAdapter(RateLimitedAdapter):
+    #drop-in replacement for HTTPAdapter, accepts the same arguments (max_retries, pool_maxsize, ...)
+    #only requests that reach the network take a token from the rate limiter, cache hits are free
+
+    def __init__(self, cache=None, **kwargs):
+        self.cache = cache if cache is not None else ResponseCache()
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != 'GET' or 'Range' in request.headers:
+            return super().send(request, stream=stream, **kwargs)
+
+        key = self.cache.make_key(request.method, request.url)
+        entry = self.cache.lookup(key)
+        if entry and self.cache.is_fresh(entry):
+            return self._cached_response(request, entry, stream)
+
+        conditional = request.copy()
+        if entry:
+            if entry['etag']:
+                conditional.headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                conditional.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = super().send(conditional, stream=True, **kwargs)
+        if response.status_code == 304 and entry:
+            response.close()
+            self.cache.touch(key, response.headers)
+            return self._cached_response(request, entry, stream)
+        if response.status_code != 200:
+            if not stream:
+                response.content
+            return response
+
+        digest, size = self.cache.write_blob(response.raw.stream(64 * 1024, decode_content=True))
+        response.close()
+        entry = self.cache.store(key, request.url, response.status_code, response.headers, digest, size)
+        return self._cached_response(request, entry, stream)
+
+    def _cached_response(self, request, entry, stream):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        path = self.cache.blob_path(entry['blob'])
+        if stream:
+            response.raw = open(path, 'rb')
+        else:
+            with open(path, 'rb') as f:
+                response._content = f.read()
+            response._content_consumed = True
+            response.raw = io.BytesIO()
+        return response
+
+
+def make_session(headers=None, cache=None, use_cache=True, limiter=None, record=default_record_dir,
+                 replay=default_replay_dir, **adapter_kwargs):
+    #builds the requests.Session used by the scrapers, with the on-disk cache mounted for http and https
+    #limiter: a rate_limit.HostRateLimiter shared by everything fetched through this session
+    #record / replay: folder of a capture archive the session records into / answers from (see capture_archive.py)
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    if use_cache:
+        adapter = CachingAdapter(cache=cache, limiter=limiter, **adapter_kwargs)
+    else:
+        adapter = RateLimitedAdapter(limiter=limiter, **adapter_kwargs)
+    if record or replay:
+        from capture_archive import archive_adapter
+        adapter = archive_adapter(adapter, record, replay)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ResponseStream(io.RawIOBase):
+    #read-only file object over the body of a streamed response (session.get(url, stream=True)),
+    #for readers such as pd.read_csv that take a file; the body is decoded (gzip, ...) and read chunk by chunk
+
+    def __init__(self, response, chunk_size=64 * 1024):
+        self._chunks = response.iter_content(chunk_size=chunk_size)
+        self._pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
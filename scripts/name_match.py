@@ -0,0 +1,174 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+import pandas as pd
+
+
+#name matching for the merges done on deputy names (FR_dep_11.py: table x profiles, FR_dep_17.py: data.gouv x
+#multicriteria table), where an exact "First Last" string misses "Jean-Pierre"/"Jean Pierre", "Hélène"/"Helene",
+#"M. Dupont"/"Dupont" or "de La Verpillière"/"La Verpillière"
+#names are reduced to a key: accents folded, lower case, titles and particles dropped, punctuation removed and
+#tokens sorted (so "Last First" and "First Last" give the same key); normalization is memoized per distinct name
+#a name is matched at once when its key is the key of exactly one candidate; otherwise only the candidates sharing
+#a token, or the beginning / end of a token (for typos), with it (its blocks) are scored, never the whole list,
+#so matching thousands of names stays fast
+#names without a good enough candidate, or with several close ones, are reported and left unmatched; the fuzzy
+#matches are reported too, with the name they were matched to, so they can be checked
+
+#minimum score of a fuzzy match, and how far ahead of the second best candidate it has to be
+match_threshold = 0.85
+ambiguity_margin = 0.05
+#score of a name whose tokens are all in the other one ("Jean Dupont" in "Jean Pierre Dupont"), unless its similarity
+#is higher; below match_threshold, so "Jean Dupont" is not taken for "Jean-Pierre Dupont" when the latter is missing
+subset_score = 0.82
+#tokens shared by more names than this ("jean", "marie") are not used as blocks when the name has rarer ones
+max_block_size = 200
+
+title_pattern = re.compile(r"^(?:m|mme|mlle|mm|am|dr)\.?\s+")
+separator_pattern = re.compile(r"[\s\-\u2010-\u2015'\u2019`.,;()]+")
+particles = {'de', 'du', 'des', 'd', 'la', 'le', 'les', 'l', 'von', 'van', 'der', 'di', 'da', 'dos', 'das', 'del', 'y', 'e'}
+
+
+@lru_cache(maxsize=None)
+def fold(name):
+    #lower case, without accents, ligatures expanded ("Œ" -> "oe"), single spaces
+    if not isinstance(name, str):
+        return ''
+    name = unicodedata.normalize('NFKD', name.replace('œ', 'oe').replace('Œ', 'Oe').replace('æ', 'ae').replace('Æ', 'Ae'))
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower().strip()
+    return ' '.join(name.split())
+
+@lru_cache(maxsize=None)
+def name_tokens(name):
+    #sorted tokens of the folded name, without title and particles (kept if the name is nothing else)
+    folded = title_pattern.sub('', fold(name))
+    tokens = [t for t in separator_pattern.split(folded) if t]
+    kept = [t for t in tokens if t not in particles]
+    return tuple(sorted(kept or tokens))
+
+def name_key(name):
+    return ' '.join(name_tokens(name))
+
+def blocking_keys(tokens):
+    #the tokens, and the first and last 4 letters of the long ones, so a typo still shares a block
+    for token in set(tokens):
+        yield token
+        if len(token) >= 6:
+            yield token[:4] + '*'
+            yield '*' + token[-4:]
+
+def score(tokens_a, tokens_b, minimum=0.0, matcher=None):
+    #similarity of the sorted keys; a name whose tokens are all in the other one scores at least subset_score
+    #scores that cannot reach minimum are cut short with the cheap upper bounds of SequenceMatcher (result 0)
+    #matcher: a SequenceMatcher whose second sequence is already the key of tokens_b, its index is reused
+    if tokens_a == tokens_b:
+        return 1.0
+    shorter, longer = sorted((set(tokens_a), set(tokens_b)), key=len)
+    contained = subset_score if shorter and shorter <= longer else 0.0
+    if matcher is None:
+        matcher = SequenceMatcher(None, ' '.join(tokens_a), ' '.join(tokens_b))
+    else:
+        matcher.set_seq1(' '.join(tokens_a))
+    if max(contained, matcher.real_quick_ratio()) < minimum or max(contained, matcher.quick_ratio()) < minimum:
+        return 0.0
+    return max(contained, matcher.ratio())
+
+
+class NameMatcher:
+    #index of candidate names: key -> rows and token -> rows (the blocks)
+
+    def __init__(self, names, threshold=match_threshold, margin=ambiguity_margin, max_block=max_block_size):
+        self.names = list(names)
+        self.threshold = threshold
+        self.margin = margin
+        self.max_block = max_block
+        self.tokens = [name_tokens(name) for name in self.names]
+        self.keys = {}
+        self.blocks = {}
+        for row, tokens in enumerate(self.tokens):
+            if not tokens:
+                continue
+            self.keys.setdefault(tokens, []).append(row)
+            for block in blocking_keys(tokens):
+                self.blocks.setdefault(block, []).append(row)
+
+    def candidates(self, tokens):
+        blocks = [self.blocks[key] for key in blocking_keys(tokens) if key in self.blocks]
+        if not blocks:
+            return set()
+        rare = [block for block in blocks if len(block) <= self.max_block]
+        rows = set()
+        for block in rare or [min(blocks, key=len)]:
+            rows.update(block)
+        return rows
+
+    def match(self, name):
+        #(row of the matched candidate or None, score, status, best candidate names)
+        #status: 'exact', 'fuzzy', 'ambiguous' or 'unmatched'; a fuzzy match lists the name it was matched to
+        tokens = name_tokens(name)
+        if not tokens:
+            return None, 0.0, 'unmatched', []
+        same_key = self.keys.get(tokens, [])
+        if len(same_key) == 1:
+            return same_key[0], 1.0, 'exact', []
+        if len(same_key) > 1:
+            return None, 1.0, 'ambiguous', [self.names[row] for row in same_key]
+
+        #candidates more than margin below the threshold cannot be a match nor make one ambiguous
+        minimum = self.threshold - self.margin
+        matcher = SequenceMatcher(None, '', ' '.join(tokens))
+        scored = sorted(((score(self.tokens[row], tokens, minimum, matcher), row) for row in self.candidates(tokens)),
+                        reverse=True)
+        scored = [(s, row) for s, row in scored if s > 0]
+        if not scored or scored[0][0] < self.threshold:
+            return None, scored[0][0] if scored else 0.0, 'unmatched', [self.names[row] for _, row in scored[:3]]
+        best_score, best_row = scored[0]
+        close = [row for s, row in scored if best_score - s < self.margin]
+        if len(close) > 1:
+            return None, best_score, 'ambiguous', [self.names[row] for row in close]
+        return best_row, best_score, 'fuzzy', [self.names[best_row]]
+
+    def match_all(self, names):
+        #one row per name (same index): row, score, status, candidates; each distinct name is matched once
+        names = pd.Series(names)
+        results = {name: self.match(name) for name in names.drop_duplicates()}
+        return pd.DataFrame([results[name] for name in names], index=names.index,
+                            columns=['row', 'score', 'status', 'candidates'])
+
+
+def merge_on_names(left, right, left_names, right_names, how='left', report_path=None, **matcher_kwargs):
+    #replaces pd.merge(left, right, how=how, left_on=<name key>, right_on=<name key>)
+    #left_names / right_names: Series of names aligned with the rows of left and right
+    #fuzzy, ambiguous and unmatched names of both sides are printed and, with report_path, written to a CSV
+    left = left.reset_index(drop=True)
+    right = right.reset_index(drop=True)
+    matcher = NameMatcher(pd.Series(right_names).reset_index(drop=True), **matcher_kwargs)
+    matches = matcher.match_all(pd.Series(left_names).reset_index(drop=True))
+
+    merge_rows = matches['row'].fillna(-1).astype(int)
+    merged = pd.merge(left.assign(__match_row=merge_rows.values), right.assign(__match_row=range(len(right))),
+                      how=how, on='__match_row')
+    merged = merged.drop(columns='__match_row')
+
+    report = matches[matches['status'] != 'exact'].assign(side='left')
+    report['name'] = pd.Series(left_names).reset_index(drop=True)[report.index]
+    matched_rows = set(merge_rows[merge_rows >= 0])
+    unused = [row for row in range(len(right)) if row not in matched_rows]
+    report = pd.concat([report, pd.DataFrame({
+        'side': 'right', 'name': [matcher.names[row] for row in unused], 'status': 'unmatched', 'score': None,
+    })], ignore_index=True)
+    report['candidates'] = report['candidates'].apply(lambda names: '; '.join(names) if isinstance(names, list) else '')
+    report = report[['side', 'name', 'status', 'score', 'candidates']]
+
+    counts = matches['status'].value_counts()
+    print(f"Name matching: {counts.get('exact', 0)} exact, {counts.get('fuzzy', 0)} fuzzy, "
+          f"{counts.get('ambiguous', 0)} ambiguous, {counts.get('unmatched', 0)} unmatched, "
+          f"{len(unused)} names of the other table not used")
+    for row in report.head(20).itertuples(index=False):
+        print(f"  {row.side} {row.status}: {row.name}" + (f" (candidates: {row.candidates})" if row.candidates else ""))
+    if report_path and not report.empty:
+        report.to_csv(report_path, index=False, encoding='utf-8-sig')
+        print(f"Fuzzy, ambiguous and unmatched names saved to {report_path}")
+    return merged
@@ -0,0 +1,35 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+#second stage of the scrapers: the I/O threads only download raw pages and hand them to a pool
+#of parse processes, so BeautifulSoup parsing runs on all cores instead of fighting for the GIL
+#at most max_pending pages wait for a parser, after that submit() blocks the fetching thread (backpressure)
+#the parse functions must live in an importable module (not in the script itself) to reach the processes
+
+class ParsePool:
+    def __init__(self, parse_workers=None, max_pending=None):
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.parse_workers
+        self._executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, fn, *args, **kwargs):
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,46 +1,42 @@
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import pandas as pd
-from io import StringIO
 import re
+from http_cache import make_session, ResponseStream
+from dataset_output import write_dataset
 
 
 output_path = r"C:\Users\HONOR\Desktop\RA\France\pol_leaning\ches_parties_UK_FR.csv"
+#output format: 'csv', or 'parquet' / 'feather' for a typed dataset folder partitioned by country (needs pyarrow, see dataset_output.py)
+output_format = 'csv'
+column_types = {
+    "year": "int", "party_id": "int", "party_abb": "category", "party_name": "category",
+    "family": "category", "lrgen": "float", "galtan": "float"
+}
 
-print("Starting CHES data processing...")
-
-# CHES dataset page
-url = 'https://www.chesdata.eu/ches-europe'
-headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-response = requests.get(url, headers=headers)
-soup = BeautifulSoup(response.text, "lxml")
-
-csv_links = []
-
-# Filter CSV links by year and content
-for link in soup.find_all('a', href=True):
-    href = link['href']
-    if not href.lower().endswith('.csv'):
-        continue
-    if '1999-2019' in href:
-        csv_links.append(urljoin(url, href))
-    elif '2024' in href and 'Ukraine' not in href:
-        csv_links.append(urljoin(url, href))
-    elif '2017' in href and 'combined_experts' not in href:
-        csv_links.append(urljoin(url, href))
-
-# Download and parse CSVs
-dataframes = {}
-for link in csv_links:
-    try:
-        print(f"Downloading: {link}")
-        csv_response = requests.get(link)
+#CHES country codes to keep: numeric code of the older files -> code used in the output (and in the newer files)
+ches_countries = {6: 'fr', 11: 'uk'}
+#the CHES files are read in chunks of this many rows, only these columns and the rows of the selected countries are kept
+ches_chunk_rows = 20000
+selected_columns = ['country', 'year', 'party_id', 'family', 'lrgen', 'galtan']
+
+def in_selected_countries(country):
+    #country codes are numbers (6) in the older files and strings ('fr') in the newer ones; the string columns are
+    #object or str depending on the pandas version, so anything that is not numeric is compared as text
+    if pd.api.types.is_numeric_dtype(country):
+        return country.isin(list(ches_countries))
+    return country.astype(str).str.upper().isin([code.upper() for code in ches_countries.values()])
+
+def read_ches_csv(link):
+    #the body is parsed while it is read, chunk by chunk, with only the selected columns;
+    #each chunk is filtered by country at once, so only the rows kept are ever held in memory
+    with session.get(link, stream=True) as csv_response:
         csv_response.raise_for_status()
-        df = pd.read_csv(StringIO(csv_response.text))
-        dataframes[link] = df
-    except Exception as e:
-        print(f"Failed to load {link}: {e}")
+        chunks = pd.read_csv(
+            ResponseStream(csv_response), usecols=lambda col: col in selected_columns,
+            chunksize=ches_chunk_rows, encoding=csv_response.encoding or 'utf-8'
+        )
+        return pd.concat([chunk[in_selected_countries(chunk['country'])] for chunk in chunks], ignore_index=True)
 
 # Family ID to name mapping
 family_mapping = {
@@ -110,63 +106,108 @@ def map_family(value):
         else:
             return str(value).strip().capitalize()
 
-# Process both France and UK
-filtered_dfs = []
-
-for url, df in dataframes.items():
-    print(f"Filtering: {url}")
-    try:
-        if df['country'].dtype == object:
-            df_filtered = df[df['country'].str.upper().isin(['FR', 'UK'])]
-        else:
-            df_filtered = df[df['country'].isin([6, 11])]
-
-        # Handle missing year in 2024 CSV
-        if 'CHES_2024_final_v2.csv' in url:
-            df_filtered = df_filtered.copy()
-            df_filtered['year'] = 2024
-
-        selected_columns = ['country', 'year', 'party_id', 'family', 'lrgen', 'galtan']
-        df_filtered = df_filtered[[col for col in selected_columns if col in df_filtered.columns]]
-
-        # Normalize family names
-        if 'family' in df_filtered.columns:
-            df_filtered['family'] = df_filtered['family'].apply(map_family)
-
-        filtered_dfs.append(df_filtered)
-    except Exception as e:
-        print(f"Error filtering {url}: {e}")
-
-# Combine all filtered data
-print("\nCombining filtered datasets...")
-combined_df = pd.concat(filtered_dfs, ignore_index=True)
-
-# Replace numeric country codes
-combined_df['country'] = combined_df['country'].replace({6: 'fr', 11: 'uk'})
-
-# Fill missing year with 2024
-combined_df['year'] = combined_df['year'].fillna(2024)
-
-# Drop rows with missing party_id
-combined_df = combined_df.dropna(subset=['party_id'])
-
-# Convert types
-combined_df['year'] = combined_df['year'].astype(int)
-combined_df['party_id'] = combined_df['party_id'].astype(int)
-
-# Add party_abb and party_name columns
-combined_df['party_abb'] = combined_df['party_id'].apply(lambda pid: party_name_mapping.get(pid, ("", ""))[0])
-combined_df['party_name'] = combined_df['party_id'].apply(lambda pid: party_name_mapping.get(pid, ("", ""))[1])
-
-# Sort
-combined_df_sorted = combined_df.sort_values(by=['country', 'party_id', 'year']).reset_index(drop=True)
-column_order = ['country', 'year', 'party_id', 'party_abb', 'party_name', 'family', 'lrgen', 'galtan']
-combined_df_sorted = combined_df_sorted[column_order]
-# Save
-print(f"Saving combined data to: {output_path}")
-combined_df_sorted.to_csv(output_path, index=False, encoding="utf-8-sig")
-
-print("Data saved successfully.")
+# Party abbreviation / name lookup table, built once and joined on party_id
+party_table = pd.DataFrame.from_dict(party_name_mapping, orient='index', columns=['party_abb', 'party_name'])
+
+def map_family_column(values):
+    #map_family runs once per distinct value (the files repeat a handful of family codes and labels),
+    #the results are spread back to the rows through the codes
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped = pd.Series([map_family(value) for value in uniques], dtype=object)
+    return pd.Series(mapped.to_numpy()[codes], index=values.index, name=values.name)
+
+#the scraping runs only when the script is executed, the helpers above can be imported without running it
+
+if __name__ == '__main__':
+    print("Starting CHES data processing...")
+
+    # CHES dataset page
+    url = 'https://www.chesdata.eu/ches-europe'
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+    session = make_session(headers)
+    response = session.get(url)
+    soup = BeautifulSoup(response.text, "lxml")
+
+    csv_links = []
+
+    # Filter CSV links by year and content
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if not href.lower().endswith('.csv'):
+            continue
+        if '1999-2019' in href:
+            csv_links.append(urljoin(url, href))
+        elif '2024' in href and 'Ukraine' not in href:
+            csv_links.append(urljoin(url, href))
+        elif '2017' in href and 'combined_experts' not in href:
+            csv_links.append(urljoin(url, href))
+
+    # Download and parse CSVs
+    dataframes = {}
+    for link in csv_links:
+        try:
+            print(f"Downloading: {link}")
+            dataframes[link] = read_ches_csv(link)
+        except Exception as e:
+            print(f"Failed to load {link}: {e}")
+
+    # Process the selected countries
+    filtered_dfs = []
+
+    for url, df in dataframes.items():
+        print(f"Filtering: {url}")
+        try:
+            #the rows were already filtered by country while reading
+            df_filtered = df
+
+            # Handle missing year in 2024 CSV
+            if 'CHES_2024_final_v2.csv' in url:
+                df_filtered = df_filtered.copy()
+                df_filtered['year'] = 2024
+
+            df_filtered = df_filtered[[col for col in selected_columns if col in df_filtered.columns]]
+
+            # Normalize family names
+            if 'family' in df_filtered.columns:
+                df_filtered['family'] = map_family_column(df_filtered['family'])
+
+            filtered_dfs.append(df_filtered)
+        except Exception as e:
+            print(f"Error filtering {url}: {e}")
+
+    # Combine all filtered data
+    print("\nCombining filtered datasets...")
+    combined_df = pd.concat(filtered_dfs, ignore_index=True)
+
+    # Replace numeric country codes
+    combined_df['country'] = combined_df['country'].replace(ches_countries)
+
+    # Fill missing year with 2024
+    combined_df['year'] = combined_df['year'].fillna(2024)
+
+    # Drop rows with missing party_id
+    combined_df = combined_df.dropna(subset=['party_id'])
+
+    # Convert types
+    combined_df['year'] = combined_df['year'].astype(int)
+    combined_df['party_id'] = combined_df['party_id'].astype(int)
+
+    # Add party_abb and party_name columns
+    combined_df = combined_df.join(party_table, on='party_id')
+    combined_df[['party_abb', 'party_name']] = combined_df[['party_abb', 'party_name']].fillna("")
+
+    # Sort
+    combined_df_sorted = combined_df.sort_values(by=['country', 'party_id', 'year']).reset_index(drop=True)
+    column_order = ['country', 'year', 'party_id', 'party_abb', 'party_name', 'family', 'lrgen', 'galtan']
+    combined_df_sorted = combined_df_sorted[column_order]
+    # Categorical columns: the country, party and family labels repeat over the years
+    for col in ['country', 'party_abb', 'party_name', 'family']:
+        combined_df_sorted[col] = combined_df_sorted[col].astype('category')
+    # Save
+    print(f"Saving combined data to: {output_path}")
+    write_dataset(combined_df_sorted, output_path, output_format, column_types, partition_by=["country"])
+
+    print("Data saved successfully.")
 
 #2024 Chapel Hill expert survey
 #1999-2019 Chapel Hill Expert Survey (CHES) trend file 2002, 2006, 2010, 2014, 2019.
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+
+#per-host token bucket shared by all the workers of a scraper
+#instead of every worker sleeping after each request, a request waits only as long as needed
+#to stay under requests_per_second for its host, so workers stay busy right up to the polite limit
+
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        #takes a token (the balance may go negative) and returns how long the caller has to wait for it
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class HostRateLimiter:
+    #rates: optional {host: requests_per_second} overriding the default rate for specific hosts
+
+    def __init__(self, requests_per_second=2.0, burst=1, rates=None):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.rates = rates or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                rate = self.rates.get(host, self.requests_per_second)
+                self._buckets[host] = TokenBucket(rate, self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url):
+        self.bucket(url).acquire()
+
+    async def acquire_async(self, url):
+        await self.bucket(url).acquire_async()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    #HTTPAdapter that takes a token from the limiter before every request that goes to the network
+
+    def __init__(self, limiter=None, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.limiter is not None:
+            self.limiter.acquire(request.url)
+        return super().send(request, **kwargs)
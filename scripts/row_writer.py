@@ -0,0 +1,176 @@
+import gzip
+import io
+import json
+
+import pandas as pd
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+#streaming output stage: rows are written while they are produced instead of being collected in a list first
+#at most buffer_rows rows are kept in memory, each full buffer is turned into a small DataFrame and appended
+#to the file, so peak memory does not grow with the number of legislatures / organe types scraped
+
+class StreamingCSVWriter:
+    #columns: the header of the file, a missing key in a row is written as an empty cell like in df.to_csv
+    #transform: optional function DataFrame -> DataFrame applied to every chunk before it is written
+
+    def __init__(self, path, columns, buffer_rows=1000, transform=None, encoding='utf-8-sig'):
+        self.path = path
+        self.columns = list(columns)
+        self.buffer_rows = buffer_rows
+        self.transform = transform
+        self.rows_written = 0
+        self._buffer = []
+        self._header = True
+        self._file = open(path, 'w', encoding=encoding, newline='')
+
+    def write(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer and not self._header:
+            return
+        chunk = pd.DataFrame(self._buffer, columns=self.columns)
+        if self.transform is not None:
+            chunk = self.transform(chunk)
+        chunk.to_csv(self._file, index=False, header=self._header)
+        self._file.flush()
+        self._header = False
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamingJSONArrayWriter:
+    #writes the same text as json.dump(list_of_rows, f, indent=indent), one element at a time
+
+    def __init__(self, path, indent=2, ensure_ascii=False, buffer_rows=1000, encoding='utf-8-sig'):
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.buffer_rows = buffer_rows
+        self.rows_written = 0
+        self._buffer = []
+        self._file = open(path, 'w', encoding=encoding)
+
+    def write(self, row):
+        pad = ' ' * self.indent
+        item = json.dumps(row, ensure_ascii=self.ensure_ascii, indent=self.indent)
+        self._buffer.append(('[\n' if self.rows_written == 0 else ',\n') + pad + item.replace('\n', '\n' + pad))
+        self.rows_written += 1
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        self._file.write(''.join(self._buffer))
+        self._file.flush()
+        self._buffer = []
+
+    def close(self):
+        if not self._file.closed:
+            self._buffer.append('\n]' if self.rows_written else '[]')
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def ndjson_compression(path):
+    #compression from the file name: .gz -> gzip, .zst -> zstd, anything else uncompressed
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return None
+
+def open_ndjson(path, mode):
+    #mode 'r' or 'w', text in utf-8
+    compression = ndjson_compression(path)
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard is needed for .zst files (pip install zstandard)")
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor(level=6).stream_writer(open(path, 'wb'), closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class StreamingNDJSONWriter:
+    #newline-delimited JSON: one compact object per line, so a reader can go through the file row by row
+    #compressed with gzip or zstd when the path ends with .gz or .zst
+
+    def __init__(self, path, buffer_rows=1000):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.rows_written = 0
+        self._buffer = []
+        self._file = open_ndjson(path, 'w')
+
+    def write(self, row):
+        self._buffer.append(json.dumps(row, ensure_ascii=False) + '\n')
+        self.rows_written += 1
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        self._file.write(''.join(self._buffer))
+        self._buffer = []
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_ndjson(path, **filters):
+    #yields the rows of an NDJSON file (compressed or not) one at a time
+    #filters: field=value or field=[values], compared as strings, e.g. read_ndjson(path, legislature=17, typeOrgane="BUREAU")
+    #a line is only decoded when its text contains one of the wanted "field": "value" pairs
+    wanted = {
+        field: {str(value) for value in (values if isinstance(values, (list, tuple, set)) else [values])}
+        for field, values in filters.items()
+    }
+    needles = [
+        [json.dumps(field, ensure_ascii=False) + separator + text
+         for value in values for separator in (': ', ':')
+         for text in ([json.dumps(value, ensure_ascii=False), value] if value.isdigit() else [json.dumps(value, ensure_ascii=False)])]
+        for field, values in wanted.items()
+    ]
+    with open_ndjson(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if not all(any(needle in line for needle in field_needles) for field_needles in needles):
+                continue
+            row = json.loads(line)
+            if all(str(row.get(field)) in values for field, values in wanted.items()):
+                yield row
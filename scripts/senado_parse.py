@@ -0,0 +1,236 @@
+import html
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+#parsing of the Senado senator profile pages, kept apart from BR_Senate_all.py
+#so that it can run in the parse processes of parse_pool.ParsePool
+
+#only a few regions of a profile page are used, the fast path builds the tree for those alone
+#(the <small> tags are kept too, the party is read from the first one on the page)
+
+out_of_service_marker = ' (Fora de Exercício) '
+tag_pattern = re.compile(r'<[^>]*>')
+
+profile_region_ids = {'comissoes', 'accordion-biografia', 'accordion-mandatos-exercicios'}
+
+def is_profile_region(name, attrs):
+    classes = attrs.get('class') or ''
+    if isinstance(classes, str):
+        classes = classes.split()
+    return (
+        (name == 'dl' and 'dl-horizontal' in classes)
+        or (name == 'div' and ('head' in classes or attrs.get('id') in profile_region_ids))
+        or (name == 'table' and attrs.get('title') == 'Chapa eleitoral do Senador')
+        or name == 'small'
+    )
+
+class ProfileRegions(SoupStrainer):
+    #a tag is kept (with everything inside it) when is_profile_region accepts it
+    #allow_tag_creation is the hook of bs4 >= 4.13, search_tag the one of older versions
+
+    def __init__(self):
+        super().__init__(['dl', 'div', 'table', 'small'])
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return is_profile_region(name, attrs or {})
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return is_profile_region(markup_name, markup_attrs or {})
+
+profile_regions = ProfileRegions()
+
+#region -> text that is in the raw page whenever the region exists, used to detect a fast parse that missed it
+region_markers = {
+    'comissoes': 'comissoes',
+    'accordion-biografia': 'accordion-biografia',
+    'accordion-mandatos-exercicios': 'accordion-mandatos-exercicios',
+    'dl-horizontal': 'dl-horizontal',
+    'chapa': 'Chapa eleitoral do Senador',
+}
+
+def safe_get_text(tags, index):
+    try:
+        return tags[index].get_text(strip=True)
+    except IndexError:
+        return "N/A"
+
+def parse_profile(profile_html, sex, encoding=None):
+    #profile_html is the raw page (bytes) handed over by the fetch stage, encoding the one declared by the server
+    #the partial parse is tried first, the full one is used when a region present in the page was not found
+    record = parse_profile_fast(profile_html, sex, encoding)
+    if record is None:
+        record = parse_profile_full(profile_html, sex, encoding)
+    return record
+
+def parse_profile_full(profile_html, sex, encoding=None):
+    profile_soup = BeautifulSoup(profile_html, "lxml", from_encoding=encoding)
+    return extract_profile(profile_soup, out_of_service_marker in profile_soup.text, sex)
+
+def parse_profile_fast(profile_html, sex, encoding=None):
+    profile_soup = BeautifulSoup(profile_html, "lxml", from_encoding=encoding, parse_only=profile_regions)
+    if isinstance(profile_html, bytes):
+        page_text = profile_html.decode(profile_soup.original_encoding or 'utf-8', errors='replace')
+    else:
+        page_text = profile_html
+
+    found = {
+        'comissoes': profile_soup.find('div', id='comissoes'),
+        'accordion-biografia': profile_soup.find('div', id='accordion-biografia'),
+        'accordion-mandatos-exercicios': profile_soup.find('div', id='accordion-mandatos-exercicios'),
+        'dl-horizontal': profile_soup.find('dl', class_='dl-horizontal'),
+        'chapa': profile_soup.find('table', title='Chapa eleitoral do Senador'),
+    }
+    if not profile_soup.find('div', class_='head'):
+        return None
+    for region, marker in region_markers.items():
+        if found[region] is None and marker in page_text:
+            return None
+
+    #the status is read from the text of the whole page, without building its tree
+    out_of_service = out_of_service_marker in html.unescape(tag_pattern.sub('', page_text))
+    return extract_profile(profile_soup, out_of_service, sex)
+
+def extract_profile(profile_soup, out_of_service, sex):
+    personal_info = profile_soup.find('dl', class_='dl-horizontal')
+    info_tags = personal_info.find_all('dd') if personal_info else []
+
+#finding the block with personal info and extracting from it full name, date of birth and place of birth
+
+    f_name = safe_get_text(info_tags, 0)
+    dob = safe_get_text(info_tags, 1)
+    pob = safe_get_text(info_tags, 2)
+    #office = safe_get_text(info_tags, 3)
+    #phone = safe_get_text(info_tags, 4)
+    #mail = safe_get_text(info_tags, 5)
+
+#from the head block collecting short name of senator
+
+    head_div = profile_soup.find('div', class_='head')
+    name = head_div.find('h1').get_text(strip=True).split(" -")[0] if head_div else "N/A"
+
+#collecting information about parties (were available), otherwise put "N/A"
+#information about political party is available only for sitting senators, we'll fix this later using alt_url
+
+    party_tag = profile_soup.find('small').get_text(strip=True) if profile_soup.find('small') else ''
+    parts = [p.strip() for p in party_tag.split(' - ')]
+    party = parts[1].split('(')[0].strip() if len(parts) > 1 else "N/A"
+
+#identifying position in party (were available), otherwise put "N/A"
+
+    if out_of_service:
+        position = "N/A"
+    elif 'Líder' in party_tag:
+        position = "Leader"
+    elif '1° Vice-líder' in party_tag:
+        position = "1st Vice-leader"
+    elif '2° Vice-líder' in party_tag:
+        position = "2nd Vice-leader"
+    else:
+        position = "Member"
+
+#identifying whether senator is sitting now or out of service
+
+    status = "Out of Service" if out_of_service else "Sitting"
+
+    bio_block = profile_soup.find('div', id='accordion-biografia')
+
+#in biograohy block find the commision's section and collect information about commisions senator is participating
+
+    comm_block = profile_soup.find('div', id='comissoes')
+    commissions = []
+    if comm_block:
+        tbody = comm_block.find('tbody')
+        if tbody:
+            commissions = [
+                comm.find_all('td')[0].get_text(strip=True)
+                for comm in tbody.find_all('tr')
+                if comm.find_all('td')
+            ]
+
+#in biograohy block find the commision's section and collect information about mandates
+#MANDATES HERE ARE ALL TERMS IN GOVERNMENT AUTHORITIES (Deputado, Prefeito, Vice-governador, Governador and Senador)
+
+    mandates_terms = bio_block.find('table', class_='table table-striped', title='Mandatos do(a) senador(a)') if bio_block else None
+    mandates = []
+    if mandates_terms:
+        rows = mandates_terms.find('tbody').find_all('tr')
+        for row in rows:
+            cols = row.find_all('td')
+            if len(cols) >= 3:
+                mandate = {
+                    'Position': cols[0].get_text(strip=True),
+                    'Start date': cols[1].get_text(strip=True),
+                    'End date': cols[2].get_text(strip=True)
+                }
+                mandates.append(mandate)
+
+#IN TERMS_COUNT PUT THE NUMBER OF TERMS SERVED IN SENATE (= terms served as senador in Federal Senate)
+
+    prof_info = profile_soup.find('div', id='accordion-mandatos-exercicios')
+    terms_count = prof_info.get_text(strip=True).lower().count('legislaturas') if prof_info else 0
+
+#in biography block find the education part and looking for the degree information
+
+    degree = "N/A"
+    educ_table = bio_block.find('table', class_='table table-striped', title='Histórico acadêmico do(a) senador(a)') if bio_block else None
+    if educ_table:
+        levels = educ_table.find('tbody').find_all('tr')
+        if levels:
+            h_level = levels[-1].find_all('td')
+            if len(h_level) >= 2:
+                degree = h_level[1].get_text(strip=True)
+
+#as politicians being voted as a part of chapa (group with main candidate, 1st alternate and 2nd alternate) we identify the positio in chapa (=ticket) for every senator
+
+    ticket = "N/A"
+    chapa_table = profile_soup.find('table', class_='table table-striped', title='Chapa eleitoral do Senador')
+    if chapa_table:
+        tickets = chapa_table.find('tbody').find_all('tr')
+        for idx, ticket_row in enumerate(tickets):
+            ticket_text = ticket_row.get_text(strip=True)
+            if name in ticket_text:
+                if idx == 0:
+                    ticket = "Holder"
+                elif idx == 1:
+                    ticket = "1st alternate"
+                elif idx == 2:
+                    ticket = "2nd alternate"
+                break
+
+#in biography block find the tags for professions
+
+    professions = []
+    if bio_block:
+        h3_tags = bio_block.find_all('h3')
+        for h3 in h3_tags:
+            if 'profissões' in h3.get_text(strip=True).lower():
+                ul_tag = h3.find_next_sibling('ul')
+                if ul_tag:
+                    li_tags = ul_tag.find_all('li')
+                    professions = [li.get_text(strip=True) for li in li_tags]
+                break
+
+#adding all data together
+
+    return {
+        "Full Name": f_name,
+        "Short Name": name,
+        "Date of Birth": dob,
+        "Place of Birth": pob,
+        "Sex": sex,
+        "Status": status,
+        #"Office": office,
+        #"Phone": phone,
+        #"E-mail": mail,
+        #"Supoffice": supoffice,
+        "Party": party,
+        "Position in party": position,
+        "Education level": degree,
+        "Professions": professions,
+        "Number of terms in Senate": terms_count,
+        "Position in the last ticket": ticket,
+        "Mandates": mandates,
+        "Commissions": commissions
+    }
@@ -0,0 +1,447 @@
+import argparse
+import hashlib
+import io
+import os
+import random
+import re
+import threading
+import time
+import zipfile
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+
+
+#local stand-in for the websites the scrapers read, for the offline benchmark (bench_scrapers.py)
+#the real url https://<host>/<path>?<query> is served at http://127.0.0.1:<port>/<scheme>/<host>/<path>?<query>,
+#so the scrapers keep their real urls (cache keys, rate limit buckets, relative links) and only the connection
+#is redirected, see install_standin in bench_scrapers.py
+#every page is synthetic, generated in the shape of the real one (same tags, classes, ids, forms, encodings and
+#roughly the same weight), unless a recorded copy is found in fixtures_dir (see fixture_path)
+#latency (seconds, +- jitter) is added to every answer, error_rate of the GET / HEAD requests get a 503
+#usage: python standin_server.py [--port 8765] [--latency 0.05] [--error-rate 0.01] [--fixtures DIR]
+
+#size of the synthetic websites, multiplied by the scale of the server
+senators_per_legislature = 81
+senado_results_per_page = 20
+deputies_per_legislature = 100
+acteur_files = 2000
+ches_rows = 2000
+
+error_status = 503
+
+first_names = ["Jean", "Marie", "Pierre", "Anne", "Jean-Pierre", "Hélène", "François", "Cécile", "Michel", "Élise",
+               "Jacques", "Françoise", "Philippe", "Sylvie", "Marc-Antoine", "Noël", "Gaëlle", "Loïc", "Chloé", "Benoît"]
+syllables = ["du", "mar", "ber", "lan", "ché", "vil", "ton", "ré", "gon", "pel", "lier", "quet", "mon", "sau", "fè"]
+parties = [("PT", "Partido dos Trabalhadores"), ("PSDB", "Partido da Social Democracia Brasileira"),
+           ("MDB", "Movimento Democrático Brasileiro"), ("PL", "Partido Liberal"), ("PSD", "Partido Social Democrático"),
+           ("PDT", "Partido Democrático Trabalhista"), ("PSB", "Partido Socialista Brasileiro")]
+groups = ["SOC", "RPR", "UDF", "COM", "RCV", "DL", "NI"]
+
+
+def fixture_path(fixtures_dir, host, path, query=''):
+    #recorded copy of a page: fixtures_dir/<host>/<path>, the query (if any) appended after '@'
+    #e.g. www25.senado.leg.br/web/senadores/senador/-/perfil/5012, www.assemblee-nationale.fr/qui/index.asp@legislature=11
+    name = unquote(path).strip('/') or 'index'
+    if query:
+        name += '@' + re.sub(r'[^\w.=&%+-]', '_', query)
+    return os.path.join(fixtures_dir, host, *name.split('/'))
+
+def filler(tag, text, count):
+    #menus, news and footers of the real pages, which the scrapers download and have to skip
+    return ''.join(f'<{tag}><a href="/menu/{k}">{text} {k}</a></{tag}>' for k in range(count))
+
+def person_name(i):
+    rng = random.Random(i)
+    last = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).capitalize()
+    return rng.choice(first_names), last
+
+
+class Page:
+    def __init__(self, body, content_type='text/html; charset=utf-8', status=200):
+        self.body = body
+        self.content_type = content_type
+        self.status = status
+
+
+class StandinSite:
+    #the synthetic pages, by host; scale multiplies the number of senators, deputies, acteur files and CHES rows
+
+    def __init__(self, scale=1.0, fixtures_dir=None):
+        self.scale = scale
+        self.fixtures_dir = fixtures_dir
+        self.senators = max(1, int(senators_per_legislature * scale))
+        self.deputies = max(1, int(deputies_per_legislature * scale))
+        self.routes = {
+            'www6g.senado.leg.br': self.senado_search,
+            'www25.senado.leg.br': self.senado_pages,
+            'www.assemblee-nationale.fr': self.assemblee_pages,
+            'data.assemblee-nationale.fr': self.assemblee_open_data,
+            'www.chesdata.eu': self.ches_pages,
+        }
+        self._lock = threading.Lock()
+
+    def page(self, method, host, path, query, form):
+        if self.fixtures_dir:
+            recorded = fixture_path(self.fixtures_dir, host, path, query)
+            if os.path.isfile(recorded):
+                with open(recorded, 'rb') as f:
+                    return Page(f.read(), recorded_type(recorded))
+        route = self.routes.get(host)
+        page = route(method, path, parse_qs(query), form) if route else None
+        return page or Page(b'<html><body>Not found</body></html>', status=404)
+
+    #Senado: search results (sf-busca-resultados-item), profiles, former legislatures by senator and by party
+
+    def senator_ids(self, leg):
+        #about half of the senators of a legislature sit in the next one too
+        start = (leg - 51) * (self.senators // 2 + 1)
+        return list(range(start, start + self.senators))
+
+    def senado_search(self, method, path, query, form):
+        if not path.startswith('/busca'):
+            return None
+        leg = int(re.match(r'\d+', query.get('legislatura', ['0'])[0]).group())
+        p = int(query.get('p', ['1'])[0])
+        ids = self.senator_ids(leg)
+        pages = -(-len(ids) // senado_results_per_page)
+        items = ''.join(
+            f'<div class="sf-busca-resultados-item"><h3><a href="https://www25.senado.leg.br/web/senadores/senador/-/perfil/{i}">'
+            f'Senador {i}</a></h3><p>{"Senadora" if i % 3 == 0 else "Senador"} - {parties[i % len(parties)][0]}/PE</p>'
+            f'<p>{"Resumo da atuação parlamentar " * 8}</p></div>'
+            for i in ids[(p - 1) * senado_results_per_page:p * senado_results_per_page]
+        )
+        pagination = ''.join(f'<li><a href="?colecao=Senadores&amp;legislatura={leg}&amp;p={k}">{k}</a></li>' for k in range(1, pages + 1))
+        return Page(f'''<html><head><title>Busca</title><script>{"var s = 1;" * 300}</script></head><body>
+<nav><ul>{filler("li", "Menu", 150)}</ul></nav><div class="sf-busca-resultados">{items}</div>
+<ul class="pagination">{pagination}</ul><footer>{"<p>rodapé</p>" * 100}</footer></body></html>'''.encode('utf-8'))
+
+    def senado_pages(self, method, path, query, form):
+        profile = re.match(r'/web/senadores/senador/-/perfil/(\d+)$', path)
+        if profile:
+            return Page(self.senator_profile(int(profile.group(1))))
+        former = re.match(r'/web/senadores/legislaturas-anteriores/-/a/(\d+)(/por-partido)?$', path)
+        if former:
+            leg = int(former.group(1))
+            return Page(self.former_senators(leg, by_party=bool(former.group(2))))
+        return None
+
+    def senator_profile(self, i):
+        abb = parties[i % len(parties)][0]
+        mandates = ''.join(f'<tr><td>Senador</td><td>01/02/{1995 + 4 * k}</td><td>31/01/{2003 + 4 * k}</td></tr>' for k in range(i % 4 + 1))
+        commissions = ''.join(f'<tr><td>Comissão {k}</td><td>Titular</td></tr>' for k in range(i % 9 + 3))
+        professions = ''.join(f'<li>Profissão {k}</li>' for k in range(i % 3 + 1))
+        out_of_service = '<p> (Fora de Exercício) </p>' if i % 4 == 0 else ''
+        return f'''<html><head><title>Senador {i}</title><script>{"var x = 1;" * 500}</script></head><body>
+<nav><ul>{filler("li", "Item de menu", 300)}</ul></nav>
+<div class="head"><h1>Senador {i} - {abb}/PE</h1><small>Senador - {abb}{" (Líder)" if i % 7 == 0 else ""}</small>{out_of_service}</div>
+<dl class="dl-horizontal"><dt>Nome civil</dt><dd>Nome Completo do Senador {i}</dd><dt>Nascimento</dt><dd>{i % 28 + 1:02d}/0{i % 9 + 1}/19{40 + i % 50}</dd><dt>Naturalidade</dt><dd>Recife (PE)</dd></dl>
+<div id="comissoes"><table><tbody>{commissions}</tbody></table></div>
+<div id="accordion-mandatos-exercicios">{"<p>Legislaturas 2003-2011</p>" * 3}</div>
+<div id="accordion-biografia">
+<table class="table table-striped" title="Mandatos do(a) senador(a)"><tbody>{mandates}</tbody></table>
+<table class="table table-striped" title="Histórico acadêmico do(a) senador(a)"><tbody><tr><td>1975</td><td>Superior completo</td></tr></tbody></table>
+<h3>Profissões</h3><ul>{professions}</ul></div>
+<table class="table table-striped" title="Chapa eleitoral do Senador"><tbody><tr><td>Senador {i}</td></tr><tr><td>Suplente {i}</td></tr></tbody></table>
+<section>{"<div class='noticia'><h4>Notícia</h4><p>" + "texto da notícia " * 40 + "</p></div>" * 60}</section>
+<footer>{"<p>rodapé</p>" * 200}</footer></body></html>'''.encode('utf-8')
+
+    def former_senators(self, leg, by_party):
+        ids = self.senator_ids(leg)
+        if by_party:
+            rows = ''
+            for k, (abb, name) in enumerate(parties):
+                rows += f'<tr class="search-group-row"><td colspan="3">{abb} - {name}</td></tr>'
+                rows += ''.join(f'<tr data-suplente="0"><td><a href="#">Senador {i}</a></td><td>PE</td></tr>'
+                                for i in ids if i % len(parties) == k)
+        else:
+            rows = ''.join(f'<tr data-suplente="{i % 3 == 0:d}"><td><a href="https://www25.senado.leg.br/web/senadores/senador/-/perfil/{i}">'
+                           f'Senador {i}</a></td><td>{parties[i % len(parties)][0] if i % 11 else "-"}</td><td>PE</td></tr>'
+                           for i in ids)
+        return f'''<html><head><title>Legislatura {leg}</title></head><body><nav><ul>{filler("li", "Menu", 150)}</ul></nav>
+<table class="table" id="senadoreslegislaturasanteriores-tabela-senadores"><thead><tr><th>Nome</th><th>Partido</th><th>UF</th></tr></thead>
+<tbody>{rows}</tbody></table></body></html>'''.encode('utf-8')
+
+    #Assemblee nationale, old pages (latin-1): legislature page with the form Lien5, multicriteria form,
+    #results table tablesorter0, liste_alpha.asp and the fiches of the deputies
+
+    def deputy_ids(self, legislature):
+        start = (legislature - 1) * (self.deputies * 3 // 5)
+        return list(range(start, start + self.deputies))
+
+    def assemblee_pages(self, method, path, query, form):
+        if path == '/qui/index.asp':
+            legislature = query.get('legislature', ['11'])[0]
+            body = f'''<html><body><a href="javascript:document.Lien5.submit()">Recherche multicritère</a>
+<form name="Lien5" method="post" action="/qui/multi.asp"><input type="hidden" name="legislature" value="{legislature}"></form>
+{filler("p", "Rubrique", 100)}</body></html>'''
+        elif path == '/qui/multi.asp' and method == 'POST':
+            legislature = form.get('legislature', ['11'])[0]
+            checkboxes = ''.join(f'<input type="checkbox" name="col{k}" value="1">' for k in range(len(result_columns)))
+            body = f'''<html><body><form method="post" action="/qui/resultats.asp">
+<input type="hidden" name="legislature" value="{legislature}"><input type="hidden" name="id_acteur" value="">
+<select name="tri"><option value="nom">Nom</option></select>{checkboxes}
+<input type="submit" name="valider" value="Afficher les résultats"><input type="reset" value="Effacer"></form></body></html>'''
+        elif path == '/qui/resultats.asp' and method == 'POST':
+            body = self.results_table(int(form.get('legislature', ['11'])[0]))
+        elif path == '/qui/xml/liste_alpha.asp':
+            legislature = int(query.get('legislature', ['11'])[0])
+            links = ''.join(
+                f'<li><a href="/{legislature}/tribun/fiches_id/{i}.asp"><span class="dep">&nbsp;</span>'
+                f'{"Mme" if i % 3 == 0 else "M."} {" ".join(person_name(i))}</a></li>'
+                for i in self.deputy_ids(legislature)
+            )
+            body = f'<html><body><ul>{links}</ul></body></html>'
+        else:
+            fiche = re.match(r'/(\d+)/tribun/fiches_id/(\d+)\.asp$', path)
+            if not fiche:
+                return None
+            body = self.deputy_fiche(int(fiche.group(1)), int(fiche.group(2)))
+        return Page(body.encode('latin-1', 'xmlcharrefreplace'), 'text/html; charset=iso-8859-1')
+
+    def results_table(self, legislature):
+        rows = []
+        for i in self.deputy_ids(legislature):
+            first, last = person_name(i)
+            values = {
+                "Civilite": "Mme" if i % 3 == 0 else "M.", "Prénom": first, "Nom": last, "Groupe": groups[i % len(groups)],
+                "Région d'élection": "Rhône-Alpes", "Département d'élection": "Loire", "N° circ.": str(i % 9 + 1),
+                "Date de naissance": f"{i % 28 + 1:02d}/0{i % 9 + 1}/19{30 + i % 50}", "Age": "60", "Catégorie d'âge": "60-69",
+                "Lien fiche": "Fiche",
+            }
+            rows.append('<tr>' + ''.join(f'<td>{values.get(column, f"{column} {i % 5}")}</td>' for column in result_columns) + '</tr>')
+        headers = ''.join(f'<th>{column}</th>' for column in result_columns)
+        return f'''<html><body>{filler("p", "Rubrique", 100)}<table id="tablesorter0" class="tablesorter">
+<thead><tr>{headers}</tr></thead><tbody>{"".join(rows)}</tbody></table></body></html>'''
+
+    def deputy_fiche(self, legislature, i):
+        start_year = 1958 + 5 * (legislature - 1)
+        return f'''<html><head><title>Fiche</title></head><body><div id="menu">{filler("p", "Rubrique", 150)}</div>
+<p>{"Née" if i % 3 == 0 else "Né"} le {i % 28 + 1} janvier 19{30 + i % 50} à Saint-Étienne (Loire)</p>
+<div><div><div><div><b>MANDAT À L'ASSEMBLÉE NATIONALE</b></div></div></div></div>
+<ul><p>Date de début de mandat : 01/06/{start_year}</p><p>Fin du mandat au : 31/05/{start_year + 5}</p><p>Élu(e) le 1er juin {start_year}</p></ul>
+<div>{"<p>Travaux parlementaires</p>" * 80}</div></body></html>'''
+
+    #Assemblee open data: page with the link to the acteur archive, and the archive (json/acteur/*.json)
+
+    def assemblee_open_data(self, method, path, query, form):
+        if path == '/acteurs/historique-des-deputes':
+            return Page(f'''<html><body>{filler("p", "Jeu de données", 100)}
+<a href="{acteur_zip_path}">AMO30_tous_acteurs_tous_mandats_tous_organes_historique.json.zip</a>
+<a href="{acteur_zip_path.replace('.json.zip', '.xml.zip')}">XML</a></body></html>'''.encode('utf-8'))
+        if path == acteur_zip_path:
+            return Page(self.acteur_zip(), 'application/zip')
+        return None
+
+    def acteur_zip(self):
+        with self._lock:
+            return acteur_archive(max(1, int(acteur_files * self.scale)))
+
+    #CHES: dataset page and the CSV files
+
+    def ches_pages(self, method, path, query, form):
+        if path == '/ches-europe':
+            links = ''.join(f'<li><a href="{file_path}">{os.path.basename(file_path)}</a></li>' for file_path in ches_files)
+            return Page(f'<html><body>{filler("p", "Section", 50)}<ul>{links}</ul></body></html>'.encode('utf-8'))
+        if path in ches_files:
+            with self._lock:
+                return Page(ches_csv(path, max(1, int(ches_rows * self.scale))), 'text/csv; charset=utf-8')
+        return None
+
+
+result_columns = ["Civilite", "Prénom", "Nom", "Groupe", "Région d'élection", "Département d'élection", "N° circ.",
+                  "Commission permanente", "Profession", "Catégorie socioprofessionnelle", "Famille socioprofessionnelle",
+                  "Date de naissance", "Age", "Catégorie d'âge", "Conseil municipal", "Conseil régional", "Conseil départemental",
+                  "Autre mandat local", "Mandat communal", "Mandat départemental", "Mandat régional", "Lien fiche"]
+acteur_zip_path = "/static/openData/repository/17/amo/tous_acteurs_mandats_organes_xi_legislature/AMO30_tous_acteurs_tous_mandats_tous_organes_historique.json.zip"
+#the three files pol_leaning_UK_FR.py reads (new files use country codes, the older ones numbers) and two it skips
+ches_files = {
+    "/sites/default/files/1999-2019_CHES_dataset_means(v3).csv": ('number', True),
+    "/sites/default/files/2017_CHES_dataset_means.csv": ('number', True),
+    "/sites/default/files/CHES_2024_final_v2.csv": ('code', False),
+    "/sites/default/files/CHES_Ukraine_March_2024.csv": ('code', False),
+    "/sites/default/files/2017_CHES_combined_experts.csv": ('number', True),
+}
+
+@lru_cache(maxsize=None)
+def acteur_archive(count):
+    from bench_acteur_ingest import synthetic_acteur
+
+    rng = random.Random(0)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for i in range(count):
+            zip_ref.writestr(f"json/acteur/PA{i}.json", synthetic_acteur(i, rng))
+        zip_ref.writestr("json/organe/PO1.json", b'{"organe": {}}')
+    return buffer.getvalue()
+
+@lru_cache(maxsize=None)
+def ches_csv(path, rows):
+    country_kind, with_year = ches_files[path]
+    rng = random.Random(path)
+    countries = ['fr', 'uk', 'de', 'it', 'es'] if country_kind == 'code' else [6, 11, 3, 8, 5]
+    data = {'country': [rng.choice(countries) for _ in range(rows)]}
+    if with_year:
+        data['year'] = [rng.choice([1999, 2002, 2006, 2010, 2014, 2019]) for _ in range(rows)]
+    data['party_id'] = [rng.randint(100, 1199) for _ in range(rows)]
+    data['party'] = [f"Parti {rng.randint(1, 60)}" for _ in range(rows)]
+    data['family'] = [rng.randint(1, 11) for _ in range(rows)]
+    #the real files have some fifty expert scores, only lrgen and galtan are read
+    for column in ['lrgen', 'galtan', 'eu_position', 'lrecon', 'spendvtax', 'deregulation', 'immigrate_policy',
+                   'multiculturalism', 'environment', 'regions', 'nationalism', 'civlib_laworder', 'religious_principles']:
+        data[column] = [round(rng.uniform(0, 10), 4) for _ in range(rows)]
+    return pd.DataFrame(data).to_csv(index=False).encode('utf-8')
+
+def recorded_type(path):
+    if path.endswith('.zip'):
+        return 'application/zip'
+    if path.endswith('.csv'):
+        return 'text/csv; charset=utf-8'
+    if path.endswith('.xls'):
+        return 'application/vnd.ms-excel'
+    return 'text/html; charset=utf-8'
+
+
+class StandinServer:
+    #ThreadingHTTPServer in a background thread serving a StandinSite with injected latency and errors
+    #every answered request is logged (method, url, status, bytes, seconds) until reset()
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, error_rate=0.0, scale=1.0, fixtures_dir=None, seed=0):
+        self.site = StandinSite(scale, fixtures_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._log = []
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def reset(self):
+        with self._lock:
+            log, self._log = self._log, []
+        return log
+
+    def requests(self):
+        with self._lock:
+            return list(self._log)
+
+    def _draw(self, method):
+        #(delay, inject an error) for one request
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            failed = method in ('GET', 'HEAD') and self._rng.random() < self.error_rate
+        return delay, failed
+
+    def _record(self, method, url, status, size, seconds):
+        with self._lock:
+            self._log.append((method, url, status, size, seconds))
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.answer()
+
+            def do_HEAD(self):
+                self.answer()
+
+            def do_POST(self):
+                self.answer()
+
+            def answer(self):
+                start = time.perf_counter()
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode('latin-1')) if length else {}
+                parts = urlsplit(self.path)
+                #/<scheme>/<host>/<path>
+                _, _, rest = parts.path.lstrip('/').partition('/')
+                host, _, path = rest.partition('/')
+                url = f"{host}/{path}" + (f"?{parts.query}" if parts.query else '')
+                delay, failed = server._draw(self.command)
+                if failed:
+                    page = Page(b'<html><body>Service Unavailable</body></html>', status=error_status)
+                else:
+                    try:
+                        page = server.site.page(self.command, host, '/' + path, parts.query, form)
+                    except Exception as e:
+                        page = Page(f'<html><body>{type(e).__name__}: {e}</body></html>'.encode('utf-8'), status=500)
+                if delay:
+                    time.sleep(delay)
+                size = self.send_page(page)
+                server._record(self.command, url, page.status, size, time.perf_counter() - start)
+
+            def send_page(self, page):
+                #ETag / If-None-Match for the cache of http_cache.py, Range for the resumed downloads of download_manager.py
+                body = page.body
+                status = page.status
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                headers = {'Content-Type': page.content_type}
+                if status == 200:
+                    headers['ETag'] = etag
+                    headers['Accept-Ranges'] = 'bytes'
+                    byte_range = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+                    if self.headers.get('If-None-Match') == etag:
+                        status, body = 304, b''
+                    elif byte_range and self.headers.get('If-Range', etag) == etag:
+                        first = int(byte_range.group(1))
+                        last = int(byte_range.group(2)) if byte_range.group(2) else len(body) - 1
+                        if first >= len(body):
+                            status, body = 416, b''
+                            headers['Content-Range'] = f'bytes */{len(page.body)}'
+                        else:
+                            status, body = 206, body[first:last + 1]
+                            headers['Content-Range'] = f'bytes {first}-{first + len(body) - 1}/{len(page.body)}'
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+                return len(body)
+
+        return Handler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the stand-in websites of the offline benchmark")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every answer")
+    parser.add_argument('--jitter', type=float, default=0.0, help="the latency varies by up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of GET / HEAD requests answered with a 503")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplies the size of the synthetic websites")
+    parser.add_argument('--fixtures', help="folder of recorded pages served instead of the synthetic ones")
+    args = parser.parse_args()
+
+    server = StandinServer(args.port, args.latency, args.jitter, args.error_rate, args.scale, args.fixtures)
+    print(f"Serving the stand-in websites at {server.url}/<scheme>/<host>/<path>, Ctrl+C to stop")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,392 @@
+import argparse
+import os
+import sqlite3
+
+import pandas as pd
+
+from dataset_output import read_dataset
+from date_normalize import DateNormalizer
+from name_match import name_key
+
+
+#loads the outputs of all the scripts into one local SQLite database with normalized tables:
+#   persons          one row per parliamentarian (person_key identifies them across the files of a chamber)
+#   mandates         one row per mandate, with legislature, dates (yyyy-mm-dd), group and party
+#   parties          parties of the Brazilian files and of CHES, with the CHES party id
+#   party_aliases    abbreviations under which a party appears (used to link the French groups to CHES parties)
+#   party_positions  CHES positions of a party per survey year
+#   commissions      commissions / standing committees of a person
+#the view mandate_party_positions joins mandate -> party -> CHES position of the last survey before the mandate,
+#e.g. SELECT * FROM mandate_party_positions WHERE country = 'FR' AND legislature = 17
+#the database is rebuilt from scratch in a temporary file, in one transaction with batched inserts, and indexed
+#at the end; it replaces the previous one only once it is complete
+#the CSV of a script is used, or its dataset folder if it was written as parquet / feather
+#usage: python warehouse_load.py [--db path]
+
+###CHANGE THESE PATHS BEFORE RUNNING THE CODE###
+db_path = r'C:\Users\HONOR\Desktop\RA\warehouse.sqlite'
+sources = {
+    'ches': r"C:\Users\HONOR\Desktop\RA\France\pol_leaning\ches_parties_UK_FR.csv",
+    'br_parties': r'C:\Users\HONOR\Desktop\RA\Brazil\data\br_parties_data.csv',
+    'br_senate': r'C:\Users\HONOR\Desktop\RA\Brazil\data\br_senate.csv',
+    'fr_dep_combined': r"C:\Users\HONOR\Desktop\RA\France\data\FR_dep_combined.csv",
+    'fr_dep11': r"C:\Users\HONOR\Desktop\RA\France\data\FR_dep11_full.csv",
+    'fr_dep17': r"C:\Users\HONOR\Desktop\RA\France\data\FR_dep17_full.csv",
+    'fr_senate': r'C:\Users\HONOR\Desktop\RA\France\data\FR_senators_all_1999_2024.csv',
+}
+#rows sent to sqlite per executemany call
+batch_rows = 5000
+
+schema = '''
+CREATE TABLE persons (
+    person_id INTEGER PRIMARY KEY,
+    person_key TEXT NOT NULL UNIQUE,
+    country TEXT, chamber TEXT,
+    last_name TEXT, first_name TEXT, full_name TEXT, sex TEXT,
+    date_of_birth TEXT, date_of_death TEXT, place_of_birth TEXT, profession TEXT
+);
+CREATE TABLE parties (
+    party_id INTEGER PRIMARY KEY,
+    country TEXT NOT NULL, abbreviation TEXT NOT NULL, name TEXT, ches_party_id INTEGER,
+    UNIQUE (country, abbreviation)
+);
+CREATE TABLE party_aliases (
+    country TEXT NOT NULL, alias TEXT NOT NULL, party_id INTEGER NOT NULL REFERENCES parties,
+    PRIMARY KEY (country, alias)
+);
+CREATE TABLE party_positions (
+    ches_party_id INTEGER NOT NULL, year INTEGER NOT NULL, family TEXT, lrgen REAL, galtan REAL,
+    PRIMARY KEY (ches_party_id, year)
+);
+CREATE TABLE mandates (
+    mandate_id INTEGER PRIMARY KEY,
+    person_id INTEGER NOT NULL REFERENCES persons,
+    country TEXT, chamber TEXT, legislature INTEGER, organe_type TEXT, position TEXT,
+    political_group TEXT, party_id INTEGER REFERENCES parties, constituency TEXT,
+    start_date TEXT, end_date TEXT, source TEXT
+);
+CREATE TABLE commissions (
+    person_id INTEGER NOT NULL REFERENCES persons, name TEXT NOT NULL, source TEXT,
+    PRIMARY KEY (person_id, name)
+);
+'''
+
+#created after the bulk load, building an index once is cheaper than updating it on every insert
+indexes = '''
+CREATE INDEX persons_birth ON persons (date_of_birth);
+CREATE INDEX persons_name ON persons (last_name, first_name);
+CREATE INDEX mandates_person ON mandates (person_id);
+CREATE INDEX mandates_legislature ON mandates (country, chamber, legislature);
+CREATE INDEX mandates_start ON mandates (start_date);
+CREATE INDEX mandates_end ON mandates (end_date);
+CREATE INDEX mandates_party ON mandates (party_id);
+CREATE INDEX parties_ches ON parties (ches_party_id);
+CREATE INDEX commissions_name ON commissions (name);
+CREATE VIEW mandate_party_positions AS
+SELECT m.mandate_id, m.person_id, m.country, m.chamber, m.legislature, m.start_date, m.end_date,
+       p.party_id, p.abbreviation, p.name AS party_name,
+       pp.year AS ches_year, pp.family, pp.lrgen, pp.galtan
+FROM mandates m
+JOIN parties p ON p.party_id = m.party_id
+LEFT JOIN party_positions pp ON pp.ches_party_id = p.ches_party_id AND pp.year = (
+    SELECT MAX(q.year) FROM party_positions q
+    WHERE q.ches_party_id = p.ches_party_id
+      AND q.year <= COALESCE(CAST(substr(m.start_date, 1, 4) AS INTEGER), 9999)
+);
+'''
+
+person_columns = ['country', 'chamber', 'last_name', 'first_name', 'full_name', 'sex',
+                  'date_of_birth', 'date_of_death', 'place_of_birth', 'profession']
+mandate_columns = ['person_id', 'country', 'chamber', 'legislature', 'organe_type', 'position',
+                   'political_group', 'party_id', 'constituency', 'start_date', 'end_date', 'source']
+
+#only the known formats: a bare year ("2003" in the Senado mandates) is not turned into a date
+dates = DateNormalizer(infer=False)
+
+
+def text(value):
+    #None for the empty / missing markers of the outputs, the stripped text otherwise
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    value = str(value).strip()
+    return None if value in ('', 'N/A', 'nan', 'NaN', 'None') else value
+
+def integer(value):
+    value = text(value)
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+def number(value):
+    value = text(value)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def iso_dates(df, columns):
+    #replaces the date columns by their yyyy-mm-dd version, each distinct value parsed once;
+    #a bare year is kept as it is (it still sorts and compares with the dates), anything else becomes None
+    for col in columns:
+        if col in df.columns:
+            iso = dates.format(df[col], '%Y-%m-%d')
+            years = df[col].where(df[col].astype(str).str.fullmatch(r'\d{4}'))
+            df[col] = iso.fillna(years).where(lambda values: values.notna(), None)
+    return df
+
+def column(df, name):
+    #a column that not every version of an output has
+    return df[name] if name in df.columns else pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+class Warehouse:
+    #keeps the person and party ids in memory, so rows can reference them without a query per row;
+    #persons and parties are written at the end, mandates and commissions in batches while loading
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.persons = {}
+        self.parties = {}
+        self.aliases = {}
+        self._mandates = []
+        self._commissions = []
+
+    def person(self, person_key, **fields):
+        #the first non-empty value of each field wins, over all the files that mention the person
+        known = self.persons.get(person_key)
+        if known is None:
+            known = self.persons[person_key] = [len(self.persons) + 1] + [None] * len(person_columns)
+        for i, col in enumerate(person_columns, 1):
+            if known[i] is None:
+                known[i] = text(fields.get(col))
+        return known[0]
+
+    def persons_by_name(self, prefix):
+        #(folded name, date of birth) -> person_key of the persons whose key starts with prefix,
+        #names shared by several of them are left out
+        found = {}
+        last, first, birth = (person_columns.index(col) + 1 for col in ('last_name', 'first_name', 'date_of_birth'))
+        for person_key, values in self.persons.items():
+            if person_key.startswith(prefix) and values[last] and values[birth]:
+                key = (name_key(f"{values[first] or ''} {values[last]}"), values[birth])
+                found[key] = None if key in found else person_key
+        return {key: person_key for key, person_key in found.items() if person_key is not None}
+
+    def party(self, country, abbreviation, name=None, ches_party_id=None):
+        abbreviation = text(abbreviation)
+        if abbreviation is None:
+            return None
+        known = self.parties.get((country, abbreviation))
+        if known is None:
+            known = self.parties[(country, abbreviation)] = [len(self.parties) + 1, text(name), ches_party_id]
+        known[1] = known[1] or text(name)
+        known[2] = known[2] or ches_party_id
+        self.alias(country, abbreviation, known[0])
+        return known[0]
+
+    def alias(self, country, alias, party_id):
+        self.aliases.setdefault((country, alias.upper()), party_id)
+
+    def party_by_alias(self, country, alias):
+        alias = text(alias)
+        return self.aliases.get((country, alias.upper())) if alias else None
+
+    def mandate(self, **fields):
+        self._mandates.append(tuple(fields.get(col) for col in mandate_columns))
+        if len(self._mandates) >= batch_rows:
+            self.flush()
+
+    def commission(self, person_id, names, source, separator=','):
+        for name in (text(names) or '').split(separator):
+            name = text(name)
+            if name:
+                self._commissions.append((person_id, name, source))
+        if len(self._commissions) >= batch_rows:
+            self.flush()
+
+    def flush(self):
+        placeholders = ', '.join('?' * len(mandate_columns))
+        self.conn.executemany(f"INSERT INTO mandates ({', '.join(mandate_columns)}) VALUES ({placeholders})", self._mandates)
+        self.conn.executemany("INSERT OR IGNORE INTO commissions (person_id, name, source) VALUES (?, ?, ?)", self._commissions)
+        self._mandates = []
+        self._commissions = []
+
+    def finish(self):
+        self.flush()
+        rows = ((values[0], key, *values[1:]) for key, values in self.persons.items())
+        self.conn.executemany(
+            f"INSERT INTO persons (person_id, person_key, {', '.join(person_columns)}) "
+            f"VALUES ({', '.join('?' * (len(person_columns) + 2))})", rows)
+        self.conn.executemany(
+            "INSERT INTO parties (party_id, country, abbreviation, name, ches_party_id) VALUES (?, ?, ?, ?, ?)",
+            ((party_id, country, abbreviation, name, ches_party_id)
+             for (country, abbreviation), (party_id, name, ches_party_id) in self.parties.items()))
+        self.conn.executemany(
+            "INSERT INTO party_aliases (country, alias, party_id) VALUES (?, ?, ?)",
+            ((country, alias, party_id) for (country, alias), party_id in self.aliases.items()))
+
+
+###LOADERS, ONE PER OUTPUT
+
+def load_ches(wh, df):
+    positions = {}
+    for row in df.itertuples(index=False):
+        ches_party_id = integer(row.party_id)
+        country = (text(row.country) or '').upper()
+        if ches_party_id is None or not country:
+            continue
+        party_id = wh.party(country, text(row.party_abb) or str(ches_party_id), row.party_name, ches_party_id)
+        #"FN; RN", "RPF/MPF;MPF": each part is an alias of the party
+        for alias in (text(row.party_abb) or '').replace('/', ';').split(';'):
+            if text(alias):
+                wh.alias(country, text(alias), party_id)
+        positions[(ches_party_id, integer(row.year))] = (text(row.family), number(row.lrgen), number(row.galtan))
+    wh.conn.executemany(
+        "INSERT INTO party_positions (ches_party_id, year, family, lrgen, galtan) VALUES (?, ?, ?, ?, ?)",
+        ((party, year, *values) for (party, year), values in positions.items() if year is not None))
+
+def load_br_parties(wh, df):
+    for row in df.itertuples(index=False):
+        wh.party('BR', row[0], row[1])
+
+def load_br_senate(wh, df):
+    df = iso_dates(df, ['Date of Birth', 'Mandate - Start date', 'Mandate - End date'])
+    professions = [col for col in df.columns if col == 'Profession' or col.startswith('Profession_')]
+    for row in df.to_dict('records'):
+        person_id = wh.person(
+            f"BR-SEN:{row['Full Name']}|{row['Date of Birth'] or ''}",
+            country='BR', chamber='Senado', full_name=row['Full Name'], last_name=row.get('Short Name'),
+            sex=row.get('Sex'), date_of_birth=row['Date of Birth'], place_of_birth=row.get('Place of Birth'),
+            profession='; '.join(filter(None, (text(row[col]) for col in professions))) or None,
+        )
+        wh.commission(person_id, row.get('Commissions'), 'br_senate')
+        if integer(row.get('Mandate number')) is None:
+            continue
+        wh.mandate(
+            person_id=person_id, country='BR', chamber='Senado', position=text(row.get('Mandate - Position')),
+            party_id=wh.party('BR', row.get('Party Abbreviation'), row.get('Party Full Name')),
+            start_date=row['Mandate - Start date'], end_date=row['Mandate - End date'], source='br_senate',
+        )
+
+def load_fr_dep_combined(wh, df):
+    df = iso_dates(df, ['Date of Birth', 'Mandate Start Date', 'Mandate End Date'])
+    for row in df.to_dict('records'):
+        person_id = wh.person(
+            f"FR-AN:{row['Deputy ID']}", country='FR', chamber='Assemblee',
+            last_name=row['Last Name'], first_name=row['First Name'], sex=row.get('Sex'),
+            date_of_birth=row['Date of Birth'], place_of_birth=row.get('Place of Birth'), profession=row.get('Profession'),
+        )
+        wh.mandate(
+            person_id=person_id, country='FR', chamber='Assemblee', legislature=integer(row.get('Legislature')),
+            organe_type=text(row.get('Type of Organe')), position=text(row.get('Position')),
+            start_date=row['Mandate Start Date'], end_date=row['Mandate End Date'], source='fr_dep_combined',
+        )
+
+def load_fr_dep11(wh, df):
+    #no deputy id of the open data in this file: the row goes to the deputy of the acteur / data.gouv files with the
+    #same name (accents, particles and word order ignored) and date of birth, or else to a person of its own
+    df = iso_dates(df, ['Date of Birth', 'Mandate Start Date', 'Mandate End Date'])
+    df['Sex'] = column(df, 'Sex')
+    known = wh.persons_by_name("FR-AN:")
+    for row in df.to_dict('records'):
+        name = f"{text(row['First Name']) or ''} {text(row['Last Name']) or ''}"
+        person_key = known.get((name_key(name), text(row['Date of Birth'])),
+                               f"FR-AN:{row['Last Name']}|{row['First Name']}|{row['Date of Birth'] or ''}")
+        person_id = wh.person(
+            person_key, country='FR', chamber='Assemblee',
+            last_name=row['Last Name'], first_name=row['First Name'], sex=row['Sex'],
+            date_of_birth=row['Date of Birth'], place_of_birth=row.get('Place of Birth'), profession=row.get('Profession'),
+        )
+        wh.commission(person_id, row.get('Standing Committee'), 'fr_dep11', separator=';')
+        wh.mandate(
+            person_id=person_id, country='FR', chamber='Assemblee', legislature=11, organe_type='ASSEMBLEE',
+            political_group=text(row.get('Political Group')), party_id=wh.party_by_alias('FR', row.get('Political Group')),
+            constituency=text(row.get('Constituency Number')),
+            start_date=row.get('Mandate Start Date'), end_date=row.get('Mandate End Date'), source='fr_dep11',
+        )
+
+def load_fr_dep17(wh, df):
+    df = iso_dates(df, ['Date of Birth', 'Start Date of Current Mandate'])
+    for row in df.to_dict('records'):
+        person_id = wh.person(
+            f"FR-AN:{row['Deputy ID']}", country='FR', chamber='Assemblee',
+            last_name=row['Last Name'], first_name=row['First Name'], sex=row.get('Sex'),
+            date_of_birth=row['Date of Birth'], place_of_birth=row.get('Place of Birth'), profession=row.get('Profession'),
+        )
+        wh.commission(person_id, row.get('Commission'), 'fr_dep17', separator=';')
+        wh.mandate(
+            person_id=person_id, country='FR', chamber='Assemblee', legislature=integer(row.get('Legislature')),
+            organe_type='ASSEMBLEE', political_group=text(row.get('Group')),
+            party_id=wh.party_by_alias('FR', row.get('Group Abbreviation')),
+            constituency=text(f"{row.get('Department') or ''} {row.get('Constituency') or ''}"),
+            start_date=row['Start Date of Current Mandate'], source='fr_dep17',
+        )
+
+def load_fr_senate(wh, df):
+    df = iso_dates(df, ['Date of Birth', 'Date of Death', 'Mandate Start Date', 'Mandate End Date'])
+    for row in df.to_dict('records'):
+        person_id = wh.person(
+            f"FR-SEN:{row['Matriculation']}", country='FR', chamber='Senat',
+            last_name=row.get('Last Name'), first_name=row.get('First Name'), sex=row.get('Sex'),
+            date_of_birth=row.get('Date of Birth'), date_of_death=row.get('Date of Death'),
+            profession=row.get('Profession Description'),
+        )
+        wh.commission(person_id, row.get('Committee'), 'fr_senate', separator=';')
+        wh.mandate(
+            person_id=person_id, country='FR', chamber='Senat', organe_type='SENAT',
+            political_group=text(row.get('Political Group')), party_id=wh.party_by_alias('FR', row.get('Political Group')),
+            constituency=text(row.get('Constituency')),
+            start_date=row.get('Mandate Start Date'), end_date=row.get('Mandate End Date'), source='fr_senate',
+        )
+
+#CHES and the party lists first: the mandates look their parties up in them
+loaders = {
+    'ches': load_ches,
+    'br_parties': load_br_parties,
+    'br_senate': load_br_senate,
+    'fr_dep_combined': load_fr_dep_combined,
+    'fr_dep17': load_fr_dep17,
+    #after the files with deputy ids, its rows are matched to their deputies
+    'fr_dep11': load_fr_dep11,
+    'fr_senate': load_fr_senate,
+}
+
+
+def build(db_path, sources):
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    #a half-built file is never used (it only replaces db_path once complete), so the journal is not needed
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(schema)
+    wh = Warehouse(conn)
+    with conn:
+        for name, load in loaders.items():
+            path = sources.get(name)
+            try:
+                df = read_dataset(path)
+            except (FileNotFoundError, TypeError):
+                print(f"Skipping {name}: no output found at {path}")
+                continue
+            print(f"Loading {name} ({len(df)} rows)...")
+            load(wh, df)
+        wh.finish()
+    print("Indexing...")
+    conn.executescript(indexes)
+    conn.execute("ANALYZE")
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ('persons', 'mandates', 'parties', 'party_positions', 'commissions')}
+    conn.close()
+    os.replace(tmp_path, db_path)
+    print(f"Warehouse saved to {db_path}: " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load the outputs of the scrapers into a local SQLite warehouse")
+    parser.add_argument('--db', default=db_path, help="path of the SQLite database to (re)build")
+    args = parser.parse_args()
+    build(args.db, sources)
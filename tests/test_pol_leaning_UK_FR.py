@@ -0,0 +1,21 @@
+import io
+
+import pandas as pd
+
+from pol_leaning_UK_FR import in_selected_countries, ches_chunk_rows
+
+
+def read_chunks(text):
+    #the chunks as read_ches_csv gets them from the CHES files
+    return list(pd.read_csv(io.StringIO(text), chunksize=ches_chunk_rows))
+
+
+def test_string_coded_chunk_keeps_fr_and_uk():
+    chunk, = read_chunks("country,party_id\nfr,601\nuk,1101\nde,301\nUK,1102\n")
+    assert chunk['party_id'][in_selected_countries(chunk['country'])].tolist() == [601, 1101, 1102]
+
+
+def test_numeric_coded_chunk_keeps_6_and_11():
+    chunk, = read_chunks("country,party_id\n6,601\n11,1101\n3,301\n")
+    assert pd.api.types.is_numeric_dtype(chunk['country'])
+    assert chunk['party_id'][in_selected_countries(chunk['country'])].tolist() == [601, 1101]